@@ -8,6 +8,17 @@
 struct InpaintConfig {
     int patchSize = 9;      // 9x9 is a standard sweet spot
     float searchStep = 10;  // Optimization: Don't search every single pixel (speedup)
+    int searchStride = 0;   // Candidate spacing in pixels; 0 = automatic (min(w, h) / 100, at least 2)
+};
+
+// Filled in by process(): where the time goes (search vs. bookkeeping)
+struct InpaintStats {
+    int iterations = 0;
+    int filledPixels = 0;
+    double frontSeconds = 0.0;   // findContours + priority computation
+    double searchSeconds = 0.0;  // findBestMatch (patch SSD search)
+    double updateSeconds = 0.0;  // copying the exemplar + mask/confidence updates
+    double totalSeconds = 0.0;
 };
 
 class PatchRemover {
@@ -17,6 +28,10 @@ public:
     void setImage(const cv::Mat& image);
     void setSelection(int x, int y, int width, int height);
     void process();
+
+    void setConfig(const InpaintConfig& newConfig);
+    const InpaintConfig& getConfig() const { return config; }
+    const InpaintStats& getStats() const { return stats; }
     
     cv::Mat getResult() const;
     bool save(const std::string& outputPath);
@@ -31,6 +46,7 @@ private:
 
     cv::Rect selection;
     InpaintConfig config;
+    InpaintStats stats;
 
     // Helpers
     void initializeMaps();
@@ -16,9 +16,20 @@ if os.path.exists(freezed_libs_path):
 # --- IMPORTS ---
 import src.Other.bkgr as bkgr
 import src.Other.flip as flip
+from src.Other.loader import ImageLoader
+from src.Other.inpaint import remove_object
+from src.Other.exemplar import HAS_NUMBA
 import src.Llie.Llie as llie
 import src.Filtering.apply as filtering
-from src.Denoising.denoising import apply_auto_denoising_logic, apply_denoising_logic
+from src.History import EditHistory
+from src.Export import Exporter, ExportTarget
+from src.Recipe import Recipe, compile_recipe
+import src.Tuning as tuning
+from src.Cache import get_cache
+from src.Viewer import TiledView
+from src.Document import Document
+from src.Tiling import ChainOp, ColorFilterOp, DenoiseOp
+from src.Denoising.denoising import apply_auto_denoising_logic, apply_denoising_logic, CHROMA_MODES, EDGE_METHODS
 
 # Try importing C++ Module
 try:
@@ -29,6 +40,12 @@ except ImportError:
     HAS_CPP_REMOVER = False
     print("⚠️ C++ ObjectRemover NOT found. Using Python fallback.")
 
+# Per-machine tuning profile (python -m src.Tuning calibrate), applied before any processing
+try:
+    tuning.apply_profile(tuning.load_profile())
+except (OSError, ValueError) as e:
+    print(f"⚠️ Tuning profile ignored: {e}")
+
 # -----------------------------------------------------------
 # COLORS
 # -----------------------------------------------------------
@@ -41,15 +58,26 @@ TEXT_COLOR = "black"
 # -----------------------------------------------------------
 # STATE
 # -----------------------------------------------------------
-loaded_image_pil = None
+loaded_doc = None      # Document: BGR pixels (+ alpha plane), the layout src operations work on
 loaded_image_path = None
-edited_image_pil = None
+committed_doc = None   # loaded_doc + committed edits (what the history applies to); None: no edits yet
+edited_doc = None      # committed_doc + the live slider adjustments; None: no adjustment
+image_loader = None   # Pending full-resolution decode (None once loaded_doc is full-res)
+orientation = flip.Orientation()   # Lazy flips/rotations of the current result (applied at display/export)
 
 # Optimization Cache (Fixes Lag)
 center_cached_img = None
 center_scale_factor = 1.0
 center_offsets = (0, 0)
 
+# Zoomed view (tiled, renders only the viewport); viewer.zoom is None in fit mode
+viewer = TiledView()
+viewer_source = (None, None)   # (Document, orientation key) currently loaded in the viewer
+pending_edit = None            # (source Document, preview TileOp, full-resolution compute) of a slider edit previewed at zoom
+adjust_cache = []              # (input Document, recipe step, output Document) per slider stage last rendered
+prefetch_after_id = None
+pan_last = None
+
 # UI State
 last_width = 1600
 last_height = 900
@@ -70,29 +98,99 @@ roi_end = None
 is_selecting = False
 remover = ObjectRemover_core.PatchRemover() if HAS_CPP_REMOVER else None
 
+# Undo/Redo (tiled deltas, spills to disk above the memory ceiling)
+HISTORY_MEMORY_LIMIT_MB = 512
+history = EditHistory(memory_limit_mb=HISTORY_MEMORY_LIMIT_MB)
+
+# Export (encoding runs on worker threads)
+exporter = Exporter()
+export_jobs = []
+EXPORT_SIZES = {"Full size": None, "2048 px": 2048, "1024 px": 1024}
+EXPORT_EXTRA_FORMATS = {"+ JPEG": ".jpg", "+ WebP": ".webp"}
+
 
 # -----------------------------------------------------------
 # HELPERS
 # -----------------------------------------------------------
-def pil_to_cv2_bgr(pil_img: Image.Image) -> np.ndarray:
-    if pil_img.mode == "RGBA": pil_img = pil_img.convert("RGB")
-    elif pil_img.mode != "RGB": pil_img = pil_img.convert("RGB")
-    return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+def get_current_doc() -> Document:
+    commit_pending_edit()
+    return edited_doc if edited_doc is not None else get_committed_doc()
+
+def get_committed_doc() -> Document:
+    """The image the sliders adjust: the loaded image with the edits recorded in the history."""
+    return committed_doc if committed_doc is not None else loaded_doc
+
+def commit_pending_edit():
+    """Runs a slider edit that was only previewed on the visible tiles at full resolution."""
+    global edited_doc, pending_edit
+    if pending_edit is not None:
+        _, _, compute = pending_edit
+        pending_edit = None
+        edited_doc = compute()
+
+def discard_pending_edit():
+    global pending_edit
+    pending_edit = None
+
+def preview_or_apply(source, op, compute):
+    """
+    Slider edits: when zoomed in, `op` (a src.Tiling TileOp) only runs on the visible
+    tiles of `source` and `compute` is deferred until the result is needed; in fit
+    view it runs now.
+    """
+    global edited_doc, pending_edit
+    if viewer.zoom is not None and not is_view_swapped and op is not None:
+        pending_edit = (source, op, compute)
+    else:
+        pending_edit = None
+        edited_doc = compute()
+    display_image_in_centerbox()
 
-def cv2_to_pil(cv_img: np.ndarray) -> Image.Image:
-    if cv_img is None: raise ValueError("cv_img is None")
-    return Image.fromarray(cv2.cvtColor(cv_img, cv2.COLOR_BGR2RGB))
+def store_result(result: Document):
+    """Makes `result` (in the stored, unoriented frame) the current image and records the edit."""
+    global committed_doc
+    bake_adjustments()
+    base = get_committed_doc()
+    committed_doc = result
+    record_edit(base, committed_doc)
+
+def bake_adjustments():
+    """
+    Commits the live slider adjustments as one history step and resets the sliders,
+    so the history only ever holds deltas between committed images. Runs before
+    any edit that builds on the current image and before undo/redo.
+    """
+    global committed_doc, edited_doc
+    commit_pending_edit()
+    if edited_doc is None: return
+    # Slider renders borrow their source's arena buffers: copy before they are kept
+    base, committed_doc, edited_doc = get_committed_doc(), edited_doc.owned(), None
+    record_edit(base, committed_doc)
+    adjust_cache.clear()
+    reset_adjustment_controls()
+
+def reset_adjustment_controls():
+    denoise_strength_slider.set(0)
+    denoise_strength_value.configure(text="0")
+    llie_int_slider.set(0)
+    llie_int_value.configure(text="0")
+    tone_slider.set(0)
+    preset_menu.set("None")
 
-def get_current_image_pil() -> Image.Image:
-    return edited_image_pil if edited_image_pil is not None else loaded_image_pil
+def record_edit(before: Document, after: Document):
+    """Stores the pixel delta between two states in the undo history."""
+    history.push(before.to_array(), after.to_array())
 
 def ensure_image_loaded() -> bool:
-    if loaded_image_pil is None:
+    if loaded_doc is None:
         messagebox.showwarning("No image", "Please select an image first.")
         return False
+    # Edits always run on full resolution: wait for the background decode if still running
+    if image_loader is not None:
+        finish_full_image_load()
     return True
 
-def get_display_params(pil_img, container_widget):
+def get_display_params(img_size, container_widget):
     """
     Calculates precise scaling and centering offsets.
     Essential for mapping mouse clicks (Screen) to image pixels (Texture).
@@ -107,7 +205,7 @@ def get_display_params(pil_img, container_widget):
     target_w = max(10, box_w - (margin * 2))
     target_h = max(10, box_h - (margin * 2))
 
-    img_w, img_h = pil_img.size
+    img_w, img_h = img_size
     
     # Calculate scale to FIT inside the padded area
     scale = min(target_w / img_w, target_h / img_h)
@@ -122,77 +220,55 @@ def get_display_params(pil_img, container_widget):
 
     return scale, off_x, off_y
 
-# -----------------------------------------------------------
-# PYTHON FALLBACK ALGORITHM (Texture Grafting)
-# -----------------------------------------------------------
-def apply_smart_inpaint(img_bgr, rx, ry, rw, rh):
-    """
-    Fallback if C++ fails. Uses Frequency Separation to graft texture.
-    """
-    mask = np.zeros(img_bgr.shape[:2], dtype=np.uint8)
-    pad = 10
-    y1, y2 = max(0, ry-pad), min(img_bgr.shape[0], ry+rh+pad)
-    x1, x2 = max(0, rx-pad), min(img_bgr.shape[1], rx+rw+pad)
-    mask[y1:y2, x1:x2] = 255
-
-    # Structure
-    inpainted = cv2.inpaint(img_bgr, mask, 5, cv2.INPAINT_NS)
-
-    # Texture
-    noise = np.random.normal(0, 15, inpainted.shape).astype(np.int16)
-    inpainted_16 = inpainted.astype(np.int16)
-    textured = np.clip(cv2.add(inpainted_16, noise), 0, 255).astype(np.uint8)
-
-    # Blend
-    final_img = inpainted.copy()
-    locs = np.where(mask > 0)
-    final_img[locs] = textured[locs]
-    
-    return final_img
-
 # -----------------------------------------------------------
 # DISPLAY LOGIC
 # -----------------------------------------------------------
 def toggle_view_swap(event=None):
     global is_view_swapped
-    if loaded_image_pil is None: return
+    if loaded_doc is None: return
     is_view_swapped = not is_view_swapped
     display_image_in_guidebox()
     display_image_in_centerbox()
 
 def display_image_in_guidebox():
-    if loaded_image_pil is None:
+    if loaded_doc is None:
         guide_image_label.configure(image=None, text="")
         return
-    img = edited_image_pil if (is_view_swapped and edited_image_pil) else loaded_image_pil
-    # Pass guide_box (Frame) for sizing context
-    _display_image(img, guide_box, guide_image_label)
+    if is_view_swapped:
+        _display_image(get_current_doc(), guide_box, guide_image_label, orient=orientation)
+    else:
+        # Pass guide_box (Frame) for sizing context
+        _display_image(loaded_doc, guide_box, guide_image_label)
 
 def display_image_in_centerbox():
     global center_cached_img, center_scale_factor, center_offsets
     
-    current_result = edited_image_pil if edited_image_pil is not None else loaded_image_pil
-    if current_result is None:
+    if loaded_doc is None:
         center_image_label.configure(image=None, text="Edited image will appear here")
         return
+    if viewer.zoom is not None:
+        display_viewport()
+        return
+    current_result = get_current_doc()
 
-    img_to_show = loaded_image_pil if is_view_swapped else current_result
-    # Pass image_box (Frame) for sizing context
-    _display_image(img_to_show, image_box, center_image_label, is_center=True)
+    if is_view_swapped:
+        _display_image(loaded_doc, image_box, center_image_label, is_center=True)
+    else:
+        # Pass image_box (Frame) for sizing context
+        _display_image(current_result, image_box, center_image_label, is_center=True, orient=orientation)
 
-def _display_image(pil_img, container_widget, label_widget, is_center=False):
+def _display_image(doc, container_widget, label_widget, is_center=False, orient=None):
     global center_cached_img, center_scale_factor, center_offsets
 
-    # Calculate layout relative to the Container Frame
-    scale, off_x, off_y = get_display_params(pil_img, container_widget)
+    # Calculate layout relative to the Container Frame (in oriented dimensions)
+    img_size = orient.map_size(doc.size) if orient is not None else doc.size
+    scale, off_x, off_y = get_display_params(img_size, container_widget)
     
     if scale <= 0: return
 
-    new_w = int(pil_img.size[0] * scale)
-    new_h = int(pil_img.size[1] * scale)
-
-    # Resize (High Quality)
-    resized = pil_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+    # Resize the BGR pixels, then convert to RGB and orient the small copy only
+    resized = doc.display((int(doc.size[0] * scale), int(doc.size[1] * scale)), orient)
+    new_w, new_h = resized.size
     
     if is_center:
         center_cached_img = resized
@@ -203,12 +279,102 @@ def _display_image(pil_img, container_widget, label_widget, is_center=False):
     label_widget.configure(image=ctk_img, text="")
     label_widget.image = ctk_img
 
+def display_viewport():
+    """Zoomed center view: only the tiles under the viewport are rendered (and previewed)."""
+    global center_cached_img, center_scale_factor, center_offsets, viewer_source
+
+    # Source pixels: a pending slider edit is previewed on top of the original
+    if is_view_swapped:
+        doc, orient, preview = loaded_doc, None, None
+    elif pending_edit is not None:
+        doc, orient, preview = pending_edit[0], orientation, pending_edit[1]
+    else:
+        doc, orient, preview = get_current_doc(), orientation, None
+
+    orient_key = repr(orient)
+    if viewer_source[0] is not doc or viewer_source[1] != orient_key:
+        viewer.set_image(doc.bgr, orient, alpha=doc.alpha)
+        viewer_source = (doc, orient_key)
+    if viewer.preview is not preview:
+        viewer.set_preview(preview)
+
+    margin = 20
+    viewer.set_view_size(image_box.winfo_width() - 2 * margin, image_box.winfo_height() - 2 * margin)
+    background = tuple(int(BOX_COLOR[i:i + 2], 16) for i in (5, 3, 1))   # BGR
+    canvas = viewer.render(background + (0,) if doc.has_alpha else background)
+
+    # Tiles stay BGR(A); only the viewport-sized canvas is converted
+    canvas = cv2.cvtColor(canvas, cv2.COLOR_BGRA2RGBA if doc.has_alpha else cv2.COLOR_BGR2RGB)
+    center_cached_img = Image.fromarray(canvas)
+    center_scale_factor = viewer.zoom
+    center_offsets = (margin, margin)
+    ctk_img = ctk.CTkImage(light_image=center_cached_img, size=center_cached_img.size)
+    center_image_label.configure(image=ctk_img, text="")
+    center_image_label.image = ctk_img
+    schedule_prefetch()
+
+def schedule_prefetch():
+    global prefetch_after_id
+    if prefetch_after_id is not None: app.after_cancel(prefetch_after_id)
+    prefetch_after_id = app.after(30, prefetch_step)
+
+def prefetch_step():
+    """Idle work: renders tiles around the viewport a few at a time, keeping the UI responsive."""
+    global prefetch_after_id
+    prefetch_after_id = None
+    if viewer.zoom is None: return
+    if viewer.prefetch(1 if viewer.preview is not None else 4):
+        prefetch_after_id = app.after(1, prefetch_step)
+
+def on_mouse_wheel(e):
+    """Zooms in/out by one level around the pointer."""
+    global roi_start, roi_end
+    if loaded_doc is None: return
+    steps = 1 if (getattr(e, "delta", 0) > 0 or getattr(e, "num", None) == 4) else -1
+    if viewer.zoom is None:
+        # Image pixel under the pointer in the fit view becomes the center of the zoomed view
+        point = (e.x / center_scale_factor, e.y / center_scale_factor)
+        viewer.step_zoom(steps, center_scale_factor)
+        if viewer.zoom is None: return
+        viewer.center_on(*point)
+    else:
+        fit_scale, _, _ = get_display_params(viewer.image_size, image_box)
+        viewer.step_zoom(steps, fit_scale, anchor=(e.x, e.y))
+    roi_start = roi_end = None
+    display_image_in_centerbox()
+
+def set_zoom_action(zoom):
+    global roi_start, roi_end
+    if loaded_doc is None: return
+    if zoom is None:
+        viewer.set_fit()
+    else:
+        viewer.set_zoom(zoom)
+    roi_start = roi_end = None
+    display_image_in_centerbox()
+
+def on_pan_start(e):
+    global pan_last
+    pan_last = (e.x, e.y) if viewer.zoom is not None else None
+
+def on_pan_drag(e):
+    global pan_last, roi_start, roi_end
+    if pan_last is None: return
+    viewer.pan(e.x - pan_last[0], e.y - pan_last[1])
+    pan_last = (e.x, e.y)
+    roi_start = roi_end = None
+    display_image_in_centerbox()
+
+def on_pan_end(e):
+    global pan_last
+    pan_last = None
+
 # -----------------------------------------------------------
 # MOUSE LOGIC (WITH PRECISE OFFSETS)
 # -----------------------------------------------------------
 def on_mouse_down(e):
     global roi_start, is_selecting
-    if loaded_image_pil and not is_view_swapped:
+    if loaded_doc is not None and not is_view_swapped:
         is_selecting = True
         roi_start = (e.x, e.y)
 
@@ -253,7 +419,7 @@ def draw_selection_fast():
 # OBJECT REMOVAL EXECUTION (HYBRID C++/PYTHON)
 # -----------------------------------------------------------
 def run_object_removal():
-    global edited_image_pil, roi_start, roi_end
+    global roi_start, roi_end
     
     if not ensure_image_loaded(): return
     if not roi_start or not roi_end:
@@ -271,38 +437,38 @@ def run_object_removal():
     screen_w = screen_x2 - screen_x1
     screen_h = screen_y2 - screen_y1
 
-    img = get_current_image_pil()
+    bake_adjustments()   # the removal builds on the adjusted image, as an owned copy
+    doc = get_committed_doc()
+    img_w, img_h = orientation.map_size(doc.size)
     
     # 3. Map Screen Coords -> Original Image Pixels
     # Simple scaling because screen coords are already relative to image top-left
-    rx = int(screen_x1 / scale)
-    ry = int(screen_y1 / scale)
+    # (zoomed view: relative to the viewport, which starts at viewer.origin)
+    origin_x, origin_y = viewer.screen_to_image(0, 0) if viewer.zoom is not None else (0, 0)
+    rx = int(origin_x + screen_x1 / scale)
+    ry = int(origin_y + screen_y1 / scale)
     rw = int(screen_w / scale)
     rh = int(screen_h / scale)
 
     # 4. Safety Bounds (Clamp to image size)
     if rw <= 0 or rh <= 0: return
-    rx = max(0, min(rx, img.width - 1))
-    ry = max(0, min(ry, img.height - 1))
-    rw = min(rw, img.width - rx)
-    rh = min(rh, img.height - ry)
+    rx = max(0, min(rx, img_w - 1))
+    ry = max(0, min(ry, img_h - 1))
+    rw = min(rw, img_w - rx)
+    rh = min(rh, img_h - ry)
 
-    # 5. Process
+    # 5. Process (pixels stay in the stored frame: the rect is mapped back through the orientation)
     try:
-        cv_img = pil_to_cv2_bgr(img)
+        x, y, w, h = orientation.unmap_rect((rx, ry, rw, rh), doc.size)
         
-        # Hybrid C++ / Python Logic
+        # Hybrid C++ / Python Logic (remover is None without the C++ module)
         if HAS_CPP_REMOVER:
             print("Processing with C++...")
-            remover.set_image(cv_img)
-            remover.set_selection(rx, ry, rw, rh)
-            remover.process()
-            result_cv = remover.get_result()
         else:
-            print("Processing with Python Smart Fallback...")
-            result_cv = apply_smart_inpaint(cv_img, rx, ry, rw, rh)
+            print("Processing with Numba exemplar fallback..." if HAS_NUMBA else "Processing with Python Smart Fallback...")
+        result = remove_object(doc.bgr, x, y, w, h, remover, cache=get_cache())
 
-        edited_image_pil = cv2_to_pil(result_cv)
+        store_result(doc.with_pixels(result))
         
         # Clear selection after processing
         roi_start = None
@@ -317,66 +483,270 @@ def run_object_removal():
 # CORE ACTIONS
 # -----------------------------------------------------------
 def select_image():
-    global loaded_image_pil, loaded_image_path, edited_image_pil
+    global loaded_doc, loaded_image_path, committed_doc, edited_doc, orientation
     path = filedialog.askopenfilename(filetypes=[("Image Files", "*.jpg *.jpeg *.png *.bmp *.webp")])
     if not path: return
 
+    # Show a draft-mode preview immediately, full resolution is decoded in the background
+    box_size = (max(image_box.winfo_width(), 100), max(image_box.winfo_height(), 100))
+    try:
+        loader = ImageLoader(path, preview_size=box_size)
+    except Exception as e:
+        messagebox.showerror("Open Error", str(e))
+        return
+
     loaded_image_path = path
-    loaded_image_pil = Image.open(path)
-    edited_image_pil = None
+    loaded_doc = Document.from_pil(loader.preview)
+    committed_doc = edited_doc = None
+    discard_pending_edit()
+    adjust_cache.clear()
+    viewer.set_fit()
+    orientation = flip.Orientation()
+    history.clear()
+    set_image_loader(loader)
     
     # Reset UI
-    denoise_strength_slider.set(0)
-    denoise_strength_value.configure(text="0")
-    llie_int_slider.set(0)
-    llie_int_value.configure(text="0")
-    tone_slider.set(0)
-    preset_menu.set("None")
+    reset_adjustment_controls()
+
+    display_image_in_guidebox()
+    display_image_in_centerbox()
+
+def set_image_loader(loader):
+    global image_loader
+    # A finished decode is swapped in as well: the first poll picks it up
+    image_loader = loader if loader.is_preview() else None
+    if image_loader is not None:
+        app.after(50, poll_full_image_load)
+
+def poll_full_image_load():
+    if image_loader is None: return
+    if image_loader.done():
+        finish_full_image_load()
+    else:
+        app.after(50, poll_full_image_load)
 
+def finish_full_image_load():
+    """Swaps the preview for the full-resolution decode (blocks if it is still running)."""
+    global loaded_doc, image_loader
+    loader, image_loader = image_loader, None
+    try:
+        loaded_doc = Document.from_pil(loader.result())
+    except Exception as e:
+        messagebox.showerror("Open Error", str(e))
+        return
     display_image_in_guidebox()
     display_image_in_centerbox()
 
 def reset_image_action():
-    global edited_image_pil
+    global committed_doc, edited_doc, orientation
     if not ensure_image_loaded(): return
-    edited_image_pil = None
-    
-    denoise_strength_slider.set(0)
-    denoise_strength_value.configure(text="0")
-    llie_int_slider.set(0)
-    llie_int_value.configure(text="0")
-    tone_slider.set(0)
-    preset_menu.set("None")
+    committed_doc = edited_doc = None
+    discard_pending_edit()
+    adjust_cache.clear()
+    orientation = flip.Orientation()
+    history.clear()
+    reset_adjustment_controls()
     
     display_image_in_centerbox()
 
 def export_image():
     if not ensure_image_loaded(): return
-    img = get_current_image_pil()
-    path = filedialog.asksaveasfilename(defaultextension=".png")
-    if path: img.save(path); messagebox.showinfo("Exported", f"Saved to:\n{path}")
+    doc = get_current_doc()
+    path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[
+        ("PNG", "*.png"), ("JPEG", "*.jpg *.jpeg"), ("WebP", "*.webp"), ("TIFF", "*.tif *.tiff")])
+    if not path: return
+
+    # One target per (size, format) combination, all encoded in parallel
+    base, ext = os.path.splitext(path)
+    extensions = [ext] + [e for label, e in EXPORT_EXTRA_FORMATS.items()
+                          if export_format_vars[label].get() and e != ext.lower()]
+    sizes = [m for label, m in EXPORT_SIZES.items() if export_size_vars[label].get()] or [None]
+    quality = int(export_quality_slider.get())
+    targets = [ExportTarget(base + ("" if m is None else f"_{m}px") + e, quality=quality, max_size=m)
+               for m in sizes for e in extensions]
+    try:
+        # The only full-resolution RGB conversion, handed to the encoder threads
+        export_jobs.append(exporter.submit(doc.to_pil(), targets, orientation=orientation))
+    except Exception as e:
+        messagebox.showerror("Export Error", str(e))
+        return
+    poll_export_jobs()
+
+def poll_export_jobs():
+    finished = [job for job in export_jobs if job.done()]
+    for job in finished:
+        export_jobs.remove(job)
+        results = job.results()
+        errors = [str(err) for _, err in results if err is not None]
+        if errors:
+            messagebox.showerror("Export Error", "\n".join(errors))
+        else:
+            messagebox.showinfo("Exported", "Saved to:\n" + "\n".join(p for p, _ in results))
+
+    if export_jobs:
+        done = sum(job.progress()[0] for job in export_jobs)
+        total = sum(job.progress()[1] for job in export_jobs)
+        export_status_label.configure(text=f"Exporting... {done}/{total}")
+        app.after(200, poll_export_jobs)
+    else:
+        export_status_label.configure(text="")
 
 def remove_background_action():
-    global edited_image_pil
     if not ensure_image_loaded(): return
     try:
-        base = get_current_image_pil()
-        _, edited_image_pil = bkgr.run_background_removal(loaded_image_path, pil_image=base)
+        bake_adjustments()
+        doc = get_committed_doc()
+        alpha = bkgr.segment_alpha(doc.bgr, cache=get_cache())
+        store_result(Document(bkgr.cut_out(doc.bgr, alpha), alpha))
         display_image_in_centerbox()
     except Exception as e: messagebox.showerror("Error", str(e))
 
 def flip_horizontal_action():
-    global edited_image_pil
     if not ensure_image_loaded(): return
-    edited_image_pil = flip.flip_horizontal(get_current_image_pil())
+    # Lazy: only the orientation state changes, pixels are untouched
+    orientation.apply_op("flip_horizontal")
+    history.push_transform("flip_horizontal")
     display_image_in_centerbox()
 
 def flip_vertical_action():
-    global edited_image_pil
     if not ensure_image_loaded(): return
-    edited_image_pil = flip.flip_vertical(get_current_image_pil())
+    orientation.apply_op("flip_vertical")
+    history.push_transform("flip_vertical")
     display_image_in_centerbox()
 
+def undo_action(event=None):
+    global committed_doc
+    if loaded_doc is None: return
+    # Live slider adjustments become the step this undo reverts
+    bake_adjustments()
+    if not history.can_undo(): return
+    if history.next_undo_kind() == "transform":
+        history.undo(None, orientation)   # Orientation only, no pixel copy
+    else:
+        current = get_committed_doc().to_array()
+        committed_doc = Document.from_array(history.undo(current, orientation))
+    display_image_in_centerbox()
+
+def redo_action(event=None):
+    global committed_doc
+    if loaded_doc is None: return
+    # Live adjustments made after an undo are a new edit: baking them drops the redo steps
+    bake_adjustments()
+    if not history.can_redo(): return
+    if history.next_redo_kind() == "transform":
+        history.redo(None, orientation)
+    else:
+        current = get_committed_doc().to_array()
+        committed_doc = Document.from_array(history.redo(current, orientation))
+    display_image_in_centerbox()
+
+# -----------------------------------------------------------
+# RECIPES
+# -----------------------------------------------------------
+def build_recipe_from_controls() -> Recipe:
+    """The live adjustments, in the order the editor composes them, and the orientation as a recipe."""
+    recipe = Recipe([step for step, _, _ in adjustment_stages()])
+    for op in orientation.to_ops():
+        recipe.add(op)
+    return recipe
+
+def save_recipe_action():
+    if not ensure_image_loaded(): return
+    if committed_doc is not None and not messagebox.askokcancel(
+            "Save Recipe", "Edits already applied to the image (object or background removal, "
+                           "earlier adjustments) are not part of the recipe. Save the current "
+                           "adjustments and orientation anyway?"):
+        return
+    path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Recipe", "*.json")])
+    if not path: return
+    try:
+        build_recipe_from_controls().save(path)
+    except Exception as e: messagebox.showerror("Recipe Error", str(e))
+
+def apply_recipe_action():
+    if not ensure_image_loaded(): return
+    path = filedialog.askopenfilename(filetypes=[("Recipe", "*.json")])
+    if not path: return
+    try:
+        plan = compile_recipe(Recipe.load(path))
+        # Pixels stay in the stored frame; the recipe's geometry is composed lazily
+        bake_adjustments()
+        result, _ = plan.run(get_committed_doc().to_array(), orientation=orientation)
+        store_result(Document.from_array(result))
+        for op in plan.geometry_ops:
+            orientation.apply_op(op)
+            history.push_transform(op)
+        display_image_in_centerbox()
+    except Exception as e: messagebox.showerror("Recipe Error", str(e))
+
+# -----------------------------------------------------------
+# ADJUSTMENTS (denoise, low light, color tone sliders)
+# -----------------------------------------------------------
+def adjustment_stages():
+    """
+    Active slider adjustments in recipe order (denoise -> low light -> color tone), as
+    (recipe step, preview TileOp or None, run(Document, arena) -> Document). The
+    editor and build_recipe_from_controls both use this list, so a saved recipe
+    replays exactly what is shown.
+    """
+    stages = []
+    s = int(denoise_strength_slider.get())
+    if s > 0:
+        m, sp = bool(edge_preserving_var.get()), bool(salt_pepper_var.get())
+        method, chroma = edge_method_menu.get(), chroma_menu.get()
+        stages.append(({"op": "denoise", "strength": s, "edge_preserving": m, "salt_pepper": sp,
+                        "edge_method": method, "chroma_mode": chroma},
+                       DenoiseOp(s, m, sp, method, chroma),
+                       lambda doc, arena: doc.with_pixels(
+                           apply_denoising_logic(doc.bgr, s, m, sp, method, chroma_mode=chroma))))
+    if llie_int_slider.get() > 0:
+        intensity, detail, clip = llie_int_slider.get() / 100.0, llie_det_slider.get() / 100.0, llie_clip_slider.get()
+        # Not previewed in tiles: CLAHE and SSR depend on whole-image statistics
+        stages.append(({"op": "llie", "intensity": intensity, "detail": detail, "clip": clip}, None,
+                       lambda doc, arena: doc.with_pixels(llie.enhance_image(
+                           doc.bgr, intensity=intensity, detail=detail, clahe_clip=clip,
+                           dst=arena.get("llie.out", doc.bgr.shape), arena=arena), borrowed=True)))
+    preset, tone = preset_menu.get(), tone_slider.get()
+    if preset != "None" and tone > 0:
+        stages.append(({"op": "filter", "preset": preset, "intensity": tone}, ColorFilterOp(preset, tone),
+                       lambda doc, arena: doc.with_pixels(filtering.apply_color_filter(
+                           doc.bgr, preset, tone, dst=arena.get("filter.out", doc.bgr.shape), arena=arena),
+                           borrowed=True)))
+    return stages
+
+def render_adjustments():
+    """
+    Rebuilds edited_doc: committed_doc through every active adjustment. Stage outputs
+    are cached by input and parameters, so a slider tick only reruns its own stage
+    and the ones after it. Zoomed in, the rerun stages are previewed on the visible
+    tiles when they all have a TileOp.
+    """
+    base = get_committed_doc()
+    stages = adjustment_stages()
+    source, first_stale = base, len(stages)
+    for i, (step, _, _) in enumerate(stages):
+        if i < len(adjust_cache) and adjust_cache[i][0] is source and adjust_cache[i][1] == step:
+            source = adjust_cache[i][2]
+        else:
+            first_stale = i
+            break
+    stale = stages[first_stale:]
+
+    def compute():
+        cache, doc = adjust_cache[:first_stale], source
+        for step, _, run in stale:
+            out = run(doc, base.arena)
+            cache.append((doc, step, out))
+            doc = out
+        adjust_cache[:] = cache
+        return None if doc is base else doc
+
+    ops = [op for _, op, _ in stale]
+    preview = None
+    if ops and all(op is not None for op in ops):
+        preview = ops[0] if len(ops) == 1 else ChainOp(ops)
+    preview_or_apply(source, preview, compute)
+
 # -----------------------------------------------------------
 # FILTERING
 # -----------------------------------------------------------
@@ -390,18 +760,11 @@ def update_filter_preset(choice):
     apply_filter_now()
 
 def apply_filter_now():
-    global edited_image_pil, filter_update_after_id
+    global filter_update_after_id
     filter_update_after_id = None
     if not ensure_image_loaded(): return
     try:
-        base_pil = loaded_image_pil
-        cv_img = pil_to_cv2_bgr(base_pil)
-        preset = preset_menu.get()
-        intensity = tone_slider.get()
-        if preset != "None" or intensity > 0:
-            cv_img = filtering.apply_color_filter(cv_img, preset, intensity)
-        edited_image_pil = cv2_to_pil(cv_img)
-        display_image_in_centerbox()
+        render_adjustments()
     except Exception as e: messagebox.showerror("Filter Error", str(e))
 
 # -----------------------------------------------------------
@@ -416,18 +779,21 @@ def toggle_denoise_controls():
         denoise_controls_frame.grid_remove()
 
 def denoise_auto_action():
-    global edited_image_pil
     if not ensure_image_loaded(): return
     try:
-        base = loaded_image_pil
-        cv_img = pil_to_cv2_bgr(base)
-        _, s, m, sp = apply_auto_denoising_logic(cv_img)
+        base = get_committed_doc()
+        result, s, m, sp, method = apply_auto_denoising_logic(base.bgr, chroma_menu.get())
+        discard_pending_edit()
         denoise_strength_slider.set(s)
         denoise_strength_value.configure(text=str(int(s)))
         edge_preserving_switch.select() if m else edge_preserving_switch.deselect()
         salt_pepper_switch.select() if sp else salt_pepper_switch.deselect()
-        edited_image_pil = cv2_to_pil(apply_denoising_logic(cv_img, s, m, sp))
-        display_image_in_centerbox()
+        edge_method_menu.set(method)
+        if m and method == "guided_fast": chroma_menu.set("full")   # what auto ran
+        # Denoise is the first stage: the auto result is its output for these controls
+        if int(s) > 0:
+            adjust_cache[:] = [(base, adjustment_stages()[0][0], base.with_pixels(result))]
+        render_adjustments()
     except Exception as e: messagebox.showerror("Error", str(e))
 
 def schedule_manual_denoise_update(val=None):
@@ -437,19 +803,11 @@ def schedule_manual_denoise_update(val=None):
     denoise_update_after_id = app.after(150, apply_manual_denoise_now)
 
 def apply_manual_denoise_now():
-    global edited_image_pil, denoise_update_after_id
+    global denoise_update_after_id
     denoise_update_after_id = None
     if not ensure_image_loaded(): return
     try:
-        base = loaded_image_pil
-        cv_img = pil_to_cv2_bgr(base)
-        s = int(denoise_strength_slider.get())
-        if s > 0:
-            m = bool(edge_preserving_var.get())
-            sp = bool(salt_pepper_var.get())
-            cv_img = apply_denoising_logic(cv_img, s, m, sp)
-        edited_image_pil = cv2_to_pil(cv_img)
-        display_image_in_centerbox()
+        render_adjustments()
     except Exception as e: print(e)
 
 # -----------------------------------------------------------
@@ -478,20 +836,11 @@ def schedule_llie_update(value=None):
     llie_update_after_id = app.after(150, apply_llie_now)
 
 def apply_llie_now():
-    global edited_image_pil, llie_update_after_id
+    global llie_update_after_id
     llie_update_after_id = None
     if not ensure_image_loaded(): return
     try:
-        base_pil = loaded_image_pil
-        cv_img = pil_to_cv2_bgr(base_pil)
-        intensity_val = llie_int_slider.get()
-        if intensity_val > 0:
-            intensity = intensity_val / 100.0
-            detail = llie_det_slider.get() / 100.0
-            clip = llie_clip_slider.get()
-            cv_img = llie.enhance_image(cv_img, intensity=intensity, detail=detail, clahe_clip=clip)
-        edited_image_pil = cv2_to_pil(cv_img)
-        display_image_in_centerbox()
+        render_adjustments()
     except Exception as e: messagebox.showerror("Error", f"LLIE failed: {e}")
 
 # -----------------------------------------------------------
@@ -539,6 +888,24 @@ select_btn.grid(row=1, column=0, sticky="ew", pady=5)
 export_btn = ctk.CTkButton(left_panel, text="Export", fg_color=BUTTON_LEFT, text_color="black", command=export_image)
 export_btn.grid(row=2, column=0, sticky="ew", pady=5)
 
+export_options_frame = ctk.CTkFrame(left_panel, fg_color=BG_COLOR)
+export_options_frame.grid(row=3, column=0, sticky="ew")
+export_options_frame.grid_columnconfigure((0, 1, 2), weight=1)
+ctk.CTkLabel(export_options_frame, text="Quality (JPEG/WebP)", font=("Arial", 12), text_color=TEXT_COLOR).grid(row=0, column=0, columnspan=3, sticky="w")
+export_quality_slider = ctk.CTkSlider(export_options_frame, from_=1, to=100, number_of_steps=99)
+export_quality_slider.set(92)
+export_quality_slider.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(0, 5))
+export_size_vars = {}
+for i, label in enumerate(EXPORT_SIZES):
+    export_size_vars[label] = ctk.IntVar(value=1 if EXPORT_SIZES[label] is None else 0)
+    ctk.CTkCheckBox(export_options_frame, text=label, variable=export_size_vars[label], text_color=TEXT_COLOR).grid(row=2, column=i, sticky="w")
+export_format_vars = {}
+for i, label in enumerate(EXPORT_EXTRA_FORMATS):
+    export_format_vars[label] = ctk.IntVar(value=0)
+    ctk.CTkCheckBox(export_options_frame, text=label, variable=export_format_vars[label], text_color=TEXT_COLOR).grid(row=3, column=i, sticky="w", pady=(4, 0))
+export_status_label = ctk.CTkLabel(left_panel, text="", font=("Arial", 12), text_color=TEXT_COLOR)
+export_status_label.grid(row=4, column=0, sticky="w")
+
 # --- CENTER PANEL ---
 center_panel = ctk.CTkFrame(content_frame, fg_color=BG_COLOR)
 center_panel.grid(row=1, column=1, sticky="nsew", padx=20)
@@ -553,6 +920,14 @@ center_image_label.pack(expand=True)
 center_image_label.bind("<Button-1>", on_mouse_down)
 center_image_label.bind("<B1-Motion>", on_mouse_drag)
 center_image_label.bind("<ButtonRelease-1>", on_mouse_up)
+# Zoom (wheel) and pan (right or middle drag)
+center_image_label.bind("<MouseWheel>", on_mouse_wheel)
+center_image_label.bind("<Button-4>", on_mouse_wheel)
+center_image_label.bind("<Button-5>", on_mouse_wheel)
+for button in (2, 3):
+    center_image_label.bind(f"<Button-{button}>", on_pan_start)
+    center_image_label.bind(f"<B{button}-Motion>", on_pan_drag)
+    center_image_label.bind(f"<ButtonRelease-{button}>", on_pan_end)
 
 # --- RIGHT PANEL ---
 right_panel = ctk.CTkFrame(content_frame, fg_color=BG_COLOR)
@@ -590,6 +965,13 @@ edge_preserving_switch.grid(row=4, column=0, sticky="w")
 salt_pepper_var = ctk.IntVar(value=0)
 salt_pepper_switch = ctk.CTkSwitch(denoise_controls_frame, text="Salt & Pepper Fix", variable=salt_pepper_var, command=schedule_manual_denoise_update)
 salt_pepper_switch.grid(row=5, column=0, sticky="w")
+edge_method_menu = ctk.CTkOptionMenu(denoise_controls_frame, values=list(EDGE_METHODS), fg_color=BUTTON_RIGHT, text_color="black", command=schedule_manual_denoise_update)
+edge_method_menu.set("bilateral")
+edge_method_menu.grid(row=6, column=0, sticky="w", pady=(6, 0))
+# Chroma resolution: "half"/"quarter" denoise color at reduced resolution (faster on large photos)
+chroma_menu = ctk.CTkOptionMenu(denoise_controls_frame, values=list(CHROMA_MODES), fg_color=BUTTON_RIGHT, text_color="black", command=schedule_manual_denoise_update)
+chroma_menu.set("full")
+chroma_menu.grid(row=7, column=0, sticky="w", pady=(6, 0))
 denoise_controls_frame.grid_remove()
 
 llie_btn = ctk.CTkButton(right_panel, text="Low Light Enhance", fg_color=BUTTON_RIGHT, text_color="black", command=toggle_llie_controls)
@@ -639,8 +1021,24 @@ tone_slider.grid(row=9, column=0, sticky="ew", pady=5)
 preset_menu = ctk.CTkOptionMenu(right_panel, values=["None", "Warm", "Cool", "Sepia", "Cinematic", "Black & White"], fg_color=BUTTON_RIGHT, text_color="black", command=update_filter_preset)
 preset_menu.grid(row=10, column=0, sticky="e", pady=5)
 
+history_row = ctk.CTkFrame(right_panel, fg_color=BG_COLOR)
+history_row.grid(row=11, column=0, sticky="ew", pady=(25, 0))
+history_row.grid_columnconfigure((0, 1), weight=1)
+undo_btn = ctk.CTkButton(history_row, text="Undo", fg_color=BUTTON_RIGHT, text_color="black", command=undo_action)
+undo_btn.grid(row=0, column=0, sticky="ew", padx=(0, 4))
+redo_btn = ctk.CTkButton(history_row, text="Redo", fg_color=BUTTON_RIGHT, text_color="black", command=redo_action)
+redo_btn.grid(row=0, column=1, sticky="ew", padx=(4, 0))
+
+recipe_row = ctk.CTkFrame(right_panel, fg_color=BG_COLOR)
+recipe_row.grid(row=12, column=0, sticky="ew", pady=(10, 0))
+recipe_row.grid_columnconfigure((0, 1), weight=1)
+save_recipe_btn = ctk.CTkButton(recipe_row, text="Save recipe", fg_color=BUTTON_RIGHT, text_color="black", command=save_recipe_action)
+save_recipe_btn.grid(row=0, column=0, sticky="ew", padx=(0, 4))
+apply_recipe_btn = ctk.CTkButton(recipe_row, text="Apply recipe", fg_color=BUTTON_RIGHT, text_color="black", command=apply_recipe_action)
+apply_recipe_btn.grid(row=0, column=1, sticky="ew", padx=(4, 0))
+
 reset_btn = ctk.CTkButton(right_panel, text="Reset", fg_color=BUTTON_RIGHT, text_color="black", command=reset_image_action)
-reset_btn.grid(row=11, column=0, sticky="ew", pady=(25, 5))
+reset_btn.grid(row=13, column=0, sticky="ew", pady=(10, 5))
 
 # -----------------------------------------------------------
 # RESIZING LOGIC
@@ -660,7 +1058,8 @@ def resize_ui():
     btn_font = ("Arial", int(16 * scale))
 
     for btn in [select_btn, export_btn, remove_btn, denoise_btn, denoise_auto_btn,
-                llie_btn, llie_auto_btn, bg_remove_btn, flip_h_btn, flip_v_btn, reset_btn]:
+                llie_btn, llie_auto_btn, bg_remove_btn, flip_h_btn, flip_v_btn, undo_btn, redo_btn,
+                save_recipe_btn, apply_recipe_btn, reset_btn]:
         btn.configure(height=btn_height, corner_radius=btn_radius, font=btn_font)
 
     display_image_in_guidebox()
@@ -693,5 +1092,9 @@ app.bind("<Configure>", freeze_window_resize)
 app.bind("<Configure>", on_resize, add="+")
 guide_box.bind("<Configure>", lambda e: display_image_in_guidebox())
 image_box.bind("<Configure>", lambda e: display_image_in_centerbox())
+app.bind("<Control-z>", undo_action)
+app.bind("<Control-y>", redo_action)
+app.bind("<Control-0>", lambda e: set_zoom_action(None))   # fit
+app.bind("<Control-1>", lambda e: set_zoom_action(1))      # 1:1
 
 app.mainloop()
\ No newline at end of file
@@ -14,6 +14,11 @@ if /I "%1"=="test" (
     set CMAKE_FLAGS=-DBUILD_TESTING=ON
     set TARGET_FLAG=
 )
+if /I "%1"=="bench" (
+    set BUILD_MODE=Inpainter Benchmark
+    set CMAKE_FLAGS=-DBUILD_TESTING=OFF -DBUILD_BENCHMARKS=ON
+    set TARGET_FLAG=--target inpainter_bench
+)
 
 echo ==============================================
 echo    Compiling ObjectRemover (Windows)
@@ -64,6 +69,22 @@ if /I "%1"=="test" (
         exit /b 1
     )
 
+) else if /I "%1"=="bench" (
+    :: --- BENCHMARK MODE ---
+    echo ==============================================
+    echo    Running Inpainter Benchmark...
+    echo ==============================================
+
+    set "BENCH_BIN="
+    for /r %%f in (inpainter_bench.exe) do if exist "%%f" set "BENCH_BIN=%%f"
+    if not defined BENCH_BIN (
+        echo [ERROR] inpainter_bench.exe not found!
+        exit /b 1
+    )
+    "!BENCH_BIN!" --quick > inpainter_bench.out
+    type inpainter_bench.out
+    echo    [INFO] Results saved to .build\inpainter_bench.out
+
 ) else (
     :: --- RELEASE MODE (FREEZE) ---
     echo ==============================================
@@ -16,6 +16,10 @@ if [[ "$1" == "test" ]]; then
     BUILD_MODE="Library + Unit Tests"
     CMAKE_FLAGS="-DBUILD_TESTING=ON"
     TARGET_FLAG="" # Build everything (lib + tests)
+elif [[ "$1" == "bench" ]]; then
+    BUILD_MODE="Inpainter Benchmark"
+    CMAKE_FLAGS="-DBUILD_TESTING=OFF -DBUILD_BENCHMARKS=ON"
+    TARGET_FLAG="--target inpainter_bench"
 fi
 
 echo "=============================================="
@@ -64,6 +68,21 @@ if [[ "$1" == "test" ]]; then
         exit 1
     fi
 
+elif [[ "$1" == "bench" ]]; then
+    # --- BENCHMARK MODE ---
+    # Extra arguments are forwarded, e.g. ./scripts/build.sh bench --quick --format json
+    echo "=============================================="
+    echo "   Running Inpainter Benchmark...             "
+    echo "=============================================="
+
+    BENCH_BIN=$(find . -type f -name "inpainter_bench" | head -n 1)
+    if [ -z "$BENCH_BIN" ]; then
+        echo "[ERROR] inpainter_bench executable not found!"
+        exit 1
+    fi
+    "$BENCH_BIN" "${@:2}" | tee inpainter_bench.out
+    echo "   [INFO] Results saved to .build/inpainter_bench.out"
+
 else
     # --- RELEASE MODE (FREEZE) ---
     # Only copy to freezed_libs if we are NOT testing
@@ -0,0 +1 @@
+from .arena import BufferArena, scratch
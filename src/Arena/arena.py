@@ -0,0 +1,49 @@
+# arena.py
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class BufferArena:
+    """
+    Preallocated scratch and output buffers for repeated renders of one image.
+
+    Buffers are keyed by (tag, shape, dtype): a render at the same size gets the
+    same arrays back, so slider ticks allocate (and page-fault) nothing after
+    the first one. The tag names a use ("llie.ssr", "filter.out"...), so two
+    buffers alive in the same render never alias. A tag requested with another
+    shape or dtype replaces its old buffer, which bounds the arena to one
+    buffer per tag.
+
+    Contents are overwritten by the next render using the same tag: an output
+    taken from the arena is valid until then, and callers keeping a result
+    longer must copy it (a Document wrapping one is `borrowed`; see
+    Document.owned). Not thread-safe; use one arena per thread.
+    """
+
+    def __init__(self):
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def get(self, tag: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+        """Uninitialized buffer of `shape` and `dtype`, reused across calls with the same key."""
+        shape = tuple(int(n) for n in shape)
+        dtype = np.dtype(dtype)
+        buf = self._buffers.get(tag)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = np.empty(shape, dtype)
+            self._buffers[tag] = buf
+        return buf
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buf.nbytes for buf in self._buffers.values())
+
+    def clear(self):
+        self._buffers.clear()
+
+
+def scratch(arena: Optional[BufferArena], tag: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    """Buffer from `arena`, or a fresh uninitialized array when no arena is given."""
+    if arena is None:
+        return np.empty(shape, dtype)
+    return arena.get(tag, shape, dtype)
@@ -80,6 +80,27 @@ PYBIND11_MODULE(ObjectRemover_core, m) {
         
         // Process
         .def("process", &PatchRemover::process)
+
+        // Tuning: patch size and candidate stride (0 = automatic)
+        .def("set_config", [](PatchRemover& self, int patchSize, int searchStride) {
+                InpaintConfig config = self.getConfig();
+                config.patchSize = patchSize;
+                config.searchStride = searchStride;
+                self.setConfig(config);
+            }, py::arg("patch_size") = 9, py::arg("search_stride") = 0)
+
+        // Timings of the last process() call
+        .def("get_stats", [](const PatchRemover& self) {
+                const InpaintStats& s = self.getStats();
+                py::dict d;
+                d["iterations"] = s.iterations;
+                d["filled_pixels"] = s.filledPixels;
+                d["front_seconds"] = s.frontSeconds;
+                d["search_seconds"] = s.searchSeconds;
+                d["update_seconds"] = s.updateSeconds;
+                d["total_seconds"] = s.totalSeconds;
+                return d;
+            })
         
         // Save to disk
         .def("save", &PatchRemover::save)
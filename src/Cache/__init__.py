@@ -0,0 +1 @@
+from .cache import ResultCache, content_hash, get_cache
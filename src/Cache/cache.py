@@ -0,0 +1,190 @@
+# cache.py
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+CACHE_ENV = "VISUALBUNDLE_CACHE"                # cache directory, or "off" to disable
+CACHE_MAX_MB_ENV = "VISUALBUNDLE_CACHE_MAX_MB"
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024          # 1 GiB
+EVICT_TO = 0.9                                  # eviction frees down to this fraction of the limit
+STALE_TMP_SECONDS = 3600                        # older .tmp files are left over by crashed writers
+
+
+def content_hash(img: np.ndarray) -> str:
+    """Fast hash of the pixels, shape and dtype (xxh3 if installed, else blake2b)."""
+    data = np.ascontiguousarray(img)
+    h = xxhash.xxh3_128() if HAS_XXHASH else hashlib.blake2b(digest_size=16)
+    h.update(f"{data.shape}{data.dtype}".encode())
+    h.update(memoryview(data).cast("B"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent, content-addressed cache of expensive results (alpha masks, patched regions).
+
+    An entry is one compressed .npz file named after the key, written to a
+    temporary file and renamed into place, so concurrent readers and writers
+    in several processes never see a partial entry. Hits refresh the file's
+    mtime; once the directory exceeds max_bytes the least recently used
+    entries are deleted.
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.root = root or os.path.join(os.path.expanduser("~"), ".visualbundle", "cache")
+        if max_bytes is None:
+            env = os.environ.get(CACHE_MAX_MB_ENV)
+            max_bytes = int(float(env) * 1024 * 1024) if env else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(img: np.ndarray, op: str, params: Optional[dict] = None, model: Optional[str] = None) -> str:
+        """Key of `op` run on `img` with `params` and `model`."""
+        meta = json.dumps({"op": op, "params": params or {}, "model": model}, sort_keys=True, default=str)
+        return content_hash(img) + "-" + hashlib.blake2b(meta.encode(), digest_size=8).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Stored arrays of `key`, or None on a miss (unreadable entries count as misses)."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            with np.load(io.BytesIO(data)) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncated or corrupted entry (BadZipFile, zlib.error, bad header...)
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)   # LRU: a hit makes the entry the most recent one
+        except OSError:
+            pass
+        return arrays
+
+    def put(self, key: str, **arrays: np.ndarray) -> None:
+        """Stores `arrays` under `key` and evicts old entries if the size limit is exceeded."""
+        if self.max_bytes <= 0:
+            return
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Deletes least recently used entries until the cache fits; returns the bytes freed.
+        Temporary files older than STALE_TMP_SECONDS (orphaned by a crashed writer) count
+        as entries; recent ones may still be being written and are left alone.
+        """
+        entries = []
+        total = 0
+        stale_before = time.time() - STALE_TMP_SECONDS
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith((".npz", ".tmp")):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue   # evicted meanwhile by another process
+                if name.endswith(".tmp") and st.st_mtime > stale_before:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes * EVICT_TO:
+                break
+            if self._remove(path):
+                freed += size
+        return freed
+
+    def clear(self) -> None:
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith((".npz", ".tmp")):
+                    self._remove(os.path.join(dirpath, name))
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:   # already gone, or still open in another process (Windows)
+            return False
+
+
+# -----------------------------------------------------------
+# COMPACT RESULT ENCODINGS
+# -----------------------------------------------------------
+def changed_region(before: np.ndarray, after: np.ndarray) -> Tuple[int, int, np.ndarray]:
+    """(x, y, patch): the bounding box of the pixels that differ, cropped from `after`."""
+    diff = before != after
+    if diff.ndim == 3:
+        diff = diff.any(axis=2)
+    rows = np.flatnonzero(diff.any(axis=1))
+    if rows.size == 0:
+        return 0, 0, after[:0, :0]
+    cols = np.flatnonzero(diff.any(axis=0))
+    y0, y1, x0, x1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return int(x0), int(y0), after[y0:y1, x0:x1].copy()
+
+
+def apply_region(img: np.ndarray, x: int, y: int, patch: np.ndarray) -> np.ndarray:
+    """Copy of `img` with `patch` pasted at (x, y)."""
+    result = img.copy()
+    result[y:y + patch.shape[0], x:x + patch.shape[1]] = patch
+    return result
+
+
+# -----------------------------------------------------------
+# SHARED INSTANCE
+# -----------------------------------------------------------
+_default: Optional[ResultCache] = None
+_disabled = False
+
+
+def get_cache() -> Optional[ResultCache]:
+    """Process-wide cache in VISUALBUNDLE_CACHE (default ~/.visualbundle/cache); None if disabled."""
+    global _default, _disabled
+    if _default is None and not _disabled:
+        root = os.environ.get(CACHE_ENV)
+        if root and root.lower() in ("off", "0", "none"):
+            _disabled = True
+            return None
+        try:
+            _default = ResultCache(root or None)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Result cache disabled: {e}")
+            _disabled = True
+    return _default
@@ -1,6 +1,29 @@
 import cv2
 import numpy as np
 
+# Filtre disponibile pentru modul "Edge-Preserving"
+EDGE_METHODS = ("bilateral", "guided", "guided_fast")
+GUIDED_SUBSAMPLE = 4          # factorul de subeșantionare pentru "guided_fast"
+GUIDED_MIN_PIXELS = 2_000_000   # peste această rezoluție, auto alege guided filter
+GUIDED_FAST_MIN_PIXELS = 12_000_000
+NLM_TEMPLATE = 7               # ferestrele NLM (pot fi ajustate de profilul de tuning al mașinii)
+NLM_SEARCH = 21
+
+# Reparare selectivă Salt & Pepper
+SP_METHODS = ("adaptive", "median")
+IMPULSE_LOW, IMPULSE_HIGH = 2, 253   # aceleași praguri ca detecția din get_auto_params
+IMPULSE_DELTA = 48                   # abaterea minimă față de mediana vecinilor pentru a fi impuls
+IMPULSE_MAX_RADIUS = 3               # fereastra adaptivă crește 3x3 -> 5x5 -> 7x7
+IMPULSE_REGION_RADIUS = 2            # fereastra 5x5 a testului de zonă saturată
+IMPULSE_REGION_NEIGHBORS = 8         # vecini (din 24) la fel de saturați => zonă saturată (colțul unui pătrat are 8)
+IMPULSE_CHUNK = 1 << 18              # candidați procesați deodată (limitează memoria)
+
+# Mod rapid: luminanța la rezoluție completă, crominanța (zgomot de joasă frecvență) subeșantionată
+CHROMA_MODES = ("full", "half", "quarter")
+CHROMA_SUBSAMPLE = {"full": 1, "half": 2, "quarter": 4}
+CHROMA_GUIDE_RADIUS = 2              # raza guided upsampling-ului, în pixeli la rezoluție redusă
+CHROMA_GUIDE_EPS = (0.02 * 255) ** 2
+
 # ==========================================================
 # SECȚIUNEA 1: LOGICA DE PROCESARE (Clasa principală)
 # ==========================================================
@@ -22,19 +45,31 @@ class ImageDenoiser:
         sp_ratio = (np.sum(gray <= 2) + np.sum(gray >= 253)) / gray.size
         needs_sp_fix = sp_ratio > 0.005 
 
+        edge_method = self.get_auto_edge_method(image)
+
         if noise_val < 150:
-            return 5, True, needs_sp_fix
+            return 5, True, needs_sp_fix, edge_method
         elif noise_val < 600:
-            return 10, True, needs_sp_fix
+            return 10, True, needs_sp_fix, edge_method
         else:
-            return 12, False, needs_sp_fix
+            return 12, False, needs_sp_fix, edge_method
+
+    @staticmethod
+    def get_auto_edge_method(image: np.ndarray) -> str:
+        """Bilateral pe imagini mici, guided filter (O(1) per pixel) pe imagini mari."""
+        pixels = image.shape[0] * image.shape[1]
+        if pixels >= GUIDED_FAST_MIN_PIXELS:
+            return "guided_fast"
+        if pixels >= GUIDED_MIN_PIXELS:
+            return "guided"
+        return "bilateral"
         
     @staticmethod
     def denoise_nlm(image, strength):
         h = max(1, strength)
-        if len(image.shape) > 2:
-            return cv2.fastNlMeansDenoisingColored(image, None, h, h, 7, 21)
-        return cv2.fastNlMeansDenoising(image, None, h, 7, 21)
+        if image.ndim == 3 and image.shape[2] == 3:
+            return cv2.fastNlMeansDenoisingColored(image, None, h, h, NLM_TEMPLATE, NLM_SEARCH)
+        return cv2.fastNlMeansDenoising(image, None, h, NLM_TEMPLATE, NLM_SEARCH)
 
     @staticmethod
     def denoise_bilateral(image, strength):
@@ -42,20 +77,245 @@ class ImageDenoiser:
         s_color = strength * 5
         return cv2.bilateralFilter(image, d, s_color, 75)
 
+    @staticmethod
+    def guided_params(strength):
+        """Raza ferestrei și regularizarea (eps, pe scara 0..255) pentru guided filter."""
+        radius = 2 + int(strength) // 4
+        eps = (2.0 * max(1, strength)) ** 2
+        return radius, eps
+
+    @staticmethod
+    def denoise_guided(image, strength, subsample=1):
+        """
+        Guided filter (He et al.) cu imaginea ca propriul ghid, pe fiecare canal.
+        Doar box filtere => cost O(1) per pixel, indiferent de rază.
+        subsample > 1: coeficienții a, b se calculează la rezoluție redusă (varianta rapidă),
+        pe imaginea bordată până la un multiplu de subsample: factorul rămâne întreg, deci
+        grila redusă e aceeași pentru imaginea întreagă și pentru orice regiune aliniată.
+        """
+        radius, eps = ImageDenoiser.guided_params(strength)
+        I = image.astype(np.float32)
+        h, w = image.shape[:2]
+
+        if subsample > 1:
+            pad_y, pad_x = -h % subsample, -w % subsample
+            if pad_y or pad_x:
+                I = cv2.copyMakeBorder(I, 0, pad_y, 0, pad_x, cv2.BORDER_REPLICATE)
+            small_size = ((w + pad_x) // subsample, (h + pad_y) // subsample)
+            p = cv2.resize(I, small_size, interpolation=cv2.INTER_AREA)
+            radius = max(1, round(radius / subsample))
+        else:
+            p = I
+
+        # Operațiile cv2 sunt multi-thread, spre deosebire de aritmetica NumPy
+        ksize = (2 * radius + 1, 2 * radius + 1)
+        mean = cv2.boxFilter(p, -1, ksize)
+        var = cv2.subtract(cv2.boxFilter(cv2.multiply(p, p), -1, ksize), cv2.multiply(mean, mean))
+        a = cv2.divide(var, cv2.add(var, eps))
+        b = cv2.subtract(mean, cv2.multiply(a, mean))
+        a = cv2.boxFilter(a, -1, ksize)
+        b = cv2.boxFilter(b, -1, ksize)
+
+        if subsample > 1:
+            a = cv2.resize(a, (I.shape[1], I.shape[0]), interpolation=cv2.INTER_LINEAR)
+            b = cv2.resize(b, (I.shape[1], I.shape[0]), interpolation=cv2.INTER_LINEAR)
+
+        # q = a*I + b >= 0 (a in [0,1), b >= 0), deci convertScaleAbs = rotunjire cu saturare
+        return cv2.convertScaleAbs(cv2.add(cv2.multiply(a, I), b))[:h, :w]
+
+    @staticmethod
+    def _neighbor_median(image, gray, bad, ys, xs, radius):
+        """
+        Mediana (per canal) a vecinilor care nu sunt candidați-impuls, în fereastra (2r+1)^2.
+        Returnează (mediana, mediana gri, numărul de vecini valizi) pentru fiecare candidat.
+        """
+        d = np.arange(-radius, radius + 1)
+        dy, dx = np.meshgrid(d, d, indexing="ij")
+        keep = (dy != 0) | (dx != 0)
+        # Marginile se replică prin limitarea indicilor (fără o copie bordată a imaginii)
+        ny = np.clip(ys[:, None] + dy[keep][None, :], 0, image.shape[0] - 1)
+        nx = np.clip(xs[:, None] + dx[keep][None, :], 0, image.shape[1] - 1)
+
+        valid = bad[ny, nx] == 0
+        count = valid.sum(axis=1)
+        k = np.maximum(count - 1, 0) // 2
+
+        # Vecinii invalizi primesc o santinelă care ajunge la capătul sortării
+        def median(values):
+            values = np.where(valid, values.astype(np.int16), np.int16(1000))
+            values.sort(axis=1)
+            return np.take_along_axis(values, k[:, None], axis=1)[:, 0]
+
+        gray_med = median(gray[ny, nx])
+        if image.ndim == 2:
+            return gray_med, gray_med, count
+        channels = [median(image[ny, nx, c]) for c in range(image.shape[2])]
+        return np.stack(channels, axis=1), gray_med, count
+
+    @staticmethod
+    def _in_saturated_region(gray, ys, xs):
+        """
+        True pentru candidații cu cel puțin IMPULSE_REGION_NEIGHBORS vecini 5x5 saturați
+        în același sens (negru lângă negru, alb lângă alb): marginea unei zone negre sau
+        albe reale, nu un impuls izolat.
+        """
+        d = np.arange(-IMPULSE_REGION_RADIUS, IMPULSE_REGION_RADIUS + 1)
+        dy, dx = np.meshgrid(d, d, indexing="ij")
+        keep = (dy != 0) | (dx != 0)
+        ny = ys[:, None] + dy[keep][None, :]
+        nx = xs[:, None] + dx[keep][None, :]
+        # Vecinii din afara imaginii nu se numără (limitarea indicilor ar număra pixelul însuși)
+        inside = (ny >= 0) & (ny < gray.shape[0]) & (nx >= 0) & (nx < gray.shape[1])
+        values = gray[np.clip(ny, 0, gray.shape[0] - 1), np.clip(nx, 0, gray.shape[1] - 1)]
+        dark = (gray[ys, xs] <= IMPULSE_LOW)[:, None]
+        same = np.where(dark, values <= IMPULSE_LOW, values >= IMPULSE_HIGH) & inside
+        return same.sum(axis=1) >= IMPULSE_REGION_NEIGHBORS
+
+    @staticmethod
+    def repair_impulses(image):
+        """
+        Reparare adaptivă a zgomotului impulsiv (Salt & Pepper).
+        Pixelii extremi devin candidați (listă rară de indici); cei din zone saturate reale
+        (_in_saturated_region) sunt păstrați. Un candidat e impuls doar dacă diferă puternic
+        de mediana vecinilor non-impuls, și numai atunci e înlocuit cu ea.
+        Costul depinde de numărul de impulsuri, pixelii curați rămân neatinși.
+        Fără candidați, imaginea de intrare e returnată ca atare (nu o copie).
+        """
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        # Detecția e singura trecere completă: operații cv2, multi-thread
+        bad = cv2.bitwise_not(cv2.inRange(gray, IMPULSE_LOW + 1, IMPULSE_HIGH - 1))
+        points = cv2.findNonZero(bad)
+        if points is None:
+            return image
+        points = points.reshape(-1, 2)
+        xs, ys = points[:, 0], points[:, 1]
+        result = image.copy()
+
+        for start in range(0, ys.size, IMPULSE_CHUNK):
+            cy = ys[start:start + IMPULSE_CHUNK]
+            cx = xs[start:start + IMPULSE_CHUNK]
+            isolated = ~ImageDenoiser._in_saturated_region(gray, cy, cx)
+            cy, cx = cy[isolated], cx[isolated]
+            todo = np.arange(cy.size)
+            # Fereastra crește doar pentru candidații fără vecini valizi
+            for radius in range(1, IMPULSE_MAX_RADIUS + 1):
+                med, gray_med, count = ImageDenoiser._neighbor_median(image, gray, bad, cy[todo], cx[todo], radius)
+                found = count > 0
+                idx = todo[found]
+                impulse = np.abs(gray[cy[idx], cx[idx]].astype(np.int16) - gray_med[found]) > IMPULSE_DELTA
+                idx = idx[impulse]
+                result[cy[idx], cx[idx]] = med[found][impulse].astype(np.uint8)
+                todo = todo[~found]
+                if todo.size == 0:
+                    break
+        return result
+
+    @staticmethod
+    def guided_upsample(guide_small, src_small, guide):
+        """
+        Aduce planurile din src_small (H/s, W/s, C) la rezoluția ghidului (H, W) uint8:
+        coeficienții liniari src ~ a * ghid + b se estimează la rezoluție redusă și se
+        interpolează, apoi q = a * ghid + b la rezoluție completă, astfel marginile
+        crominanței urmează marginile luminanței.
+        """
+        h, w = guide.shape[:2]
+        ksize = (2 * CHROMA_GUIDE_RADIUS + 1, 2 * CHROMA_GUIDE_RADIUS + 1)
+        I = guide_small.astype(np.float32)
+        mean_i = cv2.boxFilter(I, -1, ksize)
+        var = cv2.subtract(cv2.boxFilter(cv2.multiply(I, I), -1, ksize), cv2.multiply(mean_i, mean_i))
+        var = cv2.add(var, CHROMA_GUIDE_EPS)
+
+        planes = []
+        for p in cv2.split(src_small.astype(np.float32)):
+            mean_p = cv2.boxFilter(p, -1, ksize)
+            cov = cv2.subtract(cv2.boxFilter(cv2.multiply(I, p), -1, ksize), cv2.multiply(mean_i, mean_p))
+            a = cv2.divide(cov, var)
+            b = cv2.subtract(mean_p, cv2.multiply(a, mean_i))
+            a = cv2.resize(cv2.boxFilter(a, -1, ksize), (w, h), interpolation=cv2.INTER_LINEAR)
+            b = cv2.resize(cv2.boxFilter(b, -1, ksize), (w, h), interpolation=cv2.INTER_LINEAR)
+            # Ghidul rămâne uint8; adunarea finală rotunjește și saturează direct în uint8
+            planes.append(cv2.add(cv2.multiply(a, guide, dtype=cv2.CV_32F), b, dtype=cv2.CV_8U))
+        return planes
+
+    def denoise_luma_chroma(self, image, strength, edge_preserving, edge_method="bilateral", subsample=2):
+        """
+        O singură conversie în YCrCb: luminanța e filtrată la rezoluție completă, Cr și Cb
+        la 1/subsample (INTER_AREA mediază deja o parte din zgomot) cu același filtru,
+        apoi readuse la rezoluție completă prin guided_upsample cu luminanța filtrată ca ghid.
+        """
+        def denoise(plane):
+            if edge_preserving:
+                return self.denoise_edge_preserving(plane, strength, edge_method)
+            return self.denoise_nlm(plane, strength)
+
+        h, w = image.shape[:2]
+        y, cr, cb = cv2.split(cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb))
+        y = denoise(y)
+
+        # Planurile de crominanță (și ghidul) se bordează până la un multiplu de subsample:
+        # factorul INTER_AREA rămâne întreg, deci grila redusă e aceeași pentru imaginea
+        # întreagă și pentru orice regiune aliniată (DenoiseOp)
+        pad_y, pad_x = -h % subsample, -w % subsample
+
+        def padded(plane):
+            if not (pad_y or pad_x):
+                return plane
+            return cv2.copyMakeBorder(plane, 0, pad_y, 0, pad_x, cv2.BORDER_REPLICATE)
+
+        # Planuri contigue: INTER_AREA cu factor întreg are o cale rapidă în OpenCV
+        small_size = ((w + pad_x) // subsample, (h + pad_y) // subsample)
+        cr, cb = (cv2.resize(padded(c), small_size, interpolation=cv2.INTER_AREA) for c in (cr, cb))
+        if edge_preserving and edge_method == "bilateral":
+            chroma = cv2.merge((denoise(cr), denoise(cb)))   # bilateralFilter acceptă doar 1 sau 3 canale
+        else:
+            chroma = denoise(cv2.merge((cr, cb)))   # NLM și guided: ambele planuri într-o singură trecere
+        guide = padded(y)
+        cr, cb = self.guided_upsample(cv2.resize(guide, small_size, interpolation=cv2.INTER_AREA), chroma, guide)
+        return cv2.cvtColor(cv2.merge((y, cr[:h, :w], cb[:h, :w])), cv2.COLOR_YCrCb2BGR)
+
+    def denoise_edge_preserving(self, image, strength, edge_method="bilateral"):
+        if edge_method == "bilateral":
+            return self.denoise_bilateral(image, strength)
+        if edge_method == "guided":
+            return self.denoise_guided(image, strength)
+        if edge_method == "guided_fast":
+            return self.denoise_guided(image, strength, subsample=GUIDED_SUBSAMPLE)
+        raise ValueError(f"Unknown edge-preserving method: {edge_method}")
+
 # ==========================================================
 # SECȚIUNEA 2: ENTRY POINT PENTRU OPTIUNI AVANSATE (SLIDERS)
 # ==========================================================
-def apply_denoising_logic(image: np.ndarray, strength: int, edge_preserving: bool, salt_pepper_fix: bool) -> np.ndarray:
-    """Această funcție va fi apelată de sliderele din 'Advanced Options'."""
+def apply_denoising_logic(image: np.ndarray, strength: int, edge_preserving: bool, salt_pepper_fix: bool,
+                          edge_method: str = "bilateral", sp_method: str = "adaptive",
+                          chroma_mode: str = "full") -> np.ndarray:
+    """
+    Această funcție va fi apelată de sliderele din 'Advanced Options'.
+    edge_method: unul din EDGE_METHODS, folosit când edge_preserving este True.
+    sp_method: unul din SP_METHODS, folosit când salt_pepper_fix este True.
+        "adaptive": repară doar impulsurile, înainte de denoising (să nu fie întinse de filtru);
+        "median": median blur pe toată imaginea, după denoising (comportamentul vechi).
+    chroma_mode: unul din CHROMA_MODES. "half"/"quarter": luminanța la rezoluție completă,
+        crominanța la 1/2 sau 1/4 (denoise_luma_chroma); "full": toate canalele BGR.
+    """
     denoiser = ImageDenoiser()
     if image is None: return None
+    if sp_method not in SP_METHODS:
+        raise ValueError(f"Unknown salt & pepper method: {sp_method}")
+    if chroma_mode not in CHROMA_MODES:
+        raise ValueError(f"Unknown chroma mode: {chroma_mode}")
 
-    if edge_preserving:
-        result = denoiser.denoise_bilateral(image, strength)
+    if salt_pepper_fix and sp_method == "adaptive":
+        image = denoiser.repair_impulses(image)
+
+    if chroma_mode != "full" and image.ndim == 3 and image.shape[2] == 3:
+        result = denoiser.denoise_luma_chroma(image, strength, edge_preserving, edge_method,
+                                              CHROMA_SUBSAMPLE[chroma_mode])
+    elif edge_preserving:
+        result = denoiser.denoise_edge_preserving(image, strength, edge_method)
     else:
         result = denoiser.denoise_nlm(image, strength)
 
-    if salt_pepper_fix:
+    if salt_pepper_fix and sp_method == "median":
         result = cv2.medianBlur(result, 5 if strength > 10 else 3)
 
     return result
@@ -63,20 +323,26 @@ def apply_denoising_logic(image: np.ndarray, strength: int, edge_preserving: boo
 # ==========================================================
 # SECȚIUNEA 2 B: ENTRY POINT PENTRU BUTONUL AUTO
 # ==========================================================
-def apply_auto_denoising_logic(image: np.ndarray):
+def apply_auto_denoising_logic(image: np.ndarray, chroma_mode: str = "full"):
     """
     Această funcție returnează și parametrii, nu doar imaginea.
     Folositoare pentru ca GUI-ul să actualizeze slider-ele automat.
+    chroma_mode: ca în apply_denoising_logic; ignorat când auto alege "guided_fast",
+    care lucrează deja la rezoluție redusă și nu câștigă nimic.
     """
     denoiser = ImageDenoiser()
-    if image is None: return None, 0, True, False
+    if image is None: return None, 0, True, False, "bilateral"
 
     # Calculăm valorile
-    strength, edge_preserving, salt_pepper_fix = denoiser.get_auto_params(image)
+    strength, edge_preserving, salt_pepper_fix, edge_method = denoiser.get_auto_params(image)
     
+    if edge_preserving and edge_method == "guided_fast":
+        chroma_mode = "full"
+
     # Procesăm imaginea cu aceste valori
-    result = apply_denoising_logic(image, strength, edge_preserving, salt_pepper_fix)
+    result = apply_denoising_logic(image, strength, edge_preserving, salt_pepper_fix, edge_method,
+                                   chroma_mode=chroma_mode)
 
     # Returnăm tot pachetul către colegii de la GUI
-    return result, strength, edge_preserving, salt_pepper_fix
+    return result, strength, edge_preserving, salt_pepper_fix, edge_method
 
@@ -0,0 +1,132 @@
+# document.py
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.Arena import BufferArena
+from src.Other.flip import Orientation
+
+
+class Document:
+    """
+    Image being edited, kept in the layout the processing code works on.
+
+    `bgr` is a contiguous (H, W, 3) uint8 array handed to src operations as is;
+    `alpha` is an optional (H, W) plane (background removal output), kept apart
+    so color edits neither touch nor copy it. Documents are treated as
+    immutable: an edit builds a new Document sharing the planes it did not
+    change. Conversion to RGB only happens at display size (`display`) and at
+    export (`to_pil`).
+
+    `arena` holds the buffers slider renders of this document write into; it is
+    freed with the document when another image is loaded. A render written there
+    is a *borrowed* document: its pixels are overwritten by the next render into
+    the same buffer, so it is only displayed or read right away, and `owned()`
+    copies it before it is kept (committed, stored in the history).
+    """
+
+    def __init__(self, bgr: np.ndarray, alpha: Optional[np.ndarray] = None, borrowed: bool = False):
+        if bgr.ndim != 3 or bgr.shape[2] != 3:
+            raise ValueError(f"Expected an (H, W, 3) BGR array, got {bgr.shape}")
+        if alpha is not None and alpha.shape != bgr.shape[:2]:
+            raise ValueError(f"Alpha plane {alpha.shape} does not match the image {bgr.shape[:2]}")
+        self.bgr = np.ascontiguousarray(bgr)
+        self.alpha = None if alpha is None else np.ascontiguousarray(alpha)
+        self.borrowed = borrowed
+        self._display = None   # (key, PIL image) of the last display() call
+        self._arena = None
+
+    # ------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------
+    @classmethod
+    def from_pil(cls, pil_img: Image.Image) -> "Document":
+        """One conversion at load time; transparency becomes the alpha plane."""
+        if pil_img.mode not in ("RGB", "RGBA"):
+            has_alpha = pil_img.mode in ("LA", "La", "PA") or "transparency" in pil_img.info
+            pil_img = pil_img.convert("RGBA" if has_alpha else "RGB")
+        arr = np.asarray(pil_img)
+        if arr.shape[2] == 4:
+            return cls(cv2.cvtColor(arr, cv2.COLOR_RGBA2BGR), arr[..., 3])
+        return cls(cv2.cvtColor(arr, cv2.COLOR_RGB2BGR))
+
+    @classmethod
+    def from_array(cls, arr: np.ndarray) -> "Document":
+        """From a BGR, BGRA or gray array (the layouts to_array, recipes and the history use)."""
+        if arr.ndim == 2:
+            return cls(cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR))
+        if arr.shape[2] == 4:
+            return cls(cv2.cvtColor(arr, cv2.COLOR_BGRA2BGR), arr[..., 3])
+        return cls(arr)
+
+    def with_pixels(self, bgr: np.ndarray, borrowed: bool = False) -> "Document":
+        """New document with edited color pixels (`borrowed`: an arena buffer); the alpha plane is shared."""
+        return Document(bgr, self.alpha if bgr.shape[:2] == self.bgr.shape[:2] else None, borrowed)
+
+    def owned(self) -> "Document":
+        """This document, or a copy of it when its pixels are borrowed from an arena."""
+        return Document(self.bgr.copy(), self.alpha) if self.borrowed else self
+
+    # ------------------------------------------------------
+    # Properties
+    # ------------------------------------------------------
+    @property
+    def size(self) -> Tuple[int, int]:
+        """(width, height), as PIL reports it."""
+        return self.bgr.shape[1], self.bgr.shape[0]
+
+    @property
+    def has_alpha(self) -> bool:
+        return self.alpha is not None
+
+    @property
+    def arena(self) -> BufferArena:
+        """Scratch and output buffers reused by repeated renders from this document."""
+        if self._arena is None:
+            self._arena = BufferArena()
+        return self._arena
+
+    # ------------------------------------------------------
+    # Conversions
+    # ------------------------------------------------------
+    def to_array(self) -> np.ndarray:
+        """BGR array (no copy), or a new BGRA array when there is an alpha plane."""
+        if self.alpha is None:
+            return self.bgr
+        bgra = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2BGRA)
+        bgra[..., 3] = self.alpha
+        return bgra
+
+    def display(self, size: Tuple[int, int], orientation: Optional[Orientation] = None) -> Image.Image:
+        """
+        RGB(A) PIL image resized to `size` (width, height, in the stored frame), then
+        oriented. Only the small copy is converted; the last result is memoized.
+        """
+        size = (max(1, int(size[0])), max(1, int(size[1])))
+        key = (size, repr(orientation))
+        if self._display is not None and self._display[0] == key:
+            return self._display[1]
+
+        interpolation = cv2.INTER_AREA if size[0] <= self.bgr.shape[1] else cv2.INTER_LANCZOS4
+        small = cv2.resize(self.bgr, size, interpolation=interpolation)
+        if self.alpha is not None:
+            rgba = cv2.cvtColor(small, cv2.COLOR_BGR2RGBA)
+            rgba[..., 3] = cv2.resize(self.alpha, size, interpolation=interpolation)
+            small = rgba
+        else:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+        if orientation is not None:
+            small = orientation.materialize(small)
+        pil = Image.fromarray(small)
+        self._display = (key, pil)
+        return pil
+
+    def to_pil(self) -> Image.Image:
+        """Full-resolution RGB(A) PIL image, for export."""
+        if self.alpha is None:
+            return Image.fromarray(cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB))
+        rgba = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGBA)
+        rgba[..., 3] = self.alpha
+        return Image.fromarray(rgba, "RGBA")
@@ -0,0 +1 @@
+from .exporter import ExportTarget, ExportJob, Exporter, export_one, FORMATS
@@ -0,0 +1,182 @@
+# exporter.py
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+from PIL import Image
+
+from src.Other.flip import Orientation
+
+# Extension -> PIL format name
+FORMATS = {
+    ".jpg": "JPEG", ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".webp": "WEBP",
+    ".tif": "TIFF", ".tiff": "TIFF",
+}
+
+TIFF_COMPRESSIONS = ("tiff_deflate", "tiff_lzw", "tiff_adobe_deflate", "raw")
+
+# Process umask, read once: os.umask() can only be queried by setting it, which
+# is not safe once encoder threads are creating files
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@dataclass
+class ExportTarget:
+    """
+    One output file.
+
+    path: destination; the format is taken from `format` or the extension.
+    quality: 1..100 (JPEG, WebP; lossless WebP when 100 and lossless=True).
+    compress_level: 0..9 for PNG (higher = smaller, slower).
+    tiff_compression: one of TIFF_COMPRESSIONS.
+    max_size: optional long-edge size in pixels (downscaled copy, never upscaled).
+    """
+    path: str
+    format: Optional[str] = None
+    quality: int = 92
+    compress_level: int = 6
+    lossless: bool = False
+    tiff_compression: str = "tiff_deflate"
+    max_size: Optional[int] = None
+
+    def resolved_format(self) -> str:
+        if self.format:
+            return self.format.upper().replace("JPG", "JPEG")
+        ext = os.path.splitext(self.path)[1].lower()
+        if ext not in FORMATS:
+            raise ValueError(f"Unsupported export format: {ext or self.path}")
+        return FORMATS[ext]
+
+
+def _prepare(img: Image.Image, target: ExportTarget, fmt: str,
+             orientation: Optional[Orientation] = None) -> Image.Image:
+    """Image to encode for `target`: never `img` itself, which other workers are saving too."""
+    source = img
+    if target.max_size and max(img.size) > target.max_size:
+        scale = target.max_size / max(img.size)
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                         Image.Resampling.LANCZOS)
+    # Orientation is materialized last, on the (possibly) downscaled copy
+    if orientation is not None and not orientation.is_identity():
+        img = orientation.apply_pil(img)
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        # JPEG has no alpha: flatten on white
+        rgba = img.convert("RGBA")
+        flat = Image.new("RGB", img.size, (255, 255, 255))
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        img = flat
+    # save() stores its options on the image (encoderinfo): each target needs its own object
+    return img.copy() if img is source else img
+
+
+def _save_options(target: ExportTarget, fmt: str) -> dict:
+    if fmt == "JPEG":
+        return {"quality": target.quality, "optimize": True}
+    if fmt == "PNG":
+        return {"compress_level": target.compress_level}
+    if fmt == "WEBP":
+        return {"quality": target.quality, "lossless": target.lossless, "method": 4}
+    if fmt == "TIFF":
+        return {"compression": None if target.tiff_compression == "raw" else target.tiff_compression}
+    return {}
+
+
+def _target_mode(path: str) -> int:
+    """Mode of the file being replaced, or the default 0666 & ~umask for a new file."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def export_one(img: Image.Image, target: ExportTarget, orientation: Optional[Orientation] = None) -> str:
+    """Encodes `img` for `target` and writes it atomically (temp file + rename)."""
+    fmt = target.resolved_format()
+    out = _prepare(img, target, fmt, orientation)
+    directory = os.path.dirname(os.path.abspath(target.path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".export_", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            out.save(f, format=fmt, **_save_options(target, fmt))
+        # mkstemp creates the file 0600: give it the mode a plain save() would have
+        os.chmod(tmp_path, _target_mode(target.path))
+        os.replace(tmp_path, target.path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return target.path
+
+
+class ExportJob:
+    """Handle for one export request (one or more targets encoded in parallel)."""
+
+    def __init__(self, futures: List[Future]):
+        self._futures = futures
+        self._lock = threading.Lock()
+        self._completed = 0
+
+    def _on_target_done(self, _):
+        with self._lock:
+            self._completed += 1
+
+    def progress(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._completed, len(self._futures)
+
+    def done(self) -> bool:
+        return all(f.done() for f in self._futures)
+
+    def results(self) -> List[Tuple[str, Optional[BaseException]]]:
+        """(path or None, error or None) per target, blocking until finished."""
+        out = []
+        for f in self._futures:
+            err = f.exception()
+            out.append((None if err else f.result(), err))
+        return out
+
+
+class Exporter:
+    """
+    Background export service.
+
+    Encoding runs on worker threads (Pillow's encoders release the GIL), so the
+    caller's thread stays free. Images are treated as read-only: callers must not
+    modify an image in place while it is being exported.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                        thread_name_prefix="export")
+
+    def submit(self, img: Image.Image, targets: List[ExportTarget],
+               on_progress: Optional[Callable[[int, int], None]] = None,
+               orientation: Optional[Orientation] = None) -> ExportJob:
+        """
+        Starts encoding `img` once per target. `on_progress(done, total)` is called
+        from a worker thread after each target finishes. A lazy `orientation` is
+        applied by the workers.
+        """
+        if not targets:
+            raise ValueError("No export targets given")
+        img.load()
+        for t in targets:
+            t.resolved_format()  # fail fast on unsupported formats
+
+        orientation = orientation.copy() if orientation is not None else None
+        futures = [self._pool.submit(export_one, img, t, orientation) for t in targets]
+        job = ExportJob(futures)
+        for f in futures:
+            f.add_done_callback(job._on_target_done)
+            if on_progress is not None:
+                f.add_done_callback(lambda _: on_progress(*job.progress()))
+        return job
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -1,55 +1,57 @@
 import cv2
 import numpy as np
+from src.Arena import scratch
 from src.Filtering import build_cinematic_lut, build_cool_lut, build_sepia_lut, build_warm_lut
 
-def apply_lut(img, lut):
+def apply_lut(img, lut, dst=None):
     """
     Apply a 3-channel LUT correctly (per channel).
+    One cv2.LUT call with a (256, 1, 3) table: no split/merge copies.
     """
-    b, g, r = cv2.split(img)
-    b = cv2.LUT(b, lut[:, 0])
-    g = cv2.LUT(g, lut[:, 1])
-    r = cv2.LUT(r, lut[:, 2])
-    return cv2.merge((b, g, r))
+    return cv2.LUT(img, np.ascontiguousarray(lut).reshape(256, 1, 3), dst=dst)
 
-def apply_color_filter(img, preset_name, intensity_percent):
+def apply_color_filter(img, preset_name, intensity_percent, dst=None, arena=None):
     """
     img: BGR uint8 image
     preset_name: string from dropdown
     intensity_percent: 0–100 (slider)
+    dst: optional output buffer (same shape as img)
+    arena: optional src.Arena.BufferArena for the intermediate filtered image
     """
 
     intensity = np.clip(intensity_percent / 100.0, 0.0, 1.0)
 
+    filtered = scratch(arena, "filter.filtered", img.shape)
+
     if preset_name == "Warm":
         lut = build_warm_lut()
-        filtered = apply_lut(img, lut)
+        apply_lut(img, lut, dst=filtered)
 
     elif preset_name == "Cool":
         lut = build_cool_lut()
-        filtered = apply_lut(img, lut)
+        apply_lut(img, lut, dst=filtered)
 
     elif preset_name == "Sepia":
         lut = build_sepia_lut()
-        filtered = apply_lut(img, lut)
+        apply_lut(img, lut, dst=filtered)
 
     elif preset_name == "Cinematic":
         lut = build_cinematic_lut()
-        filtered = apply_lut(img, lut)
+        apply_lut(img, lut, dst=filtered)
 
     elif preset_name == "Black & White":
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        filtered = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=scratch(arena, "filter.gray", img.shape[:2]))
+        cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR, dst=filtered)
 
     else:
-        # No filter
-        filtered = img.copy()
+        # No filter (read-only, so the input itself is blended)
+        filtered = img
 
     # Blend original and filtered image
     output = cv2.addWeighted(
         img, 1.0 - intensity,
         filtered, intensity,
-        0
+        0, dst=dst
     )
 
     return output
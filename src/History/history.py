@@ -0,0 +1,215 @@
+# history.py
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from src.Other.flip import ORIENTATION_OPS, Orientation
+
+# Storage levels of a history entry
+_RAW, _COMPRESSED, _DISK = 0, 1, 2
+
+
+class _Entry:
+    """One undo step: a transform name, a list of changed tiles or a full snapshot."""
+
+    def __init__(self, kind: str, payload, nbytes: int):
+        self.kind = kind          # "transform" | "tiles" | "snapshot"
+        self.payload = payload    # raw object, zlib bytes or a file path (see level)
+        self.level = _RAW
+        self.nbytes = nbytes
+
+    def load(self):
+        if self.level == _RAW:
+            return self.payload
+        if self.level == _DISK:
+            with open(self.payload, "rb") as f:
+                data = f.read()
+        else:
+            data = self.payload
+        return pickle.loads(zlib.decompress(data))
+
+    def compress(self):
+        if self.level != _RAW or self.kind == "transform":
+            return
+        self.payload = zlib.compress(pickle.dumps(self.payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        self.level = _COMPRESSED
+        self.nbytes = len(self.payload)
+
+    def spill(self, directory: str, name: str):
+        if self.kind == "transform" or self.level == _DISK:
+            return
+        self.compress()
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(self.payload)
+        self.payload = path
+        self.level = _DISK
+        self.nbytes = 0
+
+    def discard(self):
+        if self.level == _DISK and os.path.exists(self.payload):
+            os.remove(self.payload)
+
+
+class EditHistory:
+    """
+    Undo/redo stack storing edits as tiled copy-on-write deltas.
+
+    - Transforms (flips, 90° rotations) cost nothing: only the operation name
+      is kept. When an Orientation is passed to undo/redo, transform steps
+      update it instead of touching pixels.
+    - Pixel edits keep the before/after content of the tiles that changed,
+      so memory grows with the edited area, not with the number of steps.
+    - Edits that change the image shape or channel count (e.g. background
+      removal RGB -> RGBA) fall back to a full snapshot.
+    - Entries older than `hot_levels` are zlib-compressed; when the total
+      exceeds `memory_limit_mb` the oldest entries are spilled to disk.
+    """
+
+    def __init__(self, tile_size: int = 256, memory_limit_mb: float = 512,
+                 hot_levels: int = 2, spill_dir: Optional[str] = None):
+        self.tile_size = tile_size
+        self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        self.hot_levels = hot_levels
+        self._spill_root = spill_dir
+        self._spill_dir = None
+        self._undo: List[_Entry] = []
+        self._redo: List[_Entry] = []
+        self._counter = 0
+
+    # ------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------
+    def push_transform(self, name: str):
+        if name not in ORIENTATION_OPS:
+            raise ValueError(f"Unknown transform: {name}")
+        self._push(_Entry("transform", name, 0))
+
+    def push(self, before: np.ndarray, after: np.ndarray):
+        """Record a pixel edit from `before` to `after`."""
+        if before.shape != after.shape or before.dtype != after.dtype:
+            payload = (before.copy(), after.copy())
+            self._push(_Entry("snapshot", payload, before.nbytes + after.nbytes))
+            return
+
+        t = self.tile_size
+        h, w = before.shape[:2]
+        tiles = []
+        nbytes = 0
+        for y in range(0, h, t):
+            for x in range(0, w, t):
+                b = before[y:y + t, x:x + t]
+                a = after[y:y + t, x:x + t]
+                if not np.array_equal(b, a):
+                    tiles.append((y, x, b.copy(), a.copy()))
+                    nbytes += b.nbytes * 2
+        if tiles:
+            self._push(_Entry("tiles", tiles, nbytes))
+
+    def _push(self, entry: _Entry):
+        for old in self._redo:
+            old.discard()
+        self._redo.clear()
+        self._undo.append(entry)
+        self._enforce_limits()
+
+    # ------------------------------------------------------
+    # Navigation
+    # ------------------------------------------------------
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def next_undo_kind(self) -> Optional[str]:
+        """"transform", "tiles" or "snapshot" for the step undo() would revert."""
+        return self._undo[-1].kind if self._undo else None
+
+    def next_redo_kind(self) -> Optional[str]:
+        return self._redo[-1].kind if self._redo else None
+
+    def undo(self, current: np.ndarray, orientation: Optional[Orientation] = None) -> np.ndarray:
+        """Returns the image before the last recorded edit."""
+        if not self._undo:
+            return current
+        entry = self._undo.pop()
+        result = self._apply(entry, current, forward=False, orientation=orientation)
+        self._redo.append(entry)
+        self._enforce_limits()
+        return result
+
+    def redo(self, current: np.ndarray, orientation: Optional[Orientation] = None) -> np.ndarray:
+        """Returns the image after re-applying the last undone edit."""
+        if not self._redo:
+            return current
+        entry = self._redo.pop()
+        result = self._apply(entry, current, forward=True, orientation=orientation)
+        self._undo.append(entry)
+        self._enforce_limits()
+        return result
+
+    @staticmethod
+    def _apply(entry: _Entry, current: np.ndarray, forward: bool,
+               orientation: Optional[Orientation] = None) -> np.ndarray:
+        payload = entry.load()
+        if entry.kind == "transform":
+            op = payload if forward else ORIENTATION_OPS[payload]
+            if orientation is not None:
+                orientation.apply_op(op)
+                return current
+            return Orientation().apply_op(op).materialize(current)
+        if entry.kind == "snapshot":
+            return (payload[1] if forward else payload[0]).copy()
+
+        out = current.copy()
+        for y, x, before, after in payload:
+            tile = after if forward else before
+            out[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+        return out
+
+    # ------------------------------------------------------
+    # Memory management
+    # ------------------------------------------------------
+    def memory_usage(self) -> int:
+        return sum(e.nbytes for e in self._undo) + sum(e.nbytes for e in self._redo)
+
+    def _enforce_limits(self):
+        # Entries are ordered oldest -> newest: undo stack, then redo stack reversed
+        entries = self._undo + self._redo[::-1]
+        hot = set(map(id, self._undo[-self.hot_levels:] + self._redo[-self.hot_levels:])) if self.hot_levels else set()
+        for e in entries:
+            if id(e) not in hot:
+                e.compress()
+
+        for e in entries:
+            if self.memory_usage() <= self.memory_limit:
+                break
+            if e.kind != "transform" and e.level != _DISK:
+                e.spill(self._get_spill_dir(), f"step_{self._counter}.bin")
+                self._counter += 1
+
+    def _get_spill_dir(self) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="visualbundle_history_", dir=self._spill_root)
+        return self._spill_dir
+
+    def clear(self):
+        for e in self._undo + self._redo:
+            e.discard()
+        self._undo.clear()
+        self._redo.clear()
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def __del__(self):
+        try:
+            self.clear()
+        except Exception:
+            pass
@@ -1,8 +1,18 @@
 import numpy as np
 import cv2
+from src.Arena import scratch
 from src.Llie import apply_clahe_color,  unsharp_mask, combine_adaptive, single_scale_retinex
 
-def enhance_image(img, intensity=0.2, detail=0.3, clahe_clip=2.0, tile_grid=(8, 8)):
+def ssr_sigma(detail):
+    """SSR surround sigma for a detail value: small detail => larger sigma."""
+    min_sigma = 10.0
+    max_sigma = 80.0
+    # If detail high -> small sigma to preserve fine structures; detail low -> large sigma for smoother illumination
+    return max_sigma - (max_sigma - min_sigma) * detail
+
+
+def enhance_image(img, intensity=0.2, detail=0.3, clahe_clip=2.0, tile_grid=(8, 8), ssr_range=None,
+                  dst=None, arena=None):
     """Main enhancement function exposed to GUI.
 
 
@@ -12,6 +22,10 @@ def enhance_image(img, intensity=0.2, detail=0.3, clahe_clip=2.0, tile_grid=(8,
     detail: float in [0,1] — controls detail enhancement strength.
     clahe_clip: CLAHE clip limit.
     tile_grid: CLAHE tile grid size tuple.
+    ssr_range: optional global SSR normalization range (see ssr_value_range).
+    dst: optional output buffer (same shape as img).
+    arena: optional src.Arena.BufferArena; with it (and dst), repeated calls at the
+    same size allocate no full-frame arrays.
 
 
     Returns:
@@ -25,18 +39,18 @@ def enhance_image(img, intensity=0.2, detail=0.3, clahe_clip=2.0, tile_grid=(8,
 
 
     # Step 1: CLAHE on luminance
-    clahe_img = apply_clahe_color(img, clip_limit=clahe_clip, tile_grid_size=tile_grid)
+    clahe_img = apply_clahe_color(img, clip_limit=clahe_clip, tile_grid_size=tile_grid,
+                                  dst=scratch(arena, "llie.clahe", img.shape), arena=arena)
 
 
     # Step 2: SSR — adapt sigma based on detail (small detail => larger sigma?)
     # We'll make sigma inversely proportional to detail to keep fine details when detail slider high
-    min_sigma = 10.0
-    max_sigma = 80.0
-    # If detail high -> small sigma to preserve fine structures; detail low -> large sigma for smoother illumination
-    sigma = max_sigma - (max_sigma - min_sigma) * detail
-    ssr_img = single_scale_retinex(img, sigma=sigma)
+    sigma = ssr_sigma(detail)
+    ssr_img = single_scale_retinex(img, sigma=sigma, value_range=ssr_range,
+                                   dst=scratch(arena, "llie.ssr", img.shape), arena=arena)
 
 
     # Step 3: Combine adaptively
-    out = combine_adaptive(img, clahe_img, ssr_img, intensity=float(intensity), detail=float(detail))
+    out = combine_adaptive(img, clahe_img, ssr_img, intensity=float(intensity), detail=float(detail),
+                           dst=dst, arena=arena)
     return out
\ No newline at end of file
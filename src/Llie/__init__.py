@@ -1,6 +1,6 @@
 from .clahe import apply_clahe_color
 from .umask import  unsharp_mask
-from .ssr import single_scale_retinex
+from .ssr import single_scale_retinex, ssr_value_range
 from .clahe_ssr import combine_adaptive
 from .Llie import enhance_image
 
@@ -1,7 +1,8 @@
 import cv2
 import numpy as np
+from src.Arena import scratch
 
-def apply_clahe_color(img, clip_limit=2.0, tile_grid_size=(8, 8)):
+def apply_clahe_color(img, clip_limit=2.0, tile_grid_size=(8, 8), dst=None, arena=None):
     """Apply CLAHE to the luminance (Y) channel of a color image.
 
 
@@ -9,16 +10,18 @@ def apply_clahe_color(img, clip_limit=2.0, tile_grid_size=(8, 8)):
         img: BGR uint8 image.
         clip_limit: CLAHE clip limit.
         tile_grid_size: tile grid size for CLAHE.
+        dst: optional output buffer (same shape as img).
+        arena: optional src.Arena.BufferArena for the YCrCb intermediates.
 
 
     Returns:
         BGR uint8 image with CLAHE applied on luminance.
     """
-    # Convert to YCrCb
-    ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb)
-    y, cr, cb = cv2.split(ycrcb)
+    # Convert to YCrCb; only Y is taken out and put back (no split/merge of all planes)
+    ycrcb = cv2.cvtColor(img, cv2.COLOR_BGR2YCrCb, dst=scratch(arena, "clahe.ycrcb", img.shape))
+    y = cv2.extractChannel(ycrcb, 0, dst=scratch(arena, "clahe.y", img.shape[:2]))
     clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
-    y_clahe = clahe.apply(y)
-    ycrcb_clahe = cv2.merge((y_clahe, cr, cb))
-    out = cv2.cvtColor(ycrcb_clahe, cv2.COLOR_YCrCb2BGR)
+    y_clahe = clahe.apply(y, dst=scratch(arena, "clahe.y_eq", img.shape[:2]))
+    cv2.insertChannel(y_clahe, ycrcb, 0)
+    out = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=dst)
     return out
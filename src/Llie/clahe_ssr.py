@@ -1,8 +1,9 @@
 import cv2
 import numpy as np
+from src.Arena import scratch
 from src.Llie import apply_clahe_color,  unsharp_mask
 
-def combine_adaptive(original, clahe_img, ssr_img, intensity=0.5, detail=0.2):
+def combine_adaptive(original, clahe_img, ssr_img, intensity=0.5, detail=0.2, dst=None, arena=None):
     """Combine CLAHE and SSR adaptively using intensity and detail weights.
 
 
@@ -12,32 +13,42 @@ def combine_adaptive(original, clahe_img, ssr_img, intensity=0.5, detail=0.2):
         ssr_img: BGR uint8 SSR result.
         intensity: [0..1] weight favoring SSR (illumination correction) over CLAHE.
         detail: [0..1] detail enhancement strength.
+        dst: optional output buffer (same shape as original).
+        arena: optional src.Arena.BufferArena for the per-channel float planes.
 
 
     Returns:
         BGR uint8 combined enhanced image.
     """
-    # Ensure floats for blending
-    o = original.astype(np.float32)
-    c = clahe_img.astype(np.float32)
-    s = ssr_img.astype(np.float32)
-
-
-    # Detail enhancement via unsharp mask on CLAHE result (so colors are preserved)
     # Map detail slider to unsharp mask amount and radius
     amount = 0.6 * detail + 0.1 # base amount
     radius = 1.0 + 10.0 * detail
-    detail_sharp = unsharp_mask(c.astype(np.uint8), amount=amount, radius=radius).astype(np.float32)
-
-
-    # Combine: weighted sum of CLAHE and SSR, plus a small contribution of sharpened detail
-    combined = (1.0 - intensity) * c + intensity * s
-    combined = 0.85 * combined + 0.15 * detail_sharp
-
-
-    # Tiny preserve of original color balance by a small mix
-    combined = 0.95 * combined + 0.05 * o
-
 
-    combined = np.clip(combined, 0, 255).astype(np.uint8)
-    return combined
\ No newline at end of file
+    # Blending is per pixel and per channel: one channel at a time in float32 planes
+    # instead of float copies of all three images
+    h, w = original.shape[:2]
+    plane = scratch(arena, "combine.plane", (h, w))
+    sharp = scratch(arena, "combine.sharp", (h, w))
+    combined = scratch(arena, "combine.acc", (h, w), np.float32)
+    term = scratch(arena, "combine.term", (h, w), np.float32)
+    out = dst if dst is not None else np.empty_like(original)
+
+    for i in range(original.shape[2]):
+        # Detail enhancement via unsharp mask on CLAHE result (so colors are preserved)
+        c = cv2.extractChannel(clahe_img, i, dst=plane)
+        unsharp_mask(c, amount=amount, radius=radius, dst=sharp, arena=arena)
+
+        # Combine: weighted sum of CLAHE and SSR, plus a small contribution of sharpened detail
+        np.multiply(c, 1.0 - intensity, out=combined, dtype=np.float32)
+        combined += np.multiply(cv2.extractChannel(ssr_img, i, dst=plane), intensity, out=term, dtype=np.float32)
+        combined *= 0.85
+        combined += np.multiply(sharp, 0.15, out=term, dtype=np.float32)
+
+        # Tiny preserve of original color balance by a small mix
+        combined *= 0.95
+        combined += np.multiply(cv2.extractChannel(original, i, dst=plane), 0.05, out=term, dtype=np.float32)
+
+        np.clip(combined, 0, 255, out=combined)
+        np.copyto(plane, combined, casting="unsafe")
+        cv2.insertChannel(plane, out, i)
+    return out
@@ -1,7 +1,35 @@
 import cv2
 import numpy as np
+from src.Arena import scratch
 
-def single_scale_retinex(img, sigma=30, eps=1e-6):
+def _log_ratio(ch, sigma, eps, blur=None):
+    # Gaussian blur as surround (into the optional `blur` buffer)
+    blur = cv2.GaussianBlur(ch, (0, 0), sigmaX=sigma, sigmaY=sigma, dst=blur)
+    # SSR formula (log domain), computed in place: `ch` is overwritten with the result
+    np.log(np.add(blur, eps, out=blur), out=blur)
+    return np.subtract(np.log(ch, out=ch), blur, out=ch)
+
+
+def ssr_value_range(img, sigma=30, eps=1e-6, core=None):
+    """Per-channel (min, max) of the SSR log ratio, before normalization.
+
+    Used by tiled processing to normalize every tile with the same global range.
+
+    Args:
+        core: optional (rows, cols) slices the range is measured over; the rest of
+            `img` is only context for the blur (a tile's halo).
+
+    Returns:
+        Two float arrays of length 3 (lows, highs), in B, G, R order.
+    """
+    img_f = img.astype(np.float32) + eps
+    ssr = [_log_ratio(ch, sigma, eps) for ch in cv2.split(img_f)]
+    if core is not None:
+        ssr = [c[core] for c in ssr]
+    return np.array([c.min() for c in ssr]), np.array([c.max() for c in ssr])
+
+
+def single_scale_retinex(img, sigma=30, eps=1e-6, value_range=None, dst=None, arena=None):
     """Compute Single-Scale Retinex (SSR) on a color image.
 
 
@@ -13,26 +41,34 @@ def single_scale_retinex(img, sigma=30, eps=1e-6):
         img: BGR uint8 image.
         sigma: Gaussian blur sigma for the surround function.
         eps: small epsilon to avoid log(0).
+        value_range: optional (lows, highs) from ssr_value_range; when given the
+            normalization uses it instead of this image's own min/max.
+        dst: optional uint8 output buffer (same shape as img).
+        arena: optional src.Arena.BufferArena for the per-channel float planes.
 
 
     Returns:
         BGR uint8 image after SSR.
     """
-    img_f = img.astype(np.float32) + eps
-    # Split channels B, G, R
-    channels = cv2.split(img_f)
-    result_channels = []
-    for ch in channels:
-        # Gaussian blur as surround
-        blur = cv2.GaussianBlur(ch, (0, 0), sigmaX=sigma, sigmaY=sigma)
-        # SSR formula (log domain)
-        ssr = np.log(ch) - np.log(blur + eps)
+    # One channel at a time in reusable planes, instead of a float copy of the whole image
+    h, w = img.shape[:2]
+    plane = scratch(arena, "ssr.plane", (h, w))
+    ch = scratch(arena, "ssr.ch", (h, w), np.float32)
+    blur = scratch(arena, "ssr.blur", (h, w), np.float32)
+    out = dst if dst is not None else np.empty_like(img)
+    for i in range(img.shape[2]):
+        cv2.extractChannel(img, i, dst=plane)
+        np.add(plane, eps, out=ch, dtype=np.float32)
+        ssr = _log_ratio(ch, sigma, eps, blur)
         # Normalize ssr to 0..255
-        ssr = ssr - ssr.min()
-        if ssr.max() > 0:
-            ssr = ssr / ssr.max()
-        ssr = (ssr * 255).astype(np.uint8)
-        result_channels.append(ssr)
-    out = cv2.merge(result_channels)
+        if value_range is not None:
+            lo, hi = value_range[0][i], value_range[1][i]
+            np.clip(np.divide(np.subtract(ssr, lo, out=ssr), max(hi - lo, eps), out=ssr), 0, 1, out=ssr)
+        else:
+            np.subtract(ssr, ssr.min(), out=ssr)
+            top = ssr.max()
+            if top > 0:
+                np.divide(ssr, top, out=ssr)
+        np.copyto(plane, np.multiply(ssr, 255, out=ssr), casting="unsafe")
+        cv2.insertChannel(plane, out, i)
     return out
-
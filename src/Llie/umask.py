@@ -1,7 +1,8 @@
 import numpy as np
 import cv2
+from src.Arena import scratch
 
-def unsharp_mask(img, amount=1.0, radius=1.0):
+def unsharp_mask(img, amount=1.0, radius=1.0, dst=None, arena=None):
     """Simple unsharp mask: enhance local detail.
 
 
@@ -9,14 +10,25 @@ def unsharp_mask(img, amount=1.0, radius=1.0):
         img: BGR uint8 image.
         amount: strength multiplier.
         radius: gaussian blur sigma for mask.
+        dst: optional uint8 output buffer (same shape as img).
+        arena: optional src.Arena.BufferArena for the float intermediates.
     Returns:
         BGR uint8 sharpened image.
     """
     if radius <= 0:
-        return img.copy()
-    img_f = img.astype(np.float32)
-    blurred = cv2.GaussianBlur(img_f, (0, 0), sigmaX=radius, sigmaY=radius)
-    mask = img_f - blurred
-    sharp = img_f + amount * mask
-    sharp = np.clip(sharp, 0, 255).astype(np.uint8)
-    return sharp
\ No newline at end of file
+        if dst is None:
+            return img.copy()
+        np.copyto(dst, img)
+        return dst
+    # Same float32 arithmetic as before, in place in two reusable buffers
+    img_f = scratch(arena, "usm.img", img.shape, np.float32)
+    np.copyto(img_f, img)
+    blurred = cv2.GaussianBlur(img_f, (0, 0), sigmaX=radius, sigmaY=radius,
+                               dst=scratch(arena, "usm.blur", img.shape, np.float32))
+    mask = np.subtract(img_f, blurred, out=blurred)
+    sharp = np.add(img_f, np.multiply(mask, amount, out=mask), out=img_f)
+    np.clip(sharp, 0, 255, out=sharp)
+    if dst is None:
+        return sharp.astype(np.uint8)
+    np.copyto(dst, sharp, casting="unsafe")
+    return dst
@@ -2,6 +2,8 @@
 #include <iostream>
 #include <limits>
 #include <cmath>
+#include <chrono>
+#include <stdexcept>
 
 PatchRemover::PatchRemover() : selection{0,0,0,0} {}
 
@@ -33,6 +35,14 @@ void PatchRemover::setSelection(int x, int y, int width, int height) {
     cv::rectangle(mask, selection, cv::Scalar(255), -1);
 }
 
+void PatchRemover::setConfig(const InpaintConfig& newConfig) {
+    if (newConfig.patchSize < 3 || newConfig.patchSize % 2 == 0)
+        throw std::invalid_argument("patchSize must be an odd number >= 3");
+    if (newConfig.searchStride < 0)
+        throw std::invalid_argument("searchStride must be >= 0 (0 = automatic)");
+    config = newConfig;
+}
+
 // ---------------------------------------------------------
 // CRIMINISI ALGORITHM IMPLEMENTATION
 // ---------------------------------------------------------
@@ -148,7 +158,7 @@ cv::Point PatchRemover::findBestMatch(const cv::Mat& targetPatch, const cv::Mat&
     // Step > 1 speeds up 4K images massively
     // int step = 2; 
     // Dynamic step size based on image resolution
-    int step = std::max(2, std::min(w, h) / 100);
+    int step = config.searchStride > 0 ? config.searchStride : std::max(2, std::min(w, h) / 100);
 
     for (int y = r; y < h - r; y += step) {
         for (int x = r; x < w - r; x += step) {
@@ -229,6 +239,14 @@ void PatchRemover::update(cv::Point targetPoint, cv::Point sourcePoint, const cv
 void PatchRemover::process() {
     if (srcImage.empty()) throw std::runtime_error("No image loaded");
 
+    using Clock = std::chrono::steady_clock;
+    auto seconds = [](Clock::time_point a, Clock::time_point b) {
+        return std::chrono::duration<double>(b - a).count();
+    };
+    auto processStart = Clock::now();
+    stats = InpaintStats();
+    stats.filledPixels = cv::countNonZero(mask);
+
     initializeMaps();
 
     // Iterate until mask is empty
@@ -236,10 +254,15 @@ void PatchRemover::process() {
     int iter = 0;
 
     while (iter++ < maxIterations) {
+        auto frontStart = Clock::now();
+
         // 1. Identify the "Fill Front" (Boundary of the mask)
         std::vector<std::vector<cv::Point>> contours;
         cv::findContours(mask, contours, cv::RETR_EXTERNAL, cv::CHAIN_APPROX_NONE);
-        if (contours.empty()) break; // Done
+        if (contours.empty()) { // Done
+            stats.frontSeconds += seconds(frontStart, Clock::now());
+            break;
+        }
 
         // Flatten contours points to simplify priority check
         // Ideally we iterate only the boundary pixels
@@ -273,17 +296,28 @@ void PatchRemover::process() {
             // Edge case: just fill with black or shrink?
             // To keep code short, we force mask to 0 to prevent infinite loop
             mask.at<uchar>(bestP.y, bestP.x) = 0; 
+            stats.frontSeconds += seconds(frontStart, Clock::now());
             continue;
         }
 
         cv::Mat targetPatch = result(patchRect); // Using 'result' because it contains partially filled data
         cv::Mat patchMask = mask(patchRect);
 
+        auto searchStart = Clock::now();
+        stats.frontSeconds += seconds(frontStart, searchStart);
+
         cv::Point sourceP = findBestMatch(targetPatch, patchMask);
 
+        auto updateStart = Clock::now();
+        stats.searchSeconds += seconds(searchStart, updateStart);
+
         // 5. Update image (Copy source patch to target)
         update(bestP, sourceP, patchMask);
+
+        stats.updateSeconds += seconds(updateStart, Clock::now());
+        stats.iterations++;
     }
+    stats.totalSeconds = seconds(processStart, Clock::now());
 }
 
 bool PatchRemover::save(const std::string& outputPath) {
@@ -0,0 +1,2 @@
+from .params import parse_flag
+from .operations import OPERATIONS, WorkerContext, operation
@@ -0,0 +1,121 @@
+# operations.py
+import threading
+from typing import Callable, Dict, Optional
+
+import cv2
+import numpy as np
+
+from src.Cache import get_cache
+from src.Denoising import apply_auto_denoising_logic, apply_denoising_logic
+from src.Filtering import apply_color_filter
+from src.Llie import enhance_image
+from src.Operations.params import parse_flag
+from src.Other.bkgr import SEGMENTATION_MAX_SIDE, cut_out, segment_alpha
+from src.Other.inpaint import remove_object
+
+try:
+    import ObjectRemover_core
+    HAS_CPP_REMOVER = True
+except ImportError:
+    HAS_CPP_REMOVER = False
+
+
+# -----------------------------------------------------------
+# OPERATIONS: name -> fn(context, img_bgr, params) -> ndarray (BGR or BGRA)
+# -----------------------------------------------------------
+OPERATIONS: Dict[str, Callable] = {}
+
+
+def operation(name: str):
+    def register(fn):
+        OPERATIONS[name] = fn
+        return fn
+    return register
+
+
+def _bgr(img: np.ndarray) -> np.ndarray:
+    """Operations work on 3-channel BGR; alpha/gray inputs are converted."""
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if img.shape[2] == 4:
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    return img
+
+
+@operation("denoise")
+def _denoise(ctx, img, params):
+    return apply_denoising_logic(_bgr(img), int(params.get("strength", 10)),
+                                 parse_flag(params.get("edge_preserving", True)),
+                                 parse_flag(params.get("salt_pepper", False)),
+                                 params.get("edge_method", "bilateral"),
+                                 params.get("sp_method", "adaptive"),
+                                 params.get("chroma_mode", "full"))
+
+
+@operation("denoise_auto")
+def _denoise_auto(ctx, img, params):
+    return apply_auto_denoising_logic(_bgr(img), params.get("chroma_mode", "full"))[0]
+
+
+@operation("llie")
+def _llie(ctx, img, params):
+    return enhance_image(_bgr(img), intensity=float(params.get("intensity", 0.2)),
+                         detail=float(params.get("detail", 0.3)),
+                         clahe_clip=float(params.get("clip", 2.0)))
+
+
+@operation("filter")
+def _filter(ctx, img, params):
+    return apply_color_filter(_bgr(img), params.get("preset", "None"), float(params.get("intensity", 50)))
+
+
+@operation("background")
+def _background(ctx, img, params):
+    # Parsed before the model loads: a bad value is a ValueError (400), not a late TypeError
+    max_side = int(params.get("max_side", SEGMENTATION_MAX_SIDE))
+    img = _bgr(img)
+    alpha = segment_alpha(img, session=ctx.rembg_session(params.get("model")), max_side=max_side,
+                          cache=get_cache())
+    bgra = cv2.cvtColor(cut_out(img, alpha), cv2.COLOR_BGR2BGRA)
+    bgra[..., 3] = alpha
+    return bgra
+
+
+@operation("object_removal")
+def _object_removal(ctx, img, params):
+    img = np.ascontiguousarray(_bgr(img))
+    x, y, w, h = (int(params[k]) for k in ("x", "y", "w", "h"))
+    return remove_object(img, x, y, w, h, ctx.patch_remover(), cache=get_cache())
+
+
+# -----------------------------------------------------------
+# WARM RESOURCES
+# -----------------------------------------------------------
+class WorkerContext:
+    """
+    Resources kept alive across requests.
+
+    rembg sessions (ONNX Runtime, thread-safe for inference) are shared by all
+    workers; PatchRemover holds per-image state, so each worker thread owns one.
+    """
+
+    def __init__(self, default_model: str = "u2net"):
+        self.default_model = default_model
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._local = threading.local()
+
+    def rembg_session(self, model: Optional[str] = None):
+        model = model or self.default_model
+        with self._sessions_lock:
+            if model not in self._sessions:
+                from rembg import new_session
+                self._sessions[model] = new_session(model)
+            return self._sessions[model]
+
+    def patch_remover(self):
+        if not HAS_CPP_REMOVER:
+            return None
+        if not hasattr(self._local, "remover"):
+            self._local.remover = ObjectRemover_core.PatchRemover()
+        return self._local.remover
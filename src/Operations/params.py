@@ -0,0 +1,4 @@
+# params.py
+def parse_flag(value) -> bool:
+    """Boolean operation parameter: query-string, JSON and recipe values ("1", "true", True...)."""
+    return str(value).lower() in ("1", "true", "yes", "on")
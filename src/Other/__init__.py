@@ -1,3 +1,5 @@
-from .bkgr import run_background_removal
+from .bkgr import run_background_removal, remove_background, segment_alpha, cut_out
 from .flip import flip_horizontal, flip_vertical
-
+from .loader import ImageLoader
+from .inpaint import apply_smart_inpaint, remove_object
+from .exemplar import exemplar_inpaint
@@ -0,0 +1,170 @@
+# exemplar.py
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+# -----------------------------------------------------------
+# NUMBA PORT OF PatchRemover (src/ObjRem/inpainter.cpp)
+# -----------------------------------------------------------
+# Same priority-driven exemplar fill (Criminisi): on the fill front pick the
+# pixel with the highest confidence * gradient priority, find the known patch
+# with the lowest SSD over the target's known pixels on a strided candidate
+# grid, copy it into the hole and propagate the confidence.
+
+if HAS_NUMBA:
+
+    @njit(cache=True, nogil=True, parallel=True)
+    def _search(result, mask, ty, tx, r, step):
+        """Best fully-known source patch for the target centered at (ty, tx); (-1, -1) if none."""
+        h, w = mask.shape
+        ys = np.arange(r, h - r, step)
+        xs = np.arange(r, w - r, step)
+        row_ssd = np.full(ys.size, np.inf)
+        row_x = np.full(ys.size, -1, np.int64)
+
+        for i in prange(ys.size):
+            y = ys[i]
+            best = np.inf
+            best_x = -1
+            for x in xs:
+                if mask[y, x] != 0:
+                    continue
+                ssd = 0.0
+                valid = True
+                for dy in range(-r, r + 1):
+                    for dx in range(-r, r + 1):
+                        if mask[y + dy, x + dx] != 0:
+                            valid = False
+                            break
+                        if mask[ty + dy, tx + dx] == 0:
+                            for c in range(3):
+                                d = float(result[ty + dy, tx + dx, c]) - float(result[y + dy, x + dx, c])
+                                ssd += d * d
+                    if not valid:
+                        break
+                if valid and ssd < best:
+                    best = ssd
+                    best_x = x
+            row_ssd[i] = best
+            row_x[i] = best_x
+
+        # Sequential reduction in scan order: ties resolve like the C++ loop
+        best = np.inf
+        by, bx = -1, -1
+        for i in range(ys.size):
+            if row_x[i] >= 0 and row_ssd[i] < best:
+                best = row_ssd[i]
+                by, bx = ys[i], row_x[i]
+        return by, bx
+
+    @njit(cache=True, nogil=True)
+    def _luma(result, y, x):
+        return 0.299 * result[y, x, 2] + 0.587 * result[y, x, 1] + 0.114 * result[y, x, 0]
+
+    @njit(cache=True, nogil=True)
+    def _fill(result, mask, patch_size, step):
+        h, w = mask.shape
+        r = patch_size // 2
+        area = float(patch_size * patch_size)
+        confidence = np.where(mask == 0, 1.0, 0.0).astype(np.float32)
+
+        # Hole bounding box: the front can only shrink inside it
+        y0, y1, x0, x1 = h, -1, w, -1
+        remaining = 0
+        for y in range(h):
+            for x in range(w):
+                if mask[y, x] != 0:
+                    remaining += 1
+                    y0, y1 = min(y0, y), max(y1, y)
+                    x0, x1 = min(x0, x), max(x1, x)
+
+        while remaining > 0:
+            # 1-3. Fill front and its highest priority pixel
+            best_p = -1.0
+            py, px = -1, -1
+            for y in range(y0, y1 + 1):
+                for x in range(x0, x1 + 1):
+                    if mask[y, x] == 0:
+                        continue
+                    front = (y == 0 or y == h - 1 or x == 0 or x == w - 1 or mask[y - 1, x] == 0
+                             or mask[y + 1, x] == 0 or mask[y, x - 1] == 0 or mask[y, x + 1] == 0)
+                    if not front:
+                        continue
+                    conf = 0.0
+                    for yy in range(max(0, y - r), min(h, y + r + 1)):
+                        for xx in range(max(0, x - r), min(w, x + r + 1)):
+                            conf += confidence[yy, xx]
+                    conf /= area
+                    confidence[y, x] = conf
+
+                    data = 0.001
+                    if 0 < x < w - 1 and 0 < y < h - 1:
+                        gx = _luma(result, y, x + 1) - _luma(result, y, x - 1)
+                        gy = _luma(result, y + 1, x) - _luma(result, y - 1, x)
+                        data += np.sqrt(gx * gx + gy * gy)
+                    if conf * data > best_p:
+                        best_p = conf * data
+                        py, px = y, x
+
+            # Patch would cross the image border: accept the pixel as is (same as the C++ core)
+            if py - r < 0 or px - r < 0 or py + r >= h or px + r >= w:
+                mask[py, px] = 0
+                remaining -= 1
+                continue
+
+            # 4. Exemplar search
+            sy, sx = _search(result, mask, py, px, r, step)
+            if sy < 0:
+                mask[py, px] = 0
+                remaining -= 1
+                continue
+
+            # 5. Copy into the hole pixels of the target patch
+            target_conf = confidence[py, px]
+            for dy in range(-r, r + 1):
+                for dx in range(-r, r + 1):
+                    if mask[py + dy, px + dx] != 0:
+                        for c in range(3):
+                            result[py + dy, px + dx, c] = result[sy + dy, sx + dx, c]
+                        mask[py + dy, px + dx] = 0
+                        confidence[py + dy, px + dx] = target_conf
+                        remaining -= 1
+        return result
+
+
+def exemplar_inpaint(img_bgr: np.ndarray, rx: int, ry: int, rw: int, rh: int,
+                     patch_size: int = 9, search_stride: int = 0) -> np.ndarray:
+    """
+    Exemplar-based removal of the rectangle (rx, ry, rw, rh), same algorithm as
+    ObjectRemover_core.PatchRemover. Requires numba.
+    search_stride: candidate spacing, 0 = automatic (min(w, h) / 100, at least 2).
+    """
+    if not HAS_NUMBA:
+        raise ImportError("numba is required for exemplar_inpaint")
+    if patch_size < 3 or patch_size % 2 == 0:
+        raise ValueError("patch_size must be an odd number >= 3")
+
+    result = np.array(img_bgr[..., :3], dtype=np.uint8, order="C")   # BGRA input: alpha is dropped
+    h, w = result.shape[:2]
+    # Clip the rectangle to the image (a negative origin shortens it)
+    x, y = max(0, rx), max(0, ry)
+    rw, rh = min(rx + rw, w) - x, min(ry + rh, h) - y
+    if rw <= 0 or rh <= 0:
+        return result
+    mask = np.zeros((h, w), dtype=np.uint8)
+    mask[y:y + rh, x:x + rw] = 255
+
+    step = search_stride if search_stride > 0 else max(2, min(w, h) // 100)
+    return _fill(result, mask, patch_size, step)
+
+
+def warm_up():
+    """Compiles (or loads from cache) the JIT kernels so the first real call is fast."""
+    if HAS_NUMBA:
+        img = np.zeros((32, 32, 3), dtype=np.uint8)
+        exemplar_inpaint(img, 12, 12, 6, 6)
@@ -1,4 +1,6 @@
 # flip.py
+import cv2
+import numpy as np
 from PIL import Image
 
 
@@ -8,3 +10,133 @@ def flip_horizontal(pil_img: Image.Image) -> Image.Image:
 
 def flip_vertical(pil_img: Image.Image) -> Image.Image:
     return pil_img.transpose(Image.FLIP_TOP_BOTTOM)
+
+
+# Operation name -> name of its inverse
+ORIENTATION_OPS = {
+    "flip_horizontal": "flip_horizontal",
+    "flip_vertical": "flip_vertical",
+    "rotate_cw": "rotate_ccw",
+    "rotate_ccw": "rotate_cw",
+}
+
+
+class Orientation:
+    """
+    Lazy geometric state (flips and 90° rotations) of an image.
+
+    Stored as: view = flip_x(flip_y(transpose(pixels))), each step optional.
+    Composing operations only updates three booleans; `apply` returns a NumPy
+    stride view (no copy), `materialize` produces contiguous memory when a
+    consumer needs it. Double flips cancel out.
+    """
+
+    def __init__(self, transpose: bool = False, flip_y: bool = False, flip_x: bool = False):
+        self.transpose = transpose
+        self.flip_y = flip_y
+        self.flip_x = flip_x
+
+    def copy(self) -> "Orientation":
+        return Orientation(self.transpose, self.flip_y, self.flip_x)
+
+    def is_identity(self) -> bool:
+        return not (self.transpose or self.flip_y or self.flip_x)
+
+    def __eq__(self, other):
+        return isinstance(other, Orientation) and \
+            (self.transpose, self.flip_y, self.flip_x) == (other.transpose, other.flip_y, other.flip_x)
+
+    def __repr__(self):
+        return f"Orientation(transpose={self.transpose}, flip_y={self.flip_y}, flip_x={self.flip_x})"
+
+    # ------------------------------------------------------
+    # Composition (each op is applied on top of the current view)
+    # ------------------------------------------------------
+    def _transpose_view(self):
+        # T * Fx^a * Fy^b * T^t == Fx^b * Fy^a * T^(t+1)
+        self.transpose = not self.transpose
+        self.flip_x, self.flip_y = self.flip_y, self.flip_x
+
+    def apply_op(self, name: str) -> "Orientation":
+        if name == "flip_horizontal":
+            self.flip_x = not self.flip_x
+        elif name == "flip_vertical":
+            self.flip_y = not self.flip_y
+        elif name == "rotate_cw":
+            self._transpose_view()
+            self.flip_x = not self.flip_x
+        elif name == "rotate_ccw":
+            self._transpose_view()
+            self.flip_y = not self.flip_y
+        else:
+            raise ValueError(f"Unknown orientation op: {name}")
+        return self
+
+    def inverse(self) -> "Orientation":
+        if self.transpose:
+            return Orientation(True, self.flip_x, self.flip_y)
+        return self.copy()
+
+    # ------------------------------------------------------
+    # Application
+    # ------------------------------------------------------
+    def apply(self, arr: np.ndarray) -> np.ndarray:
+        """Zero-copy oriented view of an (H, W[, C]) array."""
+        if self.transpose:
+            arr = arr.swapaxes(0, 1)
+        if self.flip_y:
+            arr = arr[::-1]
+        if self.flip_x:
+            arr = arr[:, ::-1]
+        return arr
+
+    def materialize(self, arr: np.ndarray) -> np.ndarray:
+        """Oriented copy in contiguous memory (no copy if already identity and contiguous)."""
+        if self.is_identity() or (arr.ndim == 3 and arr.shape[2] not in (3, 4)):
+            return np.ascontiguousarray(self.apply(arr))
+        # OpenCV transposes/flips in blocked passes, several times faster than copying a strided view
+        arr = np.ascontiguousarray(arr)
+        if self.transpose:
+            arr = cv2.transpose(arr)
+        if self.flip_x or self.flip_y:
+            arr = cv2.flip(arr, -1 if self.flip_x and self.flip_y else (1 if self.flip_x else 0))
+        return arr
+
+    def apply_pil(self, pil_img: Image.Image) -> Image.Image:
+        if self.transpose:
+            pil_img = pil_img.transpose(Image.Transpose.TRANSPOSE)
+        if self.flip_y:
+            pil_img = pil_img.transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+        if self.flip_x:
+            pil_img = pil_img.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        return pil_img
+
+    def map_size(self, size):
+        """(width, height) of the oriented image."""
+        return (size[1], size[0]) if self.transpose else tuple(size)
+
+    def unmap_rect(self, rect, size):
+        """(x, y, w, h) in the oriented image -> the same region of the unoriented image of `size` (width, height)."""
+        x, y, w, h = rect
+        view_w, view_h = self.map_size(size)
+        if self.flip_x:
+            x = view_w - x - w
+        if self.flip_y:
+            y = view_h - y - h
+        if self.transpose:
+            x, y, w, h = y, x, h, w
+        return x, y, w, h
+
+    def to_ops(self):
+        """Shortest list of ORIENTATION_OPS names that rebuilds this state from identity."""
+        ops = []
+        if self.transpose:
+            # rotate_cw == transpose + flip_x
+            ops.append("rotate_cw")
+            if not self.flip_x:
+                ops.append("flip_horizontal")
+        elif self.flip_x:
+            ops.append("flip_horizontal")
+        if self.flip_y:
+            ops.append("flip_vertical")
+        return ops
@@ -0,0 +1,71 @@
+# inpaint.py
+import numpy as np
+import cv2
+
+from src.Cache.cache import apply_region, changed_region
+from .exemplar import HAS_NUMBA, exemplar_inpaint
+
+
+# -----------------------------------------------------------
+# PYTHON FALLBACK ALGORITHM (Texture Grafting)
+# -----------------------------------------------------------
+def apply_smart_inpaint(img_bgr, rx, ry, rw, rh):
+    """
+    Last-resort fallback (no C++ core, no numba). Uses Frequency Separation to graft texture.
+    """
+    mask = np.zeros(img_bgr.shape[:2], dtype=np.uint8)
+    pad = 10
+    y1, y2 = max(0, ry-pad), min(img_bgr.shape[0], ry+rh+pad)
+    x1, x2 = max(0, rx-pad), min(img_bgr.shape[1], rx+rw+pad)
+    mask[y1:y2, x1:x2] = 255
+
+    # Structure
+    inpainted = cv2.inpaint(img_bgr, mask, 5, cv2.INPAINT_NS)
+
+    # Texture
+    noise = np.random.normal(0, 15, inpainted.shape).astype(np.int16)
+    inpainted_16 = inpainted.astype(np.int16)
+    textured = np.clip(cv2.add(inpainted_16, noise), 0, 255).astype(np.uint8)
+
+    # Blend
+    final_img = inpainted.copy()
+    locs = np.where(mask > 0)
+    final_img[locs] = textured[locs]
+    
+    return final_img
+
+
+def _inpaint(img_bgr, rx, ry, rw, rh, remover):
+    if remover is not None:
+        remover.set_image(img_bgr)
+        remover.set_selection(rx, ry, rw, rh)
+        remover.process()
+        return remover.get_result()
+    if HAS_NUMBA:
+        return exemplar_inpaint(img_bgr, rx, ry, rw, rh)
+    return apply_smart_inpaint(img_bgr, rx, ry, rw, rh)
+
+
+def remove_object(img_bgr, rx, ry, rw, rh, remover=None, cache=None):
+    """
+    Removes the object inside the given rectangle.
+    remover: an ObjectRemover_core.PatchRemover instance (C++), or None for the Python fallback
+    (the same exemplar algorithm JIT-compiled with numba, or texture grafting without it).
+    cache: optional src.Cache.ResultCache; only the patched region is stored.
+    """
+    if cache is None:
+        return _inpaint(img_bgr, rx, ry, rw, rh, remover)
+
+    backend = "cpp" if remover is not None else ("numba" if HAS_NUMBA else "ns")
+    params = {"rect": [int(rx), int(ry), int(rw), int(rh)]}
+    key = cache.key(img_bgr, "object_removal", params, backend)
+    hit = cache.get(key)
+    if hit is not None:
+        x, y = (int(v) for v in hit["origin"])
+        return apply_region(img_bgr, x, y, hit["patch"])
+
+    result = _inpaint(img_bgr, rx, ry, rw, rh, remover)
+    if result.shape == img_bgr.shape:
+        x, y, patch = changed_region(img_bgr, result)
+        cache.put(key, origin=np.array([x, y]), patch=patch)
+    return result
@@ -0,0 +1,79 @@
+# loader.py
+import threading
+from typing import Optional, Tuple
+
+from PIL import Image
+
+
+class ImageLoader:
+    """
+    Opens an image in two stages.
+
+    - preview: for JPEGs, a DCT-domain downscaled decode (PIL draft mode,
+      1/2, 1/4 or 1/8 scale) that is available as soon as the loader is built.
+    - full: the full-resolution decode, running on a background thread.
+
+    Formats without a draft mode (PNG, BMP, WebP...) and images already close
+    to the preview size are decoded synchronously; `preview` is then the full image.
+    """
+
+    def __init__(self, path: str, preview_size: Tuple[int, int] = (1600, 900)):
+        self.path = path
+        self._full: Optional[Image.Image] = None
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self.preview = self._open_preview(path, preview_size)
+        if self.preview is None:
+            self._full = self._decode_full(path)
+            self.preview = self._full
+        else:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _open_preview(path: str, preview_size: Tuple[int, int]) -> Optional[Image.Image]:
+        img = Image.open(path)
+        if img.format != "JPEG":
+            img.close()
+            return None
+        # draft() keeps the result >= preview_size; depending on the Pillow version it
+        # returns None or an unscaled box when no reduction applies
+        full_size = img.size
+        if img.draft("RGB", preview_size) is None or img.size == full_size:
+            img.close()
+            return None
+        img.load()
+        return img
+
+    @staticmethod
+    def _decode_full(path: str) -> Image.Image:
+        img = Image.open(path)
+        img.load()
+        return img
+
+    def _run(self):
+        try:
+            self._full = self._decode_full(self.path)
+        except BaseException as e:
+            self._error = e
+
+    def done(self) -> bool:
+        return self._thread is None or not self._thread.is_alive()
+
+    def is_preview(self) -> bool:
+        """
+        True when `preview` is a reduced decode: `result()` must then be swapped
+        in, whether the background decode is still running or already finished.
+        """
+        return self._thread is not None
+
+    def result(self, timeout: Optional[float] = None) -> Image.Image:
+        """Full-resolution image; blocks until the background decode finishes."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise TimeoutError(f"Decoding {self.path} did not finish in {timeout}s")
+        if self._error is not None:
+            raise self._error
+        return self._full
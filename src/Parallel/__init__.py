@@ -0,0 +1 @@
+from .shm_pool import SegmentPool, SharedMemoryExecutor
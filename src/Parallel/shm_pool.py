@@ -0,0 +1,208 @@
+# shm_pool.py
+import multiprocessing as mp
+import os
+import secrets
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+from src.Tuning import TuningProfile, apply_profile, get_profile
+
+SEGMENT_ALIGN = 1 << 20   # segments are rounded up to whole MiB so they can be reused across sizes
+SEGMENT_PREFIX = "vb_"    # segment names, as for the service: leftovers are easy to identify
+
+
+# -----------------------------------------------------------
+# PARENT SIDE: reusable shared-memory segments
+# -----------------------------------------------------------
+class SegmentPool:
+    """Preallocated shared-memory segments, handed out by size and reused."""
+
+    def __init__(self, prefix: str = SEGMENT_PREFIX):
+        self.prefix = prefix
+        self._free: List[shared_memory.SharedMemory] = []
+        self._all: List[shared_memory.SharedMemory] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, nbytes: int) -> shared_memory.SharedMemory:
+        with self._lock:
+            fitting = [s for s in self._free if s.size >= nbytes]
+            if fitting:
+                shm = min(fitting, key=lambda s: s.size)
+                self._free.remove(shm)
+                return shm
+            size = max(SEGMENT_ALIGN, -(-nbytes // SEGMENT_ALIGN) * SEGMENT_ALIGN)
+            shm = shared_memory.SharedMemory(name=self.prefix + secrets.token_hex(8), create=True, size=size)
+            self._all.append(shm)
+            return shm
+
+    def release(self, shm: shared_memory.SharedMemory):
+        with self._lock:
+            self._free.append(shm)
+
+    def preallocate(self, sizes: Iterable[int]):
+        segments = [self.acquire(n) for n in sizes]
+        for shm in segments:
+            self.release(shm)
+
+    def close(self):
+        with self._lock:
+            for shm in self._all:
+                shm.close()
+                try:
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self._all.clear()
+            self._free.clear()
+
+
+# -----------------------------------------------------------
+# WORKER SIDE
+# -----------------------------------------------------------
+_attached = {}
+_context = None
+
+
+def _init_worker(cv2_threads: int, profile: TuningProfile):
+    # Spawned workers start from a fresh interpreter: use the parent's tuning, then
+    # one OpenCV thread budget per process avoids processes x threads oversubscription
+    global _context
+    apply_profile(profile)
+    cv2.setNumThreads(cv2_threads)
+    from src.Operations import WorkerContext
+    _context = WorkerContext()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = _attached.get(name)
+    if shm is None:
+        # Workers share the parent's resource tracker, so registering here is a no-op;
+        # the parent unlinks every segment in SegmentPool.close()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def _worker_run(op, in_name, shape, dtype, out_name, out_capacity, params):
+    img = np.ndarray(shape, dtype=dtype, buffer=_attach(in_name).buf)
+    img.flags.writeable = False   # zero-copy input view, operations must not modify it
+
+    if isinstance(op, str):
+        from src.Operations import OPERATIONS
+        result = OPERATIONS[op](_context, img, params)
+    else:
+        result = op(img, **params)
+
+    result = np.ascontiguousarray(result)
+    if result.nbytes <= out_capacity:
+        out = np.ndarray(result.shape, dtype=result.dtype, buffer=_attach(out_name).buf)
+        out[...] = result
+        return result.shape, result.dtype.str, None
+    # Unexpectedly large output: fall back to pickling it
+    return None, None, result
+
+
+# -----------------------------------------------------------
+# EXECUTOR
+# -----------------------------------------------------------
+class SharedMemoryExecutor:
+    """
+    Process pool for CPU-heavy operations whose NumPy/Python glue holds the GIL
+    (combine_adaptive, apply_smart_inpaint, LUT building...).
+
+    Images travel through reusable shared-memory segments: the parent copies the
+    input in once and the result out once; no megabyte arrays are pickled.
+    `op` is either an operation name from src.Operations.OPERATIONS
+    (called as fn(context, img, params)) or a picklable module-level function
+    (called as fn(img, **params)).
+    """
+
+    def __init__(self, processes: Optional[int] = None, cv2_threads: Optional[int] = None,
+                 preallocate: Sequence[int] = (), mp_context: str = "spawn"):
+        cpus = os.cpu_count() or 1
+        self.processes = processes or get_profile().pool_processes or cpus
+        self.cv2_threads = cv2_threads or max(1, cpus // self.processes)
+        self._segments = SegmentPool()
+        self._segments.preallocate(preallocate)
+        self._outstanding = set()   # result futures whose segments are still in use
+        self._outstanding_lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(max_workers=self.processes, mp_context=mp.get_context(mp_context),
+                                         initializer=_init_worker, initargs=(self.cv2_threads, get_profile()))
+
+    def submit(self, op: Union[str, Callable], img: np.ndarray, **params) -> Future:
+        """Runs `op` on `img` in a worker process; the Future resolves to the result array."""
+        img = np.ascontiguousarray(img)
+        src = self._segments.acquire(img.nbytes)
+        np.ndarray(img.shape, dtype=img.dtype, buffer=src.buf)[...] = img
+
+        # Room for a 4-channel result of the same size (e.g. background removal -> BGRA)
+        out_capacity = max(img.nbytes, img.shape[0] * img.shape[1] * 4 * img.itemsize)
+        dst = self._segments.acquire(out_capacity)
+
+        outer = Future()
+        try:
+            inner = self._pool.submit(_worker_run, op, src.name, img.shape, img.dtype.str,
+                                      dst.name, dst.size, params)
+        except BaseException:
+            self._segments.release(src)
+            self._segments.release(dst)
+            raise
+
+        def finish(f):
+            try:
+                shape, dtype, pickled = f.result()
+                if pickled is not None:
+                    result = pickled
+                else:
+                    result = np.ndarray(shape, dtype=dtype, buffer=dst.buf).copy()
+                outer.set_result(result)
+            except BaseException as e:
+                outer.set_exception(e)
+            finally:
+                self._segments.release(src)
+                self._segments.release(dst)
+
+        with self._outstanding_lock:
+            self._outstanding.add(outer)
+        outer.add_done_callback(self._forget)
+        inner.add_done_callback(finish)
+        return outer
+
+    def _forget(self, future: Future):
+        with self._outstanding_lock:
+            self._outstanding.discard(future)
+
+    def map(self, op: Union[str, Callable], images: Iterable[np.ndarray], **params) -> List[np.ndarray]:
+        """Processes several images concurrently, results in input order."""
+        futures = [self.submit(op, img, **params) for img in images]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the pool. Segments are unlinked only once it has drained: with
+        wait=False that happens on a background thread, since running workers
+        are still attached to them.
+        """
+        self._pool.shutdown(wait=wait)
+        if wait:
+            self._segments.close()
+        else:
+            threading.Thread(target=self._close_when_drained, daemon=True).start()
+
+    def _close_when_drained(self):
+        # A result future resolves after its output was copied out of the segment
+        with self._outstanding_lock:
+            outstanding = list(self._outstanding)
+        wait(outstanding)
+        self._segments.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
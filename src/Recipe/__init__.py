@@ -0,0 +1,2 @@
+from .recipe import Recipe, GEOMETRY_OPS, POINT_OPS
+from .compiler import Plan, compile_recipe
@@ -0,0 +1,78 @@
+""" Command line entry point: python -m src.Recipe recipe.json image [image...] --out-dir DIR """
+
+import argparse
+import os
+from collections import deque
+
+import cv2
+
+from src.Recipe import Recipe, compile_recipe
+
+
+def _read(path: str):
+    img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+    if img is None:
+        print(f"⚠️ Could not read {path}")
+    return img
+
+
+def _write(path: str, result, args):
+    name, ext = os.path.splitext(os.path.basename(path))
+    ext = args.format or ext
+    if result.ndim == 3 and result.shape[2] == 4 and ext.lower() in (".jpg", ".jpeg"):
+        ext = ".png"   # keep the alpha from a background step
+    out_path = os.path.join(args.out_dir, name + ext)
+    cv2.imwrite(out_path, result)
+    print(f"✅ {path} -> {out_path}")
+
+
+def _run_parallel(recipe: Recipe, args):
+    """Images processed in worker processes through shared memory, a bounded number in flight."""
+    from src.Parallel import SharedMemoryExecutor
+    from src.Recipe.compiler import run_recipe
+
+    with SharedMemoryExecutor(processes=args.processes) as pool:
+        pending = deque()
+        for path in args.images:
+            img = _read(path)
+            if img is None:
+                continue
+            pending.append((path, pool.submit(run_recipe, img, recipe=recipe.to_dict())))
+            if len(pending) >= 2 * pool.processes:
+                path, future = pending.popleft()
+                _write(path, future.result(), args)
+        while pending:
+            path, future = pending.popleft()
+            _write(path, future.result(), args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a saved edit recipe to a batch of images.")
+    parser.add_argument("recipe")
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--format", default=None, help="output extension, e.g. .png (default: same as input)")
+    parser.add_argument("--explain", action="store_true", help="print the compiled plan")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="worker processes (shared-memory pool); 0 = tuning profile / CPU count")
+    args = parser.parse_args()
+
+    recipe = Recipe.load(args.recipe)
+    plan = compile_recipe(recipe)
+    if args.explain:
+        print(f"{plan.passes()} full-image passes:")
+        for line in plan.describe():
+            print(f"  {line}")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    if args.processes != 1 and len(args.images) > 1:
+        _run_parallel(recipe, args)
+        return
+    for path in args.images:
+        img = _read(path)
+        if img is not None:
+            _write(path, plan(img), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+# compiler.py
+import json
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.Filtering import apply_color_filter
+from src.Other.flip import Orientation
+from src.Recipe.recipe import GEOMETRY_OPS, POINT_OPS, Recipe
+from src.Operations import OPERATIONS, WorkerContext
+
+# (256, 1, 3) ramp: running a per-channel filter on it yields the filter's exact lookup table
+_RAMP = np.repeat(np.arange(256, dtype=np.uint8)[:, None, None], 3, axis=2)
+IDENTITY_LUT = np.ascontiguousarray(_RAMP[:, 0, :])
+
+
+def step_lut(step: dict) -> Optional[np.ndarray]:
+    """256x3 table of a point-wise step, or None if it mixes channels (Black & White)."""
+    if step["op"] == "lut":
+        return np.clip(np.asarray(step["table"]), 0, 255).astype(np.uint8)
+    if step.get("preset", "None") == "Black & White":
+        return None
+    return np.ascontiguousarray(apply_color_filter(_RAMP, step.get("preset", "None"),
+                                                   float(step.get("intensity", 50)))[:, 0, :])
+
+
+def compose_luts(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Table equivalent to applying `first`, then `second`."""
+    return np.take_along_axis(second, first.astype(np.intp), axis=0)
+
+
+# -----------------------------------------------------------
+# STAGES
+# -----------------------------------------------------------
+class PointStage:
+    """
+    A run of point-wise steps fused into as few full-image passes as possible.
+
+    kernels: ("lut", table) per-channel lookup, ("gray", None) conversion to one
+    channel, ("blend_gray", alpha) partial Black & White. A gray image stays a
+    single channel until a colored table expands it in the same pass.
+    """
+
+    def __init__(self, kernels, source_ops: int):
+        self.kernels = kernels
+        self.source_ops = source_ops
+
+    def __call__(self, img: np.ndarray) -> np.ndarray:
+        for kind, value in self.kernels:
+            if kind == "lut":
+                if img.ndim == 2:
+                    if (value == value[:, :1]).all():
+                        img = cv2.LUT(img, value[:, 0])
+                    else:
+                        # gray -> 3 channels: three lookups of the small gray plane
+                        img = cv2.merge([cv2.LUT(img, np.ascontiguousarray(value[:, c])) for c in range(3)])
+                else:
+                    img = cv2.LUT(img, value.reshape(256, 1, 3))
+            elif kind == "gray":
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            else:
+                gray = cv2.cvtColor(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+                img = cv2.addWeighted(img, 1.0 - value, gray, value, 0)
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        return img
+
+    def __repr__(self):
+        return f"PointStage({[k for k, _ in self.kernels]}, fused from {self.source_ops} steps)"
+
+
+class OpStage:
+    """A neighborhood/model operation from OPERATIONS; a barrier for point-wise fusion."""
+
+    def __init__(self, step: dict, geometry_before: List[str]):
+        self.name = step["op"]
+        self.params = {k: v for k, v in step.items() if k != "op"}
+        self.geometry_before = geometry_before   # for steps with coordinates (object_removal)
+
+    def __call__(self, img: np.ndarray, context: WorkerContext, orientation: Orientation) -> np.ndarray:
+        params = self.params
+        if self.name == "object_removal":
+            # Rect is given in the oriented view at this step: map it back to stored pixels
+            view = orientation.copy()
+            for op in self.geometry_before:
+                view.apply_op(op)
+            rect = tuple(int(params[k]) for k in ("x", "y", "w", "h"))
+            x, y, w, h = view.unmap_rect(rect, (img.shape[1], img.shape[0]))
+            params = dict(params, x=x, y=y, w=w, h=h)
+        return OPERATIONS[self.name](context, img, params)
+
+    def __repr__(self):
+        return f"OpStage({self.name})"
+
+
+def _fuse_point_run(steps: List[dict]) -> Optional[PointStage]:
+    kernels = []
+    is_gray = False
+    for step in steps:
+        table = step_lut(step)
+        if table is not None:
+            if kernels and kernels[-1][0] == "lut":
+                table = compose_luts(kernels.pop()[1], table)
+            if not np.array_equal(table, IDENTITY_LUT):
+                kernels.append(("lut", table))
+            if is_gray and not (table == table[:, :1]).all():
+                is_gray = False
+            continue
+
+        alpha = float(np.clip(float(step.get("intensity", 50)) / 100.0, 0.0, 1.0))
+        if alpha == 0.0 or is_gray:
+            continue   # no-op, or Black & White of an already gray image
+        if alpha == 1.0:
+            kernels.append(("gray", None))
+            is_gray = True
+        else:
+            kernels.append(("blend_gray", alpha))
+    return PointStage(kernels, len(steps)) if kernels else None
+
+
+# -----------------------------------------------------------
+# PLAN
+# -----------------------------------------------------------
+class Plan:
+    """
+    Compiled recipe.
+
+    Geometry never touches pixels while the plan runs: it is accumulated into
+    an Orientation returned alongside the result (or materialized once by
+    __call__). Point-wise and neighborhood ops run in the stored frame, as in
+    the editor, where flips are display-only.
+    """
+
+    def __init__(self, stages, geometry_ops: List[str]):
+        self.stages = stages
+        self.geometry_ops = geometry_ops
+        self._context = None
+
+    @property
+    def orientation(self) -> Orientation:
+        orientation = Orientation()
+        for op in self.geometry_ops:
+            orientation.apply_op(op)
+        return orientation
+
+    def passes(self) -> int:
+        """Full-image passes the plan makes (point kernels, ops and the final orientation copy)."""
+        count = sum(len(s.kernels) if isinstance(s, PointStage) else 1 for s in self.stages)
+        return count + (0 if self.orientation.is_identity() else 1)
+
+    def describe(self) -> List[str]:
+        lines = [repr(stage) for stage in self.stages]
+        if not self.orientation.is_identity():
+            lines.append(repr(self.orientation))
+        return lines
+
+    def run(self, img: np.ndarray, orientation: Optional[Orientation] = None,
+            context: Optional[WorkerContext] = None) -> Tuple[np.ndarray, Orientation]:
+        """
+        img: BGR, BGRA or gray uint8 array, in the stored frame of `orientation`.
+        Returns (pixels in the same frame, orientation with the recipe's geometry applied).
+        BGRA input or a background step produce BGRA output.
+        """
+        orientation = orientation.copy() if orientation is not None else Orientation()
+        alpha = None
+        if img.ndim == 2:
+            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+        elif img.shape[2] == 4:
+            alpha = np.ascontiguousarray(img[..., 3])
+            img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+
+        for stage in self.stages:
+            if isinstance(stage, PointStage):
+                img = stage(img)
+                continue
+            if context is None:
+                if self._context is None:
+                    self._context = WorkerContext()
+                context = self._context
+            img = stage(img, context, orientation)
+            if img.ndim == 3 and img.shape[2] == 4:
+                alpha = np.ascontiguousarray(img[..., 3])
+                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+
+        for op in self.geometry_ops:
+            orientation.apply_op(op)
+        if alpha is not None:
+            img = np.dstack((img, alpha))
+        return img, orientation
+
+    def __call__(self, img: np.ndarray, context: Optional[WorkerContext] = None) -> np.ndarray:
+        """Runs the plan and returns the oriented result in contiguous memory."""
+        result, orientation = self.run(img, context=context)
+        return orientation.materialize(result)
+
+
+def compile_recipe(recipe: Recipe) -> Plan:
+    """Compiles a recipe into a Plan: point-wise runs fused, geometry folded, no-ops dropped."""
+    stages = []
+    geometry_ops = []
+    point_run = []
+
+    def flush():
+        stage = _fuse_point_run(point_run)
+        if stage is not None:
+            stages.append(stage)
+        point_run.clear()
+
+    for step in recipe.steps:
+        op = step["op"]
+        if op in GEOMETRY_OPS:
+            geometry_ops.append(op)
+        elif op in POINT_OPS:
+            point_run.append(step)
+        else:
+            flush()
+            stages.append(OpStage(step, list(geometry_ops)))
+    flush()
+
+    # Keep only the net geometry (double flips, four rotations... cancel out)
+    orientation = Orientation()
+    for op in geometry_ops:
+        orientation.apply_op(op)
+    return Plan(stages, orientation.to_ops())
+
+
+_worker_plans = {}
+
+
+def run_recipe(img: np.ndarray, recipe: dict) -> np.ndarray:
+    """
+    Picklable entry point for src.Parallel.SharedMemoryExecutor workers: `recipe`
+    is a Recipe.to_dict(), compiled once per worker process.
+    """
+    key = json.dumps(recipe, sort_keys=True)
+    plan = _worker_plans.get(key)
+    if plan is None:
+        plan = _worker_plans[key] = compile_recipe(Recipe.from_dict(recipe))
+    return plan(img)
+
@@ -0,0 +1,81 @@
+# recipe.py
+import json
+from typing import List
+
+from src.Other.flip import ORIENTATION_OPS
+from src.Operations import OPERATIONS
+
+RECIPE_VERSION = 1
+
+GEOMETRY_OPS = tuple(ORIENTATION_OPS)   # flip_horizontal, flip_vertical, rotate_cw, rotate_ccw
+POINT_OPS = ("filter", "lut")           # per-pixel ops, fused into lookup tables by the compiler
+
+
+class Recipe:
+    """
+    Serializable chain of edits.
+
+    Each step is a dict {"op": name, **params}:
+      - geometry: flip_horizontal, flip_vertical, rotate_cw, rotate_ccw (no params)
+      - filter: preset, intensity (0..100), same as the "Artistic color tone" controls
+      - lut: table, a 256x3 list of BGR output values
+      - any other name in src.Operations.OPERATIONS with that operation's
+        parameters (denoise, denoise_auto, llie, background, object_removal)
+
+    Stored as JSON: {"version": 1, "steps": [...]}.
+    """
+
+    def __init__(self, steps: List[dict] = None):
+        self.steps = [dict(step) for step in (steps or [])]
+        self.validate()
+
+    def add(self, op: str, **params) -> "Recipe":
+        self.steps.append({"op": op, **params})
+        self.validate()
+        return self
+
+    def validate(self):
+        for i, step in enumerate(self.steps):
+            op = step.get("op")
+            if op in GEOMETRY_OPS or op in POINT_OPS:
+                continue
+            if op not in OPERATIONS:
+                raise ValueError(f"Recipe step {i}: unknown operation {op!r}")
+        for step in self.steps:
+            if step["op"] == "lut" and (len(step.get("table", ())) != 256
+                                        or any(len(row) != 3 for row in step["table"])):
+                raise ValueError("Recipe 'lut' step needs a 256x3 table")
+
+    # ------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------
+    def to_dict(self) -> dict:
+        return {"version": RECIPE_VERSION, "steps": self.steps}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Recipe":
+        if data.get("version", RECIPE_VERSION) > RECIPE_VERSION:
+            raise ValueError(f"Recipe version {data['version']} is newer than supported ({RECIPE_VERSION})")
+        return cls(data.get("steps", []))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Recipe":
+        return cls.from_dict(json.loads(text))
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path: str) -> "Recipe":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_json(f.read())
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __repr__(self):
+        return f"Recipe({[step['op'] for step in self.steps]})"
@@ -0,0 +1,3 @@
+from .workers import OPERATIONS, ProcessingPool, WorkerContext, operation
+from .server import ProcessingServer, serve
+from .client import ServiceClient, new_shared_memory
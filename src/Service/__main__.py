@@ -0,0 +1,33 @@
+""" Long-running local processing service: python -m src.Service [--port 8765 | --unix /tmp/vb.sock] """
+
+import argparse
+import asyncio
+
+from src.Service.server import MAX_BODY_MB, SHM_PREFIX, serve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VisualBundle local processing service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request processing timeout (s)")
+    parser.add_argument("--rembg-model", default="u2net")
+    parser.add_argument("--no-warm", action="store_true", help="load models on first use")
+    parser.add_argument("--max-body-mb", type=float, default=MAX_BODY_MB, help="largest accepted request body")
+    parser.add_argument("--shm-prefix", default=SHM_PREFIX,
+                        help="only shared-memory segments with this name prefix are read or written")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.max_queue,
+                          args.timeout, args.rembg_model, warm=not args.no_warm,
+                          max_body_mb=args.max_body_mb, shm_prefix=args.shm_prefix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# client.py
+import http.client
+import json
+import secrets
+import socket
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+from urllib.parse import urlencode
+
+
+def new_shared_memory(size: int, prefix: str = "vb_") -> shared_memory.SharedMemory:
+    """
+    Segment for process_shm. The server only touches segments named with its
+    --shm-prefix ("vb_" by default); the caller closes and unlinks it.
+    """
+    return shared_memory.SharedMemory(name=prefix + secrets.token_hex(8), create=True, size=size)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str):
+        super().__init__("localhost")
+        self._unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self._unix_path)
+
+
+class ServiceClient:
+    """
+    Small client for the processing service (keeps one keep-alive connection).
+
+    Example:
+        client = ServiceClient()
+        png, timing = client.process("denoise", open("in.jpg", "rb").read(), strength=10)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None):
+        self._conn = _UnixHTTPConnection(unix_path) if unix_path else http.client.HTTPConnection(host, port)
+
+    def _request(self, method, path, body=None, headers=None):
+        self._conn.request(method, path, body=body, headers=headers or {})
+        resp = self._conn.getresponse()
+        data = resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f"{resp.status}: {data.decode(errors='replace')}")
+        return resp, data
+
+    def health(self) -> dict:
+        return json.loads(self._request("GET", "/health")[1])
+
+    def process(self, op: str, image_bytes: bytes, **params) -> Tuple[bytes, dict]:
+        """Sends an encoded image, returns (encoded result, timings in ms)."""
+        resp, data = self._request("POST", f"/process/{op}?{urlencode(params)}", image_bytes,
+                                   {"Content-Type": "application/octet-stream"})
+        timing = {k[2:-3].lower(): float(v) for k, v in resp.getheaders()
+                  if k.startswith("X-") and k.endswith("-Ms")}
+        return data, timing
+
+    def process_shm(self, op: str, shm_name: str, shape, dtype: str = "uint8",
+                    out_shm: Optional[str] = None, **params) -> dict:
+        """
+        Processes an image held in shared memory (see new_shared_memory); the result
+        goes to `out_shm` when it fits.
+        """
+        body = json.dumps({"shm": shm_name, "shape": list(shape), "dtype": dtype,
+                           "params": params, "out_shm": out_shm}).encode()
+        resp, data = self._request("POST", f"/process/{op}", body, {"Content-Type": "application/json"})
+        if resp.getheader("Content-Type", "").startswith("application/json"):
+            return json.loads(data)
+        return {"encoded": data}
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,304 @@
+# server.py
+import asyncio
+import json
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import cv2
+import numpy as np
+
+from src.Operations import OPERATIONS
+from src.Service.workers import ProcessingPool
+
+STREAM_CHUNK = 1 << 20
+MAX_BODY_MB = 256          # encoded images / JSON requests above this are rejected with 413
+SHM_PREFIX = "vb_"         # only shared-memory segments named with this prefix are read or written
+ENCODINGS = {"png": (".png", [cv2.IMWRITE_PNG_COMPRESSION, 1]),
+             "jpg": (".jpg", [cv2.IMWRITE_JPEG_QUALITY, 95]),
+             "webp": (".webp", [cv2.IMWRITE_WEBP_QUALITY, 95])}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _as_uint8(img: np.ndarray) -> np.ndarray:
+    """The operations work on 8-bit images: 16-bit input is scaled down, other depths are a 400."""
+    if img.dtype == np.uint8:
+        return img
+    if img.dtype == np.uint16:
+        return cv2.convertScaleAbs(img, alpha=1.0 / 257.0)
+    raise HttpError(400, f"Unsupported pixel type {img.dtype} (8- or 16-bit images only)")
+
+
+def _decode(body: bytes) -> np.ndarray:
+    img = cv2.imdecode(np.frombuffer(body, np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise HttpError(400, "Could not decode image body")
+    return _as_uint8(img)
+
+
+def _encode(img: np.ndarray, fmt: str) -> bytes:
+    ext, flags = ENCODINGS[fmt]
+    ok, buf = cv2.imencode(ext, img, flags)
+    if not ok:
+        raise HttpError(500, f"Could not encode result as {fmt}")
+    return buf.tobytes()
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a client-owned segment without letting this process unlink it at exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _check_shm_name(name, prefix: str) -> str:
+    """Callers may only point the server at segments created for it, never at arbitrary ones."""
+    if not isinstance(name, str) or not name.startswith(prefix) or "/" in name:
+        raise HttpError(400, f"Shared-memory segment names must start with {prefix!r}")
+    return name
+
+
+def _read_shm(name: str, shape, dtype: str) -> np.ndarray:
+    try:
+        shape, dtype = tuple(int(n) for n in shape), np.dtype(dtype)
+    except (TypeError, ValueError) as e:
+        raise HttpError(400, f"Bad shape/dtype: {e}")
+    try:
+        shm = _attach_shm(name)
+    except FileNotFoundError:
+        raise HttpError(400, f"No shared-memory segment {name!r}")
+    try:
+        if any(n < 0 for n in shape) or int(np.prod(shape)) * dtype.itemsize > shm.size:
+            raise HttpError(400, f"Shape {shape} ({dtype}) does not fit segment {name!r} ({shm.size} bytes)")
+        return _as_uint8(np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy())
+    finally:
+        shm.close()
+
+
+def _write_shm(name: str, img: np.ndarray) -> bool:
+    try:
+        shm = _attach_shm(name)
+    except FileNotFoundError:
+        raise HttpError(400, f"No shared-memory segment {name!r}")
+    try:
+        if shm.size < img.nbytes:
+            return False
+        np.ndarray(img.shape, dtype=img.dtype, buffer=shm.buf)[...] = img
+        return True
+    finally:
+        shm.close()
+
+
+class ProcessingServer:
+    """
+    Minimal asyncio HTTP/1.1 front end for a ProcessingPool.
+
+    POST /process/<op>?param=value   body: encoded image (PNG/JPEG/...)
+        -> encoded result (?format=png|jpg|webp), timings in X-*-Ms headers
+    POST /process/<op>   Content-Type: application/json
+        {"shm": name, "shape": [h, w, c], "dtype": "uint8", "params": {...}, "out_shm": name?}
+        -> result written into out_shm when given (JSON reply), encoded result otherwise
+    GET /health -> JSON status
+
+    At most `max_concurrent` operations run at once; up to `max_queue` more
+    requests wait, further requests are rejected with 503. A request that times
+    out gets a 504 but keeps its slot until the operation actually stops, so
+    abandoned work cannot pile up behind the limit. Bodies above `max_body_mb`
+    get a 413; shared-memory names must start with `shm_prefix`.
+    """
+
+    def __init__(self, pool: ProcessingPool, max_concurrent: Optional[int] = None,
+                 max_queue: int = 64, timeout: float = 300.0, max_body_mb: float = MAX_BODY_MB,
+                 shm_prefix: str = SHM_PREFIX):
+        self.pool = pool
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_body = int(max_body_mb * 1024 * 1024)
+        self.shm_prefix = shm_prefix
+        self._slots = asyncio.Semaphore(max_concurrent or pool.workers)
+        self._queued = 0
+        self._in_flight = 0
+        self._served = 0
+
+    # ------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > self.max_body:
+                    # The body is not read: answer and drop the connection
+                    payload = json.dumps({"error": f"Body exceeds {self.max_body} bytes"}).encode()
+                    await self._respond(writer, 413, {}, "application/json", payload, keep_alive=False)
+                    break
+                body = await reader.readexactly(length)
+
+                try:
+                    status, extra, content_type, payload = await self.dispatch(method, target, headers, body)
+                except HttpError as e:
+                    status, extra, content_type, payload = e.status, {}, "application/json", \
+                        json.dumps({"error": str(e)}).encode()
+                except Exception as e:
+                    status, extra, content_type, payload = 500, {}, "application/json", \
+                        json.dumps({"error": str(e)}).encode()
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, extra, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, extra, content_type, payload, keep_alive):
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                  503: "Service Unavailable", 504: "Gateway Timeout"}.get(status, "Error")
+        head = [f"HTTP/1.1 {status} {reason}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(payload)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        # Stream large results in chunks so the socket buffer applies back-pressure
+        view = memoryview(payload)
+        for i in range(0, len(view), STREAM_CHUNK):
+            writer.write(view[i:i + STREAM_CHUNK])
+            await writer.drain()
+        await writer.drain()
+
+    # ------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------
+    async def dispatch(self, method, target, headers, body):
+        url = urlsplit(target)
+        if method == "GET" and url.path == "/health":
+            status = {"operations": sorted(OPERATIONS), "workers": self.pool.workers,
+                      "in_flight": self._in_flight, "queued": self._queued, "served": self._served}
+            return 200, {}, "application/json", json.dumps(status).encode()
+
+        if method != "POST" or not url.path.startswith("/process/"):
+            raise HttpError(404, f"No route for {method} {url.path}")
+        op = url.path[len("/process/"):]
+        if op not in OPERATIONS:
+            raise HttpError(404, f"Unknown operation: {op}")
+        return await self._process(op, dict(parse_qsl(url.query)), headers, body)
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        self._slots.release()
+
+    @staticmethod
+    def _call_in_loop(loop, fn):
+        try:
+            loop.call_soon_threadsafe(fn)
+        except RuntimeError:
+            pass   # loop already closed (server shutting down)
+
+    async def _process(self, op, params, headers, body):
+        # Reject before decoding when the queue is already full
+        if self._queued >= self.max_queue:
+            raise HttpError(503, "Server busy: request queue is full")
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        timing = {}
+
+        # Input: shared-memory handle or encoded bytes
+        request = None
+        if headers.get("content-type", "").startswith("application/json"):
+            try:
+                request = json.loads(body)
+                params.update(request.get("params", {}))
+                shm_name, shape = _check_shm_name(request["shm"], self.shm_prefix), request["shape"]
+                if request.get("out_shm"):
+                    _check_shm_name(request["out_shm"], self.shm_prefix)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise HttpError(400, f"Bad request body: {e}")
+            img = await loop.run_in_executor(None, _read_shm, shm_name, shape, request.get("dtype", "uint8"))
+        else:
+            img = await loop.run_in_executor(None, _decode, body)
+        timing["decode"] = (time.perf_counter() - t0) * 1000.0
+
+        # Queue for a processing slot
+        t_queue = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        timing["queue"] = (time.perf_counter() - t_queue) * 1000.0
+
+        self._in_flight += 1
+        try:
+            job = self.pool.submit(op, img, params)
+        except BaseException:
+            self._release_slot()
+            raise
+        # The slot is freed when the pool thread is done with the op (or the op is
+        # cancelled before starting), not when this request stops waiting for it
+        job.add_done_callback(lambda _: self._call_in_loop(loop, self._release_slot))
+        try:
+            result, timing["process"] = await asyncio.wait_for(asyncio.wrap_future(job), self.timeout)
+        except asyncio.TimeoutError:
+            raise HttpError(504, f"{op} exceeded {self.timeout}s")
+        except (KeyError, ValueError) as e:
+            raise HttpError(400, str(e))
+        self._served += 1
+
+        # Output: into the caller's shared memory, or encoded bytes
+        t_enc = time.perf_counter()
+        out_name = request.get("out_shm") if request else None
+        if out_name and await loop.run_in_executor(None, _write_shm, out_name, result):
+            timing["encode"] = (time.perf_counter() - t_enc) * 1000.0
+            timing["total"] = (time.perf_counter() - t0) * 1000.0
+            reply = {"out_shm": out_name, "shape": list(result.shape), "dtype": str(result.dtype), "timing": timing}
+            return 200, {}, "application/json", json.dumps(reply).encode()
+
+        fmt = params.get("format", "png").lower()
+        if fmt not in ENCODINGS:
+            raise HttpError(400, f"Unsupported output format: {fmt}")
+        payload = await loop.run_in_executor(None, _encode, result, fmt)
+        timing["encode"] = (time.perf_counter() - t_enc) * 1000.0
+        timing["total"] = (time.perf_counter() - t0) * 1000.0
+        extra = {f"X-{k.capitalize()}-Ms": f"{v:.2f}" for k, v in timing.items()}
+        return 200, extra, f"image/{'jpeg' if fmt == 'jpg' else fmt}", payload
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None,
+                workers: Optional[int] = None, max_queue: int = 64, timeout: float = 300.0,
+                rembg_model: str = "u2net", warm: bool = True, max_body_mb: float = MAX_BODY_MB,
+                shm_prefix: str = SHM_PREFIX):
+    pool = ProcessingPool(workers=workers, rembg_model=rembg_model, warm=warm)
+    server = ProcessingServer(pool, max_queue=max_queue, timeout=timeout, max_body_mb=max_body_mb,
+                              shm_prefix=shm_prefix)
+    if unix_path:
+        srv = await asyncio.start_unix_server(server.handle_connection, path=unix_path)
+        print(f"✅ VisualBundle service listening on unix:{unix_path} ({pool.workers} workers)")
+    else:
+        srv = await asyncio.start_server(server.handle_connection, host, port)
+        print(f"✅ VisualBundle service listening on http://{host}:{port} ({pool.workers} workers)")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        pool.shutdown(wait=False)
@@ -0,0 +1,52 @@
+# workers.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from src.Operations.operations import HAS_CPP_REMOVER, OPERATIONS, WorkerContext, operation
+from src.Other import exemplar
+from src.Tuning import get_profile
+
+
+class ProcessingPool:
+    """
+    Fixed pool of worker threads running OPERATIONS.
+
+    OpenCV, ONNX Runtime and the C++ inpainter release the GIL, so threads run
+    the heavy parts concurrently without copying images between processes.
+    """
+
+    def __init__(self, workers: Optional[int] = None, rembg_model: str = "u2net", warm: bool = True):
+        self.workers = workers or get_profile().service_workers or max(1, min(4, os.cpu_count() or 1))
+        self.context = WorkerContext(rembg_model)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="vb-worker")
+        if warm:
+            self.warm_up()
+
+    def warm_up(self):
+        """Loads the default rembg model and a PatchRemover per worker (or the JIT inpainter) up front."""
+        try:
+            self.context.rembg_session()
+        except Exception as e:
+            print(f"⚠️ rembg warm-up failed: {e}")
+        for f in [self._pool.submit(self.context.patch_remover) for _ in range(self.workers)]:
+            f.result()
+        if not HAS_CPP_REMOVER:
+            exemplar.warm_up()
+
+    def _run(self, op: str, img: np.ndarray, params: dict):
+        start = time.perf_counter()
+        result = OPERATIONS[op](self.context, img, params)
+        return result, (time.perf_counter() - start) * 1000.0
+
+    def submit(self, op: str, img: np.ndarray, params: dict):
+        """Returns a concurrent Future resolving to (result, process_ms)."""
+        if op not in OPERATIONS:
+            raise KeyError(f"Unknown operation: {op}")
+        return self._pool.submit(self._run, op, img, params)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
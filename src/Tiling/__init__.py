@@ -0,0 +1,3 @@
+from .reader import TiledTiffReader
+from .ops import TileOp, FlipOp, ColorFilterOp, DenoiseOp, LlieOp, PointOp, ChainOp, ops_from_recipe
+from .engine import TiledPipeline, process_tiff
@@ -0,0 +1,51 @@
+""" Command line entry point: python -m src.Tiling input.tif output.tif [ops...] """
+
+import argparse
+
+from src.Denoising.denoising import CHROMA_MODES, EDGE_METHODS
+
+from src.Recipe import Recipe
+from src.Tiling import ColorFilterOp, DenoiseOp, FlipOp, LlieOp, ops_from_recipe, process_tiff
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Out-of-core tiled processing for large TIFF files.",
+        epilog="Differences from the editor and src.Recipe: low light uses fixed 128 px CLAHE cells "
+               "instead of an 8x8 grid over the whole image, and flips are applied before every "
+               "other op (recipes with a flip after denoise/llie are rejected).")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--tile-size", type=int, default=None, help="default: tuning profile (512)")
+    parser.add_argument("--compression", default="zlib")
+    parser.add_argument("--flip-h", action="store_true")
+    parser.add_argument("--flip-v", action="store_true")
+    parser.add_argument("--denoise", type=int, default=0, metavar="STRENGTH")
+    parser.add_argument("--nlm", action="store_true", help="use NLM instead of the edge-preserving filter")
+    parser.add_argument("--salt-pepper", action="store_true")
+    parser.add_argument("--edge-method", default="bilateral", choices=EDGE_METHODS)
+    parser.add_argument("--chroma", default="full", choices=CHROMA_MODES,
+                        help="half/quarter: denoise chroma at reduced resolution (faster)")
+    parser.add_argument("--llie", type=float, default=0, metavar="INTENSITY",
+                        help="0..100 (fixed 128 px CLAHE cells, see below)")
+    parser.add_argument("--llie-detail", type=float, default=30, help="0..100")
+    parser.add_argument("--llie-clip", type=float, default=2.0)
+    parser.add_argument("--filter", default="None", help="Warm, Cool, Sepia, Cinematic, Black & White")
+    parser.add_argument("--filter-intensity", type=float, default=50)
+    parser.add_argument("--recipe", default=None, help="saved edit recipe (JSON); replaces the op flags")
+    args = parser.parse_args()
+
+    # Same order as the GUI: geometry, denoise, low light, color tone
+    ops = []
+    if args.flip_h: ops.append(FlipOp("horizontal"))
+    if args.flip_v: ops.append(FlipOp("vertical"))
+    if args.denoise > 0: ops.append(DenoiseOp(args.denoise, not args.nlm, args.salt_pepper, args.edge_method, args.chroma))
+    if args.llie > 0: ops.append(LlieOp(args.llie / 100.0, args.llie_detail / 100.0, args.llie_clip))
+    if args.filter != "None": ops.append(ColorFilterOp(args.filter, args.filter_intensity))
+    if args.recipe: ops = ops_from_recipe(Recipe.load(args.recipe))
+
+    process_tiff(args.input, args.output, ops, tile_size=args.tile_size, compression=args.compression)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# engine.py
+import math
+from typing import Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+import tifffile
+
+from src.Tiling.ops import FlipOp, TileOp
+from src.Tiling.reader import TiledTiffReader
+from src.Tuning import get_profile
+
+
+def _to_bgr(region: np.ndarray) -> np.ndarray:
+    if region.ndim == 2:
+        return cv2.cvtColor(region, cv2.COLOR_GRAY2BGR)
+    if region.shape[2] == 4:
+        return cv2.cvtColor(region, cv2.COLOR_RGBA2BGR)
+    return cv2.cvtColor(region, cv2.COLOR_RGB2BGR)
+
+
+class TiledPipeline:
+    """
+    Streams a large TIFF through a list of TileOps, one output tile at a time.
+
+    Flips are folded into the read coordinates (no extra pass). Every other op
+    receives the tile grown by the halo of all ops after it, so neighborhood
+    filters see the same context they would on the full image. Peak memory is
+    a few (tile + halo) regions plus the reader's segment cache.
+    """
+
+    def __init__(self, ops: Sequence[TileOp], tile_size: Optional[int] = None):
+        tile_size = tile_size or get_profile().tile_size
+        if tile_size % 16:
+            raise ValueError("tile_size must be a multiple of 16 (TIFF tile constraint)")
+        self.tile_size = tile_size
+        self.flip_x = False
+        self.flip_y = False
+        self.ops: List[TileOp] = []
+        for op in ops:
+            if isinstance(op, FlipOp):
+                if op.direction == "horizontal":
+                    self.flip_x = not self.flip_x
+                else:
+                    self.flip_y = not self.flip_y
+            else:
+                self.ops.append(op)
+
+    # ------------------------------------------------------
+    # Region access
+    # ------------------------------------------------------
+    def _read_oriented(self, reader: TiledTiffReader, y0, y1, x0, x1) -> np.ndarray:
+        """Reads a region of the (virtually) flipped image as BGR."""
+        h, w = reader.height, reader.width
+        sy0, sy1 = (h - y1, h - y0) if self.flip_y else (y0, y1)
+        sx0, sx1 = (w - x1, w - x0) if self.flip_x else (x0, x1)
+        region = reader.read(sy0, sy1, sx0, sx1)
+        if self.flip_y:
+            region = region[::-1]
+        if self.flip_x:
+            region = region[:, ::-1]
+        return _to_bgr(np.ascontiguousarray(region))
+
+    def _tile_boxes(self, h: int, w: int):
+        t = self.tile_size
+        for y in range(0, h, t):
+            for x in range(0, w, t):
+                yield y, min(y + t, h), x, min(x + t, w)
+
+    @staticmethod
+    def _grow(box, halo: int, align: int, h: int, w: int):
+        """`box` grown by `halo`, clipped to the image, with its origin moved down to a multiple of `align`."""
+        y0, y1, x0, x1 = box
+        ry0, rx0 = max(0, y0 - halo), max(0, x0 - halo)
+        return ry0 - ry0 % align, min(h, y1 + halo), rx0 - rx0 % align, min(w, x1 + halo)
+
+    def _process_region(self, reader, box, ops: Sequence[TileOp]) -> np.ndarray:
+        """Runs `ops` on one tile and returns the processed tile core."""
+        y0, y1, x0, x1 = box
+        align = math.lcm(*(op.align for op in ops)) if ops else 1
+        ry0, ry1, rx0, rx1 = self._grow(box, sum(op.halo for op in ops), align, reader.height, reader.width)
+        region = self._read_oriented(reader, ry0, ry1, rx0, rx1)
+        for op in ops:
+            region = op(region)
+        return region[y0 - ry0:y1 - ry0, x0 - rx0:x1 - rx0]
+
+    def _prepare(self, reader: TiledTiffReader):
+        # Ops with global statistics see their input as produced by the ops before them
+        for i, op in enumerate(self.ops):
+            if not op.needs_prepare:
+                continue
+            before = self.ops[:i]
+
+            def regions():
+                for tile in self._tile_boxes(reader.height, reader.width):
+                    box = self._grow(tile, op.halo, 1, reader.height, reader.width)
+                    core = (slice(tile[0] - box[0], tile[1] - box[0]), slice(tile[2] - box[2], tile[3] - box[2]))
+                    yield self._process_region(reader, box, before), core
+
+            op.prepare(regions())
+
+    # ------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------
+    def iter_tiles(self, reader: TiledTiffReader) -> Iterator[np.ndarray]:
+        """Yields processed RGB tiles in row-major order, padded to tile_size."""
+        t = self.tile_size
+        self._prepare(reader)
+        for box in self._tile_boxes(reader.height, reader.width):
+            core = self._process_region(reader, box, self.ops)
+            tile = np.zeros((t, t, 3), dtype=np.uint8)
+            tile[:core.shape[0], :core.shape[1]] = cv2.cvtColor(core, cv2.COLOR_BGR2RGB)
+            yield tile
+
+    def run(self, src_path: str, dst_path: str, compression: str = "zlib"):
+        """Processes `src_path` and writes a tiled (Big)TIFF to `dst_path` incrementally."""
+        with TiledTiffReader(src_path) as reader:
+            shape = (reader.height, reader.width, 3)
+            with tifffile.TiffWriter(dst_path, bigtiff=True) as tif:
+                tif.write(self.iter_tiles(reader), shape=shape, dtype=np.uint8,
+                          tile=(self.tile_size, self.tile_size), photometric="rgb",
+                          compression=compression)
+
+
+def process_tiff(src_path: str, dst_path: str, ops: Sequence[TileOp],
+                 tile_size: Optional[int] = None, compression: str = "zlib"):
+    """Convenience wrapper around TiledPipeline(ops, tile_size).run(...)."""
+    TiledPipeline(ops, tile_size).run(src_path, dst_path, compression)
@@ -0,0 +1,223 @@
+# ops.py
+import math
+
+import cv2
+import numpy as np
+
+from src.Denoising import apply_denoising_logic
+from src.Denoising import denoising
+from src.Denoising.denoising import GUIDED_SUBSAMPLE, ImageDenoiser
+from src.Filtering import apply_color_filter
+from src.Llie import enhance_image, ssr_value_range
+from src.Llie.Llie import ssr_sigma
+from src.Operations import parse_flag
+from src.Recipe import GEOMETRY_OPS, POINT_OPS, Recipe, compile_recipe
+from src.Recipe.compiler import PointStage
+
+
+class TileOp:
+    """
+    One processing step of a tiled pipeline.
+
+    halo: number of context pixels the op needs around each tile so that the
+          tile core matches a full-image run (0 for point-wise ops).
+    align: the region an op receives starts at a multiple of `align` in image
+           coordinates (ops working on a fixed grid, e.g. CLAHE cells).
+    needs_prepare: the op needs a first pass over the whole image (global stats).
+    """
+    halo = 0
+    align = 1
+    needs_prepare = False
+
+    def prepare(self, regions):
+        """
+        Receives an iterator over all (region, core) pairs of the op's input: a
+        (tile + halo) region and the (rows, cols) slices of the tile inside it.
+        """
+
+    def __call__(self, tile: np.ndarray) -> np.ndarray:
+        return tile
+
+
+class FlipOp(TileOp):
+    """Geometric op: folded into the read coordinates by the engine, never run per tile."""
+
+    def __init__(self, direction: str):
+        if direction not in ("horizontal", "vertical"):
+            raise ValueError(f"Unknown flip direction: {direction}")
+        self.direction = direction
+
+
+class ColorFilterOp(TileOp):
+    def __init__(self, preset_name: str, intensity_percent: float):
+        self.preset_name = preset_name
+        self.intensity_percent = intensity_percent
+
+    def __call__(self, tile):
+        return apply_color_filter(tile, self.preset_name, self.intensity_percent)
+
+
+class DenoiseOp(TileOp):
+    def __init__(self, strength: int, edge_preserving: bool, salt_pepper_fix: bool,
+                 edge_method: str = "bilateral", chroma_mode: str = "full"):
+        self.strength = strength
+        self.edge_preserving = edge_preserving
+        self.salt_pepper_fix = salt_pepper_fix
+        self.edge_method = edge_method
+        self.chroma_mode = chroma_mode
+
+        grid = 1   # sampling grid of the guided coefficients
+        if edge_preserving and edge_method == "bilateral":
+            self.halo = int(strength / 2) + 1
+        elif edge_preserving and edge_method == "guided_fast":
+            # Coefficients on a 1/GUIDED_SUBSAMPLE grid: two box filters of the reduced
+            # radius, the area cell and the linear interpolation, in grid cells
+            radius, _ = ImageDenoiser.guided_params(strength)
+            self.halo = (2 * max(1, round(radius / GUIDED_SUBSAMPLE)) + 2) * GUIDED_SUBSAMPLE
+            grid = GUIDED_SUBSAMPLE
+        elif edge_preserving:
+            # Two box filters of the guided radius
+            radius, _ = ImageDenoiser.guided_params(strength)
+            self.halo = 2 * radius
+        else:
+            # Windows are read at construction time (they follow the active tuning profile)
+            self.halo = denoising.NLM_SEARCH // 2 + denoising.NLM_TEMPLATE // 2
+        subsample = denoising.CHROMA_SUBSAMPLE[chroma_mode]
+        if subsample > 1:
+            # Chroma is filtered at 1/subsample, then guided-upsampled (two more box filters)
+            self.halo = subsample * (self.halo + 2 * denoising.CHROMA_GUIDE_RADIUS + 1)
+        if salt_pepper_fix:
+            self.halo += denoising.IMPULSE_MAX_RADIUS   # impulse repair runs before the denoiser
+        # Both region edges stay on the sampling grids of the full image (the guided
+        # coefficients of the chroma planes are on a grid of subsample * grid pixels)
+        self.align = subsample * grid
+        self.halo = -(-self.halo // self.align) * self.align
+
+    def __call__(self, tile):
+        return apply_denoising_logic(tile, self.strength, self.edge_preserving, self.salt_pepper_fix,
+                                     self.edge_method, chroma_mode=self.chroma_mode)
+
+
+def _gaussian_reach(sigma: float) -> int:
+    """Pixels read on each side by cv2.GaussianBlur with ksize (0, 0) on a float plane (8 sigma + 1 taps)."""
+    return (round(8 * sigma + 1) | 1) // 2
+
+
+class LlieOp(TileOp):
+    """
+    Low light enhancement in tiles.
+
+    CLAHE uses fixed-size cells (`cell_size` pixels) on a grid anchored at the
+    image origin instead of a fixed 8x8 grid, and the SSR normalization range is
+    measured over the whole image in a first pass, so the result does not depend
+    on the tile size. It therefore differs from the editor's low light (and a
+    recipe's "llie" step), which uses an 8x8 grid sized to the whole image.
+    """
+    needs_prepare = True
+
+    def __init__(self, intensity: float, detail: float, clahe_clip: float = 2.0, cell_size: int = 128):
+        self.intensity = intensity
+        self.detail = detail
+        self.clahe_clip = clahe_clip
+        self.cell_size = cell_size
+        self.ssr_range = None
+
+        # Reach of the SSR surround and of the unsharp mask blurs
+        ssr_reach = _gaussian_reach(ssr_sigma(detail))
+        unsharp_reach = _gaussian_reach(1.0 + 10.0 * detail)
+        # A CLAHE pixel blends its own cell and the next one (2 cells from a tile edge
+        # that is not on the cell grid); the unsharp mask then reads around it
+        self.halo = max(2 * cell_size + unsharp_reach, ssr_reach)
+        self.halo = -(-self.halo // cell_size) * cell_size
+        self.align = cell_size
+
+    def prepare(self, regions):
+        lows, highs = np.full(3, np.inf), np.full(3, -np.inf)
+        sigma = ssr_sigma(self.detail)
+        for region, core in regions:
+            lo, hi = ssr_value_range(region, sigma=sigma, core=core)
+            lows, highs = np.minimum(lows, lo), np.maximum(highs, hi)
+        self.ssr_range = (lows, highs)
+
+    def __call__(self, tile):
+        # Whole cells only: the right/bottom edges are mirrored up to the next cell
+        # boundary, as OpenCV pads the full image
+        c = self.cell_size
+        h, w = tile.shape[:2]
+        pad_y, pad_x = -h % c, -w % c
+        if pad_y or pad_x:
+            tile = cv2.copyMakeBorder(tile, 0, pad_y, 0, pad_x, cv2.BORDER_REFLECT_101)
+        grid = (tile.shape[1] // c, tile.shape[0] // c)
+        out = enhance_image(tile, intensity=self.intensity, detail=self.detail,
+                            clahe_clip=self.clahe_clip, tile_grid=grid, ssr_range=self.ssr_range)
+        return out[:h, :w]
+
+
+class PointOp(TileOp):
+    """Fused point-wise stage of a compiled recipe (one or two lookups per tile)."""
+
+    def __init__(self, stage: PointStage):
+        self.stage = stage
+
+    def __call__(self, tile):
+        return self.stage(tile)
+
+
+class ChainOp(TileOp):
+    """Several ops run one after the other on the same region (one preview op for the viewer)."""
+
+    def __init__(self, ops):
+        self.ops = list(ops)
+        self.halo = sum(op.halo for op in self.ops)
+        self.align = math.lcm(*(op.align for op in self.ops))
+        self.needs_prepare = any(op.needs_prepare for op in self.ops)
+
+    def __call__(self, tile):
+        for op in self.ops:
+            tile = op(tile)
+        return tile
+
+
+def ops_from_recipe(recipe: Recipe):
+    """
+    TileOps for a recipe. Flips are kept (the engine folds them into reads, ahead
+    of every other op); rotations and whole-image model ops (background, object
+    removal) are not tileable.
+
+    The result matches the recipe run by src.Recipe, except that:
+      - a flip placed after a denoise or llie step would run before it: such
+        recipes are rejected (point-wise filters and LUTs commute with flips);
+      - llie uses fixed-size CLAHE cells (see LlieOp), not the editor's 8x8 grid.
+    """
+    after_neighborhood = []
+    seen_neighborhood = False
+    for step in recipe.steps:
+        if step["op"] in GEOMETRY_OPS:
+            if seen_neighborhood:
+                after_neighborhood.append(step["op"])
+        elif step["op"] not in POINT_OPS:
+            seen_neighborhood = True
+    if compile_recipe(Recipe([{"op": op} for op in after_neighborhood])).geometry_ops:
+        raise ValueError("Flips after a denoise/llie step are not supported in tiled mode "
+                         "(they would be applied before it): move them to the start of the recipe")
+
+    plan = compile_recipe(recipe)
+    ops = []
+    for op in plan.geometry_ops:
+        if op not in ("flip_horizontal", "flip_vertical"):
+            raise ValueError(f"{op} is not supported in tiled mode")
+        ops.append(FlipOp(op[len("flip_"):]))
+    for stage in plan.stages:
+        if isinstance(stage, PointStage):
+            ops.append(PointOp(stage))
+        elif stage.name == "denoise":
+            p = stage.params
+            ops.append(DenoiseOp(int(p.get("strength", 10)), parse_flag(p.get("edge_preserving", True)),
+                                 parse_flag(p.get("salt_pepper", False)), p.get("edge_method", "bilateral"),
+                                 p.get("chroma_mode", "full")))
+        elif stage.name == "llie":
+            p = stage.params
+            ops.append(LlieOp(float(p.get("intensity", 0.2)), float(p.get("detail", 0.3)), float(p.get("clip", 2.0))))
+        else:
+            raise ValueError(f"{stage.name} is not supported in tiled mode")
+    return ops
@@ -0,0 +1,94 @@
+# reader.py
+from collections import OrderedDict
+
+import numpy as np
+import tifffile
+
+
+class TiledTiffReader:
+    """
+    Random-access region reader for (very) large TIFF files.
+
+    - Uncompressed contiguous files are memory-mapped: reads only touch the
+      pages backing the requested region.
+    - Compressed tiled/striped files decode only the segments overlapping
+      the region, keeping the last `cache_segments` decoded segments.
+    """
+
+    def __init__(self, path: str, cache_segments: int = 16):
+        self._tif = tifffile.TiffFile(path)
+        page = self._tif.pages[0]
+        self._page = page
+        self.shape = page.shape
+        self.dtype = page.dtype
+        if page.dtype != np.uint8:
+            self.close()
+            raise ValueError(f"Only 8-bit TIFF input is supported (got {page.dtype})")
+        if len(self.shape) == 3 and page.planarconfig != 1:
+            self.close()
+            raise ValueError("Planar (separate) TIFF sample layout is not supported")
+
+        self._memmap = tifffile.memmap(path, mode="r") if page.is_memmappable else None
+        self._seg_h, self._seg_w = page.chunks[0], page.chunks[1]
+        self._seg_cols = page.chunked[1]
+        self._cache = OrderedDict()
+        self._cache_size = cache_segments
+
+    @property
+    def height(self) -> int:
+        return self.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.shape[1]
+
+    def read(self, y0: int, y1: int, x0: int, x1: int) -> np.ndarray:
+        """Returns a contiguous copy of rows [y0, y1) and columns [x0, x1)."""
+        if self._memmap is not None:
+            return np.ascontiguousarray(self._memmap[y0:y1, x0:x1])
+
+        out = np.empty((y1 - y0, x1 - x0) + tuple(self.shape[2:]), dtype=self.dtype)
+        for r in range(y0 // self._seg_h, (y1 - 1) // self._seg_h + 1):
+            for c in range(x0 // self._seg_w, (x1 - 1) // self._seg_w + 1):
+                seg, sy, sx = self._segment(r * self._seg_cols + c)
+                # Intersection of the segment with the requested region
+                iy0, iy1 = max(y0, sy), min(y1, sy + seg.shape[0])
+                ix0, ix1 = max(x0, sx), min(x1, sx + seg.shape[1])
+                if iy0 < iy1 and ix0 < ix1:
+                    out[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = seg[iy0 - sy:iy1 - sy, ix0 - sx:ix1 - sx]
+        return out
+
+    def _segment(self, index: int):
+        hit = self._cache.get(index)
+        if hit is not None:
+            self._cache.move_to_end(index)
+            return hit
+
+        page = self._page
+        fh = self._tif.filehandle
+        fh.seek(page.dataoffsets[index])
+        data = fh.read(page.databytecounts[index])
+        seg, indices, _ = page.decode(data, index, jpegtables=page.jpegtables)
+        sy, sx = indices[2], indices[3]
+
+        # Drop the sample/depth axes added by tifffile, crop padding at image edges
+        seg = seg[0]
+        seg = seg[:self.height - sy, :self.width - sx]
+        if len(self.shape) == 2:
+            seg = seg[..., 0]
+
+        self._cache[index] = (seg, sy, sx)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return seg, sy, sx
+
+    def close(self):
+        self._cache.clear()
+        self._memmap = None
+        self._tif.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,2 @@
+from .profile import TuningProfile, load_profile, save_profile, apply_profile, get_profile, default_profile_path
+from .calibrate import calibrate
@@ -0,0 +1,45 @@
+""" Command line entry point: python -m src.Tuning calibrate|show [--profile PATH] [--set key=value ...] """
+
+import argparse
+import json
+
+from src.Tuning import calibrate, default_profile_path, load_profile, save_profile
+
+
+def _parse_pins(pairs):
+    pins = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"--set expects key=value, got: {pair}")
+        pins[key.strip()] = value.strip()
+    return pins
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-machine performance tuning profile.")
+    parser.add_argument("command", choices=("calibrate", "show"))
+    parser.add_argument("--profile", default=None, help=f"profile file (default: {default_profile_path()})")
+    parser.add_argument("--quick", action="store_true", help="smaller benchmark images")
+    parser.add_argument("--set", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="pin a value (kept across recalibration), e.g. cv2_threads=8")
+    args = parser.parse_args()
+
+    path = args.profile or default_profile_path()
+    profile = load_profile(path)
+    pins = _parse_pins(args.set)
+    if pins:
+        profile.update(pins)          # validates and converts the values
+        profile.overrides.update({key: getattr(profile, key) for key in pins})
+
+    if args.command == "calibrate":
+        profile = calibrate(profile, quick=args.quick)
+    if args.command == "calibrate" or pins:
+        print(f"✅ Saved tuning profile to {save_profile(profile, path)}")
+
+    shown = {k: v for k, v in profile.to_dict().items() if k != "measurements"}
+    print(json.dumps(shown, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# calibrate.py
+import os
+import tempfile
+import time
+from typing import Callable, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from src.Tuning.profile import TuningProfile, cpu_count
+
+INTERACTIVE_MS = 250             # slider previews should stay below this
+NLM_BUDGET_MS_PER_MP = 1500      # largest NLM search window whose cost fits this budget wins
+NLM_WINDOWS = ((7, 21), (7, 15), (5, 11))
+TILE_SIZES = (256, 512, 1024)
+SIZES_MP = (0.5, 2.0, 8.0)
+QUICK_SIZES_MP = (0.25, 1.0)
+TOLERANCE = 0.05                 # prefer fewer threads/processes unless more are >5% faster
+
+
+def synthetic_image(megapixels: float, seed: int = 0) -> np.ndarray:
+    """Noisy BGR image with smooth gradients and hard edges, about `megapixels` in size."""
+    w = int(round((megapixels * 1e6 * 4 / 3) ** 0.5))
+    h = max(1, int(megapixels * 1e6 / w))
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 256, (h // 64 + 2, w // 64 + 2, 3), dtype=np.uint8)
+    img = cv2.resize(base, (w, h), interpolation=cv2.INTER_CUBIC)
+    for _ in range(20):
+        x, y = int(rng.integers(0, w)), int(rng.integers(0, h))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(img, (x, y), (x + w // 8, y + h // 8), color, -1)
+    noise = rng.normal(0, 12, img.shape).astype(np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def time_ms(fn: Callable, repeat: int = 2) -> float:
+    """Best of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000.0)
+    return best
+
+
+def width_candidates(cpus: int) -> List[int]:
+    """1, 2, 4, ... up to the CPU count, plus the CPU count itself."""
+    values = {cpus}
+    n = 1
+    while n < cpus:
+        values.add(n)
+        n *= 2
+    return sorted(values)
+
+
+def _pick(timings: dict) -> int:
+    """Smallest width within TOLERANCE of the fastest one."""
+    best = min(timings.values())
+    return min(k for k, v in timings.items() if v <= best * (1 + TOLERANCE))
+
+
+# -----------------------------------------------------------
+# BENCHMARKS
+# -----------------------------------------------------------
+def _bench_cv2_threads(img, candidates, log):
+    from src.Denoising import apply_denoising_logic
+    from src.Filtering import apply_color_filter
+    from src.Llie import enhance_image
+
+    def workload():
+        apply_denoising_logic(img, 10, True, False, "bilateral")
+        apply_denoising_logic(img, 10, True, False, "guided")
+        enhance_image(img, intensity=0.3, detail=0.3)
+        apply_color_filter(img, "Warm", 50)
+
+    timings = {}
+    for n in candidates:
+        cv2.setNumThreads(n)
+        timings[n] = time_ms(workload)
+        log(f"  cv2 threads {n:>3}: {timings[n]:8.1f} ms")
+    return _pick(timings), timings
+
+
+def _bench_paths(images, log):
+    """Per-size timings of the denoise, LLIE, LUT and inpaint paths."""
+    from src.Denoising import apply_denoising_logic
+    from src.Filtering import apply_color_filter
+    from src.Llie import enhance_image
+    from src.Other.inpaint import remove_object
+
+    try:
+        import ObjectRemover_core
+        remover = ObjectRemover_core.PatchRemover()
+    except ImportError:
+        remover = None
+
+    results = {}
+    for mp, img in images:
+        row = {
+            "bilateral": time_ms(lambda: apply_denoising_logic(img, 10, True, False, "bilateral")),
+            "guided": time_ms(lambda: apply_denoising_logic(img, 10, True, False, "guided")),
+            "guided_fast": time_ms(lambda: apply_denoising_logic(img, 10, True, False, "guided_fast")),
+            "llie": time_ms(lambda: enhance_image(img, intensity=0.3, detail=0.3)),
+            "lut": time_ms(lambda: apply_color_filter(img, "Warm", 50)),
+        }
+        results[f"{mp}MP"] = row
+        log(f"  {mp:>5} MP: " + ", ".join(f"{k} {v:.1f}" for k, v in row.items()) + " ms")
+
+    # Inpainting cost grows with the hole, not the image: one small fill is enough to track it
+    mp, img = images[0]
+    hole = max(8, min(img.shape[:2]) // 16)
+    y, x = img.shape[0] // 2, img.shape[1] // 2
+    results["inpaint"] = {
+        "cpp" if remover is not None else "fallback": time_ms(
+            lambda: remove_object(np.ascontiguousarray(img), x, y, hole, hole, remover), repeat=1),
+        "hole_px": hole * hole,
+    }
+    log(f"  inpaint {hole}x{hole}: {next(iter(results['inpaint'].values())):.1f} ms")
+    return results
+
+
+def _guided_thresholds(paths: dict, sizes: Sequence[float]):
+    """Pixel counts at which bilateral / guided stop fitting the interactive budget."""
+    largest = paths[f"{sizes[-1]}MP"]
+    pixels = sizes[-1] * 1e6
+    bilateral_per_px = largest["bilateral"] / pixels
+    guided_per_px = largest["guided"] / pixels
+
+    def limit(per_px):
+        return int(np.clip(INTERACTIVE_MS / max(per_px, 1e-12), 500_000, 100_000_000) // 100_000 * 100_000)
+
+    guided_min = limit(bilateral_per_px) if guided_per_px < bilateral_per_px else 100_000_000
+    guided_fast_min = max(guided_min, limit(guided_per_px))
+    return guided_min, guided_fast_min
+
+
+def _bench_nlm(log):
+    img = synthetic_image(0.25, seed=1)
+    timings = {}
+    chosen = NLM_WINDOWS[-1]
+    for template, search in NLM_WINDOWS:
+        ms = time_ms(lambda: cv2.fastNlMeansDenoisingColored(img, None, 10, 10, template, search), repeat=1)
+        per_mp = ms / 0.25
+        timings[f"{template}x{search}"] = per_mp
+        log(f"  NLM {template}/{search}: {per_mp:8.1f} ms/MP")
+        if per_mp <= NLM_BUDGET_MS_PER_MP:
+            chosen = (template, search)
+            break
+    return chosen, timings
+
+
+def _bench_tile_size(img, log):
+    try:
+        import tifffile
+        from src.Tiling import ColorFilterOp, DenoiseOp, TiledPipeline
+    except ImportError as e:
+        log(f"  skipped ({e})")
+        return None, {}
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "in.tif")
+        tifffile.imwrite(src, cv2.cvtColor(img, cv2.COLOR_BGR2RGB), tile=(256, 256), photometric="rgb")
+        for t in TILE_SIZES:
+            ops = [DenoiseOp(10, True, False, "guided"), ColorFilterOp("Warm", 50)]
+            timings[t] = time_ms(lambda: TiledPipeline(ops, t).run(src, os.path.join(tmp, "out.tif")), repeat=1)
+            log(f"  tile {t:>5}: {timings[t]:8.1f} ms")
+    return min(timings, key=timings.get), timings
+
+
+def _bench_thread_pool(candidates, log):
+    from src.Service.workers import ProcessingPool
+
+    jobs = [synthetic_image(1.0, seed=i) for i in range(2 * max(candidates))]
+    timings = {}
+    for n in candidates:
+        pool = ProcessingPool(workers=n, warm=False)
+        try:
+            run = lambda images: [f.result() for f in [pool.submit("llie", img, {}) for img in images]]
+            run(jobs[:n])
+            timings[n] = time_ms(lambda: run(jobs), repeat=1)
+        finally:
+            pool.shutdown()
+        log(f"  {n:>3} worker threads: {timings[n]:8.1f} ms for {len(jobs)} images")
+    return _pick(timings), timings
+
+
+def _bench_process_pool(candidates, log):
+    from src.Parallel import SharedMemoryExecutor
+
+    jobs = [synthetic_image(1.0, seed=i) for i in range(2 * max(candidates))]
+    timings = {}
+    for n in candidates:
+        with SharedMemoryExecutor(processes=n) as pool:
+            pool.map("llie", jobs[:n])   # spawn and warm every worker before timing
+            timings[n] = time_ms(lambda: pool.map("llie", jobs), repeat=1)
+        log(f"  {n:>3} processes: {timings[n]:8.1f} ms for {len(jobs)} images")
+    return _pick(timings), timings
+
+
+# -----------------------------------------------------------
+# ENTRY POINT
+# -----------------------------------------------------------
+def calibrate(base: Optional[TuningProfile] = None, quick: bool = False,
+              log: Callable[[str], None] = print) -> TuningProfile:
+    """
+    Micro-benchmarks this machine and returns a tuned profile.
+    Pinned overrides of `base` are kept and re-applied on top of the measured values.
+    """
+    import socket
+
+    sizes = QUICK_SIZES_MP if quick else SIZES_MP
+    cpus = cpu_count()
+    candidates = width_candidates(cpus)
+    profile = TuningProfile(host=socket.gethostname(), cpu_count=cpus)
+    overrides = dict(base.overrides) if base is not None else {}
+    images = [(mp, synthetic_image(mp, seed=i)) for i, mp in enumerate(sizes)]
+
+    log(f"Calibrating on {profile.host} ({cpus} CPUs)")
+    log("OpenCV threads:")
+    profile.cv2_threads, profile.measurements["cv2_threads"] = _bench_cv2_threads(images[-1][1], candidates, log)
+    cv2.setNumThreads(profile.cv2_threads)
+
+    log("Processing paths:")
+    paths = _bench_paths(images, log)
+    profile.measurements["paths"] = paths
+    profile.guided_min_pixels, profile.guided_fast_min_pixels = _guided_thresholds(paths, sizes)
+
+    log("NLM windows:")
+    (profile.nlm_template, profile.nlm_search), profile.measurements["nlm_ms_per_mp"] = _bench_nlm(log)
+
+    log("Tile size:")
+    tile_size, profile.measurements["tile_size"] = _bench_tile_size(images[-1][1], log)
+    profile.tile_size = tile_size or profile.tile_size
+
+    log("Worker threads:")
+    profile.service_workers, profile.measurements["service_workers"] = _bench_thread_pool(candidates, log)
+    profile.video_workers = profile.service_workers
+
+    log("Worker processes:")
+    profile.pool_processes, profile.measurements["pool_processes"] = _bench_process_pool(candidates, log)
+
+    profile.overrides = overrides
+    profile.update(overrides)
+    return profile
@@ -0,0 +1,125 @@
+# profile.py
+import json
+import os
+import socket
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional
+
+import cv2
+
+PROFILE_ENV = "VISUALBUNDLE_TUNING"    # path of the profile file to use instead of the per-host default
+OVERRIDE_PREFIX = "VISUALBUNDLE_"      # VISUALBUNDLE_<FIELD>=value overrides a single field
+
+
+@dataclass
+class TuningProfile:
+    """
+    Per-machine tuning values. 0 means "derive from the CPU count" for thread/process counts.
+
+    Loaded once at startup (see load_profile / apply_profile) and read by the
+    processing code for its defaults; explicit arguments always win.
+    """
+    cv2_threads: int = 0
+    tile_size: int = 512
+    pool_processes: int = 0
+    service_workers: int = 0
+    video_workers: int = 0
+    nlm_template: int = 7
+    nlm_search: int = 21
+    guided_min_pixels: int = 2_000_000
+    guided_fast_min_pixels: int = 12_000_000
+    host: str = ""
+    cpu_count: int = 0
+    overrides: dict = field(default_factory=dict)      # pinned values, kept across recalibration
+    measurements: dict = field(default_factory=dict)   # raw calibration timings (ms)
+
+    def update(self, values: dict) -> "TuningProfile":
+        """Sets fields from a dict, converting to the field's type; unknown keys raise ValueError."""
+        types = {f.name: f.type for f in fields(self)}
+        for key, value in values.items():
+            if key not in types or key in ("overrides", "measurements"):
+                raise ValueError(f"Unknown tuning field: {key}")
+            setattr(self, key, value if types[key] in ("str", str) else int(value))
+        return self
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def default_profile_path() -> str:
+    env = os.environ.get(PROFILE_ENV)
+    if env:
+        return env
+    return os.path.join(os.path.expanduser("~"), ".visualbundle", f"tuning-{socket.gethostname()}.json")
+
+
+def _env_overrides() -> dict:
+    names = {f.name for f in fields(TuningProfile)} - {"overrides", "measurements", "host", "cpu_count"}
+    return {name: os.environ[OVERRIDE_PREFIX + name.upper()]
+            for name in names if OVERRIDE_PREFIX + name.upper() in os.environ}
+
+
+def load_profile(path: Optional[str] = None, overrides: Optional[dict] = None) -> TuningProfile:
+    """
+    Profile for this machine: the saved calibration (or defaults if none),
+    then its pinned overrides, VISUALBUNDLE_<FIELD> environment variables and
+    finally `overrides`, each taking precedence over the previous one.
+    """
+    path = path or default_profile_path()
+    profile = TuningProfile()
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        profile.overrides = data.pop("overrides", {})
+        profile.measurements = data.pop("measurements", {})
+        profile.update({k: v for k, v in data.items() if k in TuningProfile.__dataclass_fields__})
+        profile.update(profile.overrides)
+    profile.update(_env_overrides())
+    profile.update(overrides or {})
+    return profile
+
+
+def save_profile(profile: TuningProfile, path: Optional[str] = None) -> str:
+    path = path or default_profile_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile.to_dict(), f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+# -----------------------------------------------------------
+# ACTIVE PROFILE
+# -----------------------------------------------------------
+_active: Optional[TuningProfile] = None
+
+
+def apply_profile(profile: TuningProfile) -> TuningProfile:
+    """Makes `profile` the active one and pushes its global settings into OpenCV and src modules."""
+    global _active
+    from src.Denoising import denoising
+
+    if profile.cv2_threads > 0:
+        cv2.setNumThreads(profile.cv2_threads)
+    denoising.NLM_TEMPLATE = profile.nlm_template
+    denoising.NLM_SEARCH = profile.nlm_search
+    denoising.GUIDED_MIN_PIXELS = profile.guided_min_pixels
+    denoising.GUIDED_FAST_MIN_PIXELS = profile.guided_fast_min_pixels
+    _active = profile
+    return profile
+
+
+def get_profile() -> TuningProfile:
+    """Active profile; loaded and applied on first use if the application did not do it at startup."""
+    if _active is None:
+        try:
+            apply_profile(load_profile())
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Tuning profile ignored: {e}")
+            apply_profile(TuningProfile())
+    return _active
+
+
+def cpu_count() -> int:
+    return max(1, os.cpu_count() or 1)
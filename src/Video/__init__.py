@@ -0,0 +1 @@
+from .pipeline import VideoRecipe, VideoPipeline, process_video
@@ -0,0 +1,52 @@
+""" Command line entry point: python -m src.Video input.mp4 output.avi [ops...] """
+
+import argparse
+
+from src.Denoising.denoising import CHROMA_MODES, EDGE_METHODS
+
+from src.Recipe import Recipe, compile_recipe
+from src.Video import VideoPipeline, VideoRecipe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming frame-by-frame video processing.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="frames buffered between decode and write")
+    parser.add_argument("--fourcc", default=None, help="encoder FourCC (default: MJPG for .avi, mp4v for .mp4)")
+    parser.add_argument("--flip-h", action="store_true")
+    parser.add_argument("--flip-v", action="store_true")
+    parser.add_argument("--denoise", type=int, default=0, metavar="STRENGTH")
+    parser.add_argument("--nlm", action="store_true", help="use NLM instead of the edge-preserving filter")
+    parser.add_argument("--salt-pepper", action="store_true")
+    parser.add_argument("--edge-method", default="bilateral", choices=EDGE_METHODS)
+    parser.add_argument("--chroma", default="full", choices=CHROMA_MODES,
+                        help="half/quarter: denoise chroma at reduced resolution (faster)")
+    parser.add_argument("--llie", type=float, default=0, metavar="INTENSITY", help="0..100")
+    parser.add_argument("--llie-detail", type=float, default=30, help="0..100")
+    parser.add_argument("--llie-clip", type=float, default=2.0)
+    parser.add_argument("--filter", default="None", help="Warm, Cool, Sepia, Cinematic, Black & White")
+    parser.add_argument("--filter-intensity", type=float, default=50)
+    parser.add_argument("--recipe", default=None, help="saved edit recipe (JSON); replaces the op flags")
+    args = parser.parse_args()
+
+    recipe = VideoRecipe(denoise_strength=args.denoise, edge_preserving=not args.nlm,
+                         salt_pepper_fix=args.salt_pepper, edge_method=args.edge_method, chroma_mode=args.chroma,
+                         llie_intensity=args.llie / 100.0, llie_detail=args.llie_detail / 100.0,
+                         llie_clip=args.llie_clip, filter_preset=args.filter,
+                         filter_intensity=args.filter_intensity, flip_h=args.flip_h, flip_v=args.flip_v)
+    if args.recipe:
+        recipe = compile_recipe(Recipe.load(args.recipe))
+
+    def progress(done, total):
+        if total > 0 and (done % 25 == 0 or done == total):
+            print(f"  {done}/{total} frames", flush=True)
+
+    pipeline = VideoPipeline(recipe, workers=args.workers, max_in_flight=args.max_in_flight)
+    frames = pipeline.run(args.input, args.output, fourcc=args.fourcc, on_progress=progress)
+    print(f"✅ Wrote {frames} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
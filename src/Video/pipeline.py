@@ -0,0 +1,182 @@
+# pipeline.py
+import os
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from src.Denoising import apply_denoising_logic
+from src.Filtering import apply_color_filter
+from src.Llie import enhance_image
+from src.Tuning import get_profile
+
+# Output extension -> FourCC of an encoder that ships with OpenCV
+DEFAULT_FOURCC = {".avi": "MJPG", ".mp4": "mp4v", ".mkv": "MJPG", ".mov": "mp4v"}
+
+_END = object()
+
+
+def _writable(frame: np.ndarray) -> np.ndarray:
+    """VideoWriter takes BGR or gray frames: alpha (a background step) is dropped."""
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
+
+
+@dataclass
+class VideoRecipe:
+    """
+    Fixed edit applied to every frame, in GUI order: denoise -> low light -> color tone,
+    then the flips (like the GUI, geometry is applied on output).
+    A step is skipped when its strength/intensity is 0 (or preset is "None").
+    """
+    denoise_strength: int = 0
+    edge_preserving: bool = True
+    salt_pepper_fix: bool = False
+    edge_method: str = "bilateral"
+    chroma_mode: str = "full"
+    llie_intensity: float = 0.0     # 0..1
+    llie_detail: float = 0.3        # 0..1
+    llie_clip: float = 2.0
+    filter_preset: str = "None"
+    filter_intensity: float = 50.0  # 0..100
+    flip_h: bool = False
+    flip_v: bool = False
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        if self.denoise_strength > 0:
+            frame = apply_denoising_logic(frame, self.denoise_strength, self.edge_preserving,
+                                          self.salt_pepper_fix, self.edge_method,
+                                          chroma_mode=self.chroma_mode)
+        if self.llie_intensity > 0:
+            frame = enhance_image(frame, intensity=self.llie_intensity, detail=self.llie_detail,
+                                  clahe_clip=self.llie_clip)
+        if self.filter_preset != "None":
+            frame = apply_color_filter(frame, self.filter_preset, self.filter_intensity)
+        if self.flip_h or self.flip_v:
+            frame = cv2.flip(frame, -1 if self.flip_h and self.flip_v else (1 if self.flip_h else 0))
+        return frame
+
+
+class VideoPipeline:
+    """
+    Streaming frame-by-frame processing.
+
+    decode thread -> bounded queue -> `workers` processing threads -> reorder
+    buffer -> encoder (caller's thread). At most `max_in_flight` frames exist
+    between decode and write, so memory stays constant for any clip length,
+    and frames are written in their original order.
+    """
+
+    def __init__(self, frame_fn: Callable[[np.ndarray], np.ndarray], workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None):
+        self.frame_fn = frame_fn
+        self.workers = workers or get_profile().video_workers or max(1, os.cpu_count() or 1)
+        self.max_in_flight = max_in_flight or self.workers * 2
+
+    def run(self, src_path: str, dst_path: str, fourcc: Optional[str] = None,
+            on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """Processes `src_path` into `dst_path`. Returns the number of frames written."""
+        cap = cv2.VideoCapture(src_path)
+        if not cap.isOpened():
+            raise FileNotFoundError(f"Could not open video:\n{src_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+        in_q = queue.Queue(maxsize=self.max_in_flight)
+        out_q = queue.Queue()
+        slots = threading.Semaphore(self.max_in_flight)
+        stop = threading.Event()
+
+        def decode():
+            index = 0
+            try:
+                while not stop.is_set():
+                    slots.acquire()
+                    ok, frame = cap.read()
+                    if not ok:
+                        slots.release()
+                        break
+                    in_q.put((index, frame))
+                    index += 1
+            finally:
+                for _ in range(self.workers):
+                    in_q.put(_END)
+
+        def work():
+            while True:
+                item = in_q.get()
+                if item is _END or stop.is_set():
+                    out_q.put(_END)
+                    return
+                index, frame = item
+                try:
+                    out_q.put((index, _writable(self.frame_fn(frame)), None))
+                except BaseException as e:
+                    out_q.put((index, None, e))
+
+        threads = [threading.Thread(target=decode, daemon=True)]
+        threads += [threading.Thread(target=work, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        writer = None
+        pending = {}
+        next_index = 0
+        finished_workers = 0
+        try:
+            while finished_workers < self.workers:
+                item = out_q.get()
+                if item is _END:
+                    finished_workers += 1
+                    continue
+                index, result, error = item
+                if error is not None:
+                    raise error
+                pending[index] = result
+
+                # Write every frame that is now in order
+                while next_index in pending:
+                    frame = pending.pop(next_index)
+                    if writer is None:
+                        writer = self._open_writer(dst_path, fourcc, fps, frame)
+                    writer.write(frame)
+                    next_index += 1
+                    slots.release()
+                    if on_progress is not None:
+                        on_progress(next_index, total)
+        finally:
+            stop.set()
+            # Unblock the decoder and drain workers if we stopped early
+            for _ in range(self.max_in_flight):
+                slots.release()
+            while any(t.is_alive() for t in threads):
+                try:
+                    in_q.get_nowait()
+                except queue.Empty:
+                    pass
+                for t in threads:
+                    t.join(timeout=0.01)
+            cap.release()
+            if writer is not None:
+                writer.release()
+        return next_index
+
+    @staticmethod
+    def _open_writer(dst_path, fourcc, fps, frame):
+        ext = os.path.splitext(dst_path)[1].lower()
+        code = fourcc or DEFAULT_FOURCC.get(ext, "MJPG")
+        h, w = frame.shape[:2]
+        writer = cv2.VideoWriter(dst_path, cv2.VideoWriter_fourcc(*code), fps, (w, h), frame.ndim == 3)
+        if not writer.isOpened():
+            raise RuntimeError(f"Could not open video writer ({code}) for:\n{dst_path}")
+        return writer
+
+
+def process_video(src_path: str, dst_path: str, recipe: Callable[[np.ndarray], np.ndarray],
+                  workers: Optional[int] = None, fourcc: Optional[str] = None) -> int:
+    """Convenience wrapper around VideoPipeline(recipe, workers).run(...)."""
+    return VideoPipeline(recipe, workers).run(src_path, dst_path, fourcc)
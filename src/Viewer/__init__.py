@@ -0,0 +1 @@
+from .viewer import TiledView, ZOOM_LEVELS
@@ -0,0 +1,248 @@
+# viewer.py
+import math
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from src.Other.flip import Orientation
+
+TILE_SIZE = 256                                     # screen pixels per tile side
+ZOOM_LEVELS = (1 / 16, 1 / 8, 1 / 4, 1 / 2, 1, 2, 4, 8)
+CACHE_MB = 192                                      # rendered tiles kept across zoom levels
+
+
+class TiledView:
+    """
+    Zoom/pan viewport over a large image that only renders what is visible.
+
+    Zoom levels are powers of two, so a tile of TILE_SIZE screen pixels covers
+    a whole number of source pixels: zooming out is an exact INTER_AREA
+    reduction per tile, zooming in repeats pixels (INTER_NEAREST). Rendered
+    tiles are cached per (zoom level, column, row) in an LRU bounded by
+    CACHE_MB; panning over cached tiles only copies memory.
+
+    An optional preview op (a src.Tiling TileOp: `halo`, `align` + call on a BGR
+    tile) runs on the source pixels of each tile plus its halo before scaling, so
+    slider previews process only the visible region and match a full-image run.
+    An alpha plane is kept apart from the color pixels and only stacked onto
+    the rendered tiles. Output is in the source channel order (BGR/BGRA).
+    """
+
+    def __init__(self, tile_size: int = TILE_SIZE, cache_mb: float = CACHE_MB):
+        self.tile_size = tile_size
+        self.cache_bytes = int(cache_mb * 1024 * 1024)
+        self.zoom: Optional[float] = None        # None = fit to the window (handled by the caller)
+        self.center = (0.0, 0.0)                 # viewport center, in oriented image pixels
+        self.view_size = (1, 1)
+        self.origin = (0, 0)                     # screen -> zoomed image offset of the last render
+        self._view = None
+        self._alpha = None
+        self._preview = None
+        self._tiles = OrderedDict()
+        self._tiles_bytes = 0
+
+    # ------------------------------------------------------
+    # Source and preview
+    # ------------------------------------------------------
+    def set_image(self, arr: np.ndarray, orientation: Optional[Orientation] = None,
+                  alpha: Optional[np.ndarray] = None):
+        """
+        (H, W[, C]) uint8 array and optional (H, W) alpha plane in their stored
+        frame; shown through `orientation` (zero-copy views).
+        """
+        orient = orientation.apply if orientation is not None else (lambda a: a)
+        self._view = orient(arr)
+        self._alpha = orient(alpha) if alpha is not None else None
+        self.clear_cache()
+
+    def set_preview(self, op):
+        """Op run on each tile's source pixels before display, or None."""
+        self._preview = op
+        self.clear_cache()
+
+    @property
+    def preview(self):
+        return self._preview
+
+    def clear_cache(self):
+        self._tiles.clear()
+        self._tiles_bytes = 0
+
+    @property
+    def image_size(self) -> Tuple[int, int]:
+        return (self._view.shape[1], self._view.shape[0]) if self._view is not None else (0, 0)
+
+    # ------------------------------------------------------
+    # Viewport
+    # ------------------------------------------------------
+    def set_view_size(self, width: int, height: int):
+        self.view_size = (max(1, int(width)), max(1, int(height)))
+
+    def set_zoom(self, zoom: float, anchor: Optional[Tuple[float, float]] = None):
+        """
+        Sets one of ZOOM_LEVELS. `anchor`: a screen point of the last render whose
+        image pixel stays under it (default: keep the center; centered image when leaving fit).
+        """
+        if zoom not in ZOOM_LEVELS:
+            raise ValueError(f"Unsupported zoom: {zoom}")
+        if self.zoom is None:
+            w, h = self.image_size
+            self.center = (w / 2, h / 2)
+        elif anchor is not None:
+            ix, iy = self.screen_to_image(*anchor)
+            vw, vh = self.view_size
+            self.center = (ix + (vw / 2 - anchor[0]) / zoom, iy + (vh / 2 - anchor[1]) / zoom)
+        self.zoom = zoom
+
+    def set_fit(self):
+        self.zoom = None
+
+    def center_on(self, ix: float, iy: float):
+        """Centers the viewport on an oriented image pixel."""
+        self.center = (ix, iy)
+
+    def step_zoom(self, steps: int, fit_scale: float, anchor: Optional[Tuple[float, float]] = None):
+        """
+        Moves `steps` levels in (+) or out (-). From fit, zooming in goes to the first
+        level above the fit scale; zooming out to or below it returns to fit.
+        """
+        if self.zoom is None:
+            if steps <= 0:
+                return
+            above = [z for z in ZOOM_LEVELS if z > fit_scale] or [ZOOM_LEVELS[-1]]
+            level = ZOOM_LEVELS.index(above[0]) + steps - 1
+        else:
+            level = ZOOM_LEVELS.index(self.zoom) + steps
+        level = min(level, len(ZOOM_LEVELS) - 1)
+        if level < 0 or ZOOM_LEVELS[level] <= fit_scale:
+            self.set_fit()
+            return
+        self.set_zoom(ZOOM_LEVELS[level], anchor)
+
+    def pan(self, dx: float, dy: float):
+        """Moves the image by (dx, dy) screen pixels."""
+        if self.zoom is not None:
+            self.center = (self.center[0] - dx / self.zoom, self.center[1] - dy / self.zoom)
+
+    def screen_to_image(self, sx: float, sy: float) -> Tuple[float, float]:
+        """Screen point of the last render -> oriented image coordinates."""
+        return ((sx + self.origin[0]) / self.zoom, (sy + self.origin[1]) / self.zoom)
+
+    def _layout(self):
+        """Clamps the center and returns (left, top) of the viewport in zoomed-image pixels."""
+        z = self.zoom
+        w, h = self.image_size
+        vw, vh = self.view_size
+        zw, zh = math.ceil(w * z), math.ceil(h * z)
+
+        def axis(center, size, view):
+            if size <= view:
+                return -((view - size) // 2), size / (2 * z)   # smaller than the window: centered
+            left = int(round(center * z - view / 2))
+            left = max(0, min(left, size - view))
+            return left, (left + view / 2) / z
+
+        left, cx = axis(self.center[0], zw, vw)
+        top, cy = axis(self.center[1], zh, vh)
+        self.center = (cx, cy)
+        return left, top
+
+    def _channels(self) -> int:
+        channels = self._view.shape[2] if self._view.ndim == 3 else 1
+        return channels + (self._alpha is not None)
+
+    def _visible_tiles(self, left: int, top: int, ring: int = 0):
+        z, t = self.zoom, self.tile_size
+        w, h = self.image_size
+        cols, rows = math.ceil(math.ceil(w * z) / t), math.ceil(math.ceil(h * z) / t)
+        vw, vh = self.view_size
+        tx0, tx1 = max(0, left // t - ring), min(cols - 1, (left + vw - 1) // t + ring)
+        ty0, ty1 = max(0, top // t - ring), min(rows - 1, (top + vh - 1) // t + ring)
+        return [(tx, ty) for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1)]
+
+    # ------------------------------------------------------
+    # Tiles
+    # ------------------------------------------------------
+    def _render_tile(self, tx: int, ty: int) -> np.ndarray:
+        z = self.zoom
+        src = self._view
+        h, w = src.shape[:2]
+        step = self.tile_size / z   # source pixels per tile, an integer at every zoom level
+        x0, y0 = int(tx * step), int(ty * step)
+        x1, y1 = min(w, int((tx + 1) * step)), min(h, int((ty + 1) * step))
+
+        if self._preview is not None:
+            halo = getattr(self._preview, "halo", 0)
+            align = getattr(self._preview, "align", 1)
+            hx0, hy0 = max(0, x0 - halo), max(0, y0 - halo)
+            hx0, hy0 = hx0 - hx0 % align, hy0 - hy0 % align
+            hx1, hy1 = min(w, x1 + halo), min(h, y1 + halo)
+            region = self._preview(np.ascontiguousarray(src[hy0:hy1, hx0:hx1]))
+            pixels = region[y0 - hy0:y1 - hy0, x0 - hx0:x1 - hx0]
+        else:
+            pixels = src[y0:y1, x0:x1]
+        pixels = np.ascontiguousarray(pixels)
+        if self._alpha is not None:
+            pixels = np.dstack((pixels, self._alpha[y0:y1, x0:x1]))
+
+        if z == 1:
+            return pixels
+        size = (math.ceil((x1 - x0) * z), math.ceil((y1 - y0) * z))
+        interpolation = cv2.INTER_AREA if z < 1 else cv2.INTER_NEAREST
+        tile = cv2.resize(pixels, size, interpolation=interpolation)
+        return tile if tile.ndim == pixels.ndim else tile[..., None]
+
+    def _tile(self, tx: int, ty: int) -> np.ndarray:
+        key = (self.zoom, tx, ty)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        tile = self._render_tile(tx, ty)
+        self._tiles[key] = tile
+        self._tiles_bytes += tile.nbytes
+        while self._tiles_bytes > self.cache_bytes and len(self._tiles) > 1:
+            _, old = self._tiles.popitem(last=False)
+            self._tiles_bytes -= old.nbytes
+        return tile
+
+    def render(self, background=0) -> np.ndarray:
+        """Viewport image (view height, view width, channels); areas outside the image get `background`."""
+        if self._view is None or self.zoom is None:
+            raise RuntimeError("render() needs an image and a zoom level")
+        left, top = self._layout()
+        self.origin = (left, top)
+        vw, vh = self.view_size
+        channels = self._channels()
+        canvas = np.empty((vh, vw, channels), dtype=np.uint8)
+        canvas[...] = background
+
+        t = self.tile_size
+        for tx, ty in self._visible_tiles(left, top):
+            tile = self._tile(tx, ty)
+            if tile.ndim == 2:
+                tile = tile[..., None]
+            # Intersection of the tile with the viewport, in zoomed-image pixels
+            x0, y0 = max(tx * t, left), max(ty * t, top)
+            x1, y1 = min(tx * t + tile.shape[1], left + vw), min(ty * t + tile.shape[0], top + vh)
+            if x1 > x0 and y1 > y0:
+                canvas[y0 - top:y1 - top, x0 - left:x1 - left] = tile[y0 - ty * t:y1 - ty * t, x0 - tx * t:x1 - tx * t]
+        return canvas if channels > 1 else canvas[..., 0]
+
+    def prefetch(self, max_tiles: int = 2) -> bool:
+        """Renders up to `max_tiles` uncached tiles around the viewport; True while more remain."""
+        if self._view is None or self.zoom is None:
+            return False
+        left, top = self._layout()
+        missing = [tile for tile in self._visible_tiles(left, top, ring=1)
+                   if (self.zoom,) + tile not in self._tiles]
+        # Never evict visible tiles to make room for prefetched ones
+        budget = self.cache_bytes - self._tiles_bytes
+        for tx, ty in missing[:max_tiles]:
+            if budget < (self.tile_size ** 2) * self._channels():
+                return False
+            budget -= self._tile(tx, ty).nbytes
+        return len(missing) > max_tiles
+
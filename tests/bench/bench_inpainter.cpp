@@ -0,0 +1,232 @@
+// Performance benchmark for PatchRemover::process.
+//
+// Sweeps image size, hole size, InpaintConfig and thread count on synthetic
+// images and prints one record per run (CSV by default, --format json for a
+// JSON array). Human-readable progress goes to stderr, so stdout can be
+// redirected straight into a file and diffed between builds.
+//
+// Usage: inpainter_bench [--quick] [--sizes 1,4,12,48] [--holes 32,64,128]
+//                        [--patch 7,9,13] [--stride 0,4] [--threads 1,2,4]
+//                        [--repeat 1] [--format csv|json]
+
+#include <opencv2/opencv.hpp>
+#include <algorithm>
+#include <cmath>
+#include <cstdlib>
+#include <iostream>
+#include <sstream>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <vector>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+#include "../../interface/ObjRem/inpainter.h"
+
+namespace {
+
+struct Options {
+    std::vector<double> sizesMP = {1, 4, 12, 48};
+    std::vector<int> holes = {32, 64, 128};
+    std::vector<int> patchSizes = {7, 9, 13};
+    std::vector<int> strides = {0};
+    std::vector<int> threads;
+    int repeat = 1;
+    std::string format = "csv";
+};
+
+struct Record {
+    double megapixels;
+    int width, height, hole, patchSize, stride, threads;
+    InpaintStats stats;
+    double speedup;   // vs. the 1-thread run of the same case (0 if not measured)
+};
+
+template <typename T>
+std::vector<T> parseList(const std::string& text) {
+    std::vector<T> values;
+    std::stringstream ss(text);
+    std::string item;
+    while (std::getline(ss, item, ',')) {
+        if (item.empty()) continue;
+        std::stringstream is(item);
+        T value;
+        is >> value;
+        if (is.fail()) throw std::invalid_argument("Bad list value: " + item);
+        values.push_back(value);
+    }
+    return values;
+}
+
+std::vector<int> defaultThreadCounts() {
+    int maxThreads = std::max(1u, std::thread::hardware_concurrency());
+    std::vector<int> counts;
+    for (int t = 1; t < maxThreads; t *= 2) counts.push_back(t);
+    counts.push_back(maxThreads);
+    return counts;
+}
+
+Options parseArgs(int argc, char** argv) {
+    Options opt;
+    for (int i = 1; i < argc; ++i) {
+        std::string arg = argv[i];
+        auto next = [&]() -> std::string {
+            if (i + 1 >= argc) throw std::invalid_argument("Missing value for " + arg);
+            return argv[++i];
+        };
+        if (arg == "--quick") {
+            opt.sizesMP = {1};
+            opt.holes = {32};
+            opt.patchSizes = {9};
+            opt.threads = {1, std::max(1, (int)std::thread::hardware_concurrency())};
+        }
+        else if (arg == "--sizes") opt.sizesMP = parseList<double>(next());
+        else if (arg == "--holes") opt.holes = parseList<int>(next());
+        else if (arg == "--patch") opt.patchSizes = parseList<int>(next());
+        else if (arg == "--stride") opt.strides = parseList<int>(next());
+        else if (arg == "--threads") opt.threads = parseList<int>(next());
+        else if (arg == "--repeat") opt.repeat = std::max(1, std::atoi(next().c_str()));
+        else if (arg == "--format") opt.format = next();
+        else throw std::invalid_argument("Unknown argument: " + arg);
+    }
+    if (opt.threads.empty()) opt.threads = defaultThreadCounts();
+    std::sort(opt.threads.begin(), opt.threads.end());
+    opt.threads.erase(std::unique(opt.threads.begin(), opt.threads.end()), opt.threads.end());
+    return opt;
+}
+
+// Deterministic textured scene: gradients, stripes, blocks and mild noise,
+// so the patch search sees realistic, non-uniform SSD landscapes.
+cv::Mat makeImage(double megapixels) {
+    int width = (int)std::lround(std::sqrt(megapixels * 1e6 * 4.0 / 3.0));
+    int height = std::max(1, (int)(megapixels * 1e6 / width));
+    cv::Mat img(height, width, CV_8UC3);
+    for (int y = 0; y < height; ++y) {
+        cv::Vec3b* row = img.ptr<cv::Vec3b>(y);
+        for (int x = 0; x < width; ++x) {
+            row[x] = cv::Vec3b((uchar)(x * 255 / width),
+                               (uchar)(y * 255 / height),
+                               (uchar)(((x / 16 + y / 16) % 2) * 120 + 60));
+        }
+    }
+    cv::RNG rng(12345);
+    for (int i = 0; i < 40; ++i) {
+        cv::Point a(rng.uniform(0, width), rng.uniform(0, height));
+        cv::Point b(a.x + rng.uniform(10, width / 6 + 11), a.y + rng.uniform(10, height / 6 + 11));
+        cv::rectangle(img, a, b, cv::Scalar(rng.uniform(0, 256), rng.uniform(0, 256), rng.uniform(0, 256)), -1);
+    }
+    cv::Mat noise(img.size(), CV_8UC3);
+    rng.fill(noise, cv::RNG::NORMAL, 0, 6);
+    cv::add(img, noise, img);
+    return img;
+}
+
+void setThreads(int threads) {
+    cv::setNumThreads(threads);
+#ifdef _OPENMP
+    omp_set_num_threads(threads);
+#endif
+}
+
+InpaintStats runOnce(const cv::Mat& img, int hole, const InpaintConfig& config) {
+    PatchRemover remover;
+    remover.setConfig(config);
+    remover.setImage(img);
+    remover.setSelection(img.cols / 2 - hole / 2, img.rows / 2 - hole / 2, hole, hole);
+    remover.process();
+    return remover.getStats();
+}
+
+void printCsv(const std::vector<Record>& records) {
+    std::cout << "megapixels,width,height,hole,patch_size,search_stride,threads,iterations,filled_pixels,"
+                 "total_s,front_s,search_s,update_s,other_s,us_per_filled_pixel,search_fraction,speedup\n";
+    for (const auto& r : records) {
+        const InpaintStats& s = r.stats;
+        double other = std::max(0.0, s.totalSeconds - s.frontSeconds - s.searchSeconds - s.updateSeconds);
+        std::cout << r.megapixels << ',' << r.width << ',' << r.height << ',' << r.hole << ','
+                  << r.patchSize << ',' << r.stride << ',' << r.threads << ','
+                  << s.iterations << ',' << s.filledPixels << ','
+                  << s.totalSeconds << ',' << s.frontSeconds << ',' << s.searchSeconds << ','
+                  << s.updateSeconds << ',' << other << ','
+                  << (s.filledPixels ? s.totalSeconds * 1e6 / s.filledPixels : 0.0) << ','
+                  << (s.totalSeconds > 0 ? s.searchSeconds / s.totalSeconds : 0.0) << ','
+                  << r.speedup << '\n';
+    }
+}
+
+void printJson(const std::vector<Record>& records) {
+    std::cout << "[\n";
+    for (size_t i = 0; i < records.size(); ++i) {
+        const Record& r = records[i];
+        const InpaintStats& s = r.stats;
+        double other = std::max(0.0, s.totalSeconds - s.frontSeconds - s.searchSeconds - s.updateSeconds);
+        std::cout << "  {\"megapixels\": " << r.megapixels << ", \"width\": " << r.width
+                  << ", \"height\": " << r.height << ", \"hole\": " << r.hole
+                  << ", \"patch_size\": " << r.patchSize << ", \"search_stride\": " << r.stride
+                  << ", \"threads\": " << r.threads << ", \"iterations\": " << s.iterations
+                  << ", \"filled_pixels\": " << s.filledPixels << ", \"total_s\": " << s.totalSeconds
+                  << ", \"front_s\": " << s.frontSeconds << ", \"search_s\": " << s.searchSeconds
+                  << ", \"update_s\": " << s.updateSeconds << ", \"other_s\": " << other
+                  << ", \"us_per_filled_pixel\": " << (s.filledPixels ? s.totalSeconds * 1e6 / s.filledPixels : 0.0)
+                  << ", \"search_fraction\": " << (s.totalSeconds > 0 ? s.searchSeconds / s.totalSeconds : 0.0)
+                  << ", \"speedup\": " << r.speedup << "}" << (i + 1 < records.size() ? "," : "") << "\n";
+    }
+    std::cout << "]\n";
+}
+
+} // namespace
+
+int main(int argc, char** argv) {
+    Options opt;
+    try {
+        opt = parseArgs(argc, argv);
+    } catch (const std::exception& e) {
+        std::cerr << e.what() << "\n";
+        return 2;
+    }
+
+#ifdef _OPENMP
+    std::cerr << "[bench] OpenMP enabled, max threads " << omp_get_max_threads() << "\n";
+#else
+    std::cerr << "[bench] OpenMP disabled\n";
+#endif
+
+    std::vector<Record> records;
+    for (double mp : opt.sizesMP) {
+        cv::Mat img = makeImage(mp);
+        for (int hole : opt.holes) {
+            for (int patch : opt.patchSizes) {
+                for (int stride : opt.strides) {
+                    InpaintConfig config;
+                    config.patchSize = patch;
+                    config.searchStride = stride;
+
+                    double singleThread = 0.0;
+                    for (int threads : opt.threads) {
+                        setThreads(threads);
+                        InpaintStats best;
+                        for (int rep = 0; rep < opt.repeat; ++rep) {
+                            InpaintStats s = runOnce(img, hole, config);
+                            if (rep == 0 || s.totalSeconds < best.totalSeconds) best = s;
+                        }
+                        if (threads == 1) singleThread = best.totalSeconds;
+                        double speedup = (singleThread > 0 && best.totalSeconds > 0) ? singleThread / best.totalSeconds : 0.0;
+                        records.push_back({mp, img.cols, img.rows, hole, patch, stride, threads, best, speedup});
+
+                        std::cerr << "[bench] " << mp << " MP, hole " << hole << ", patch " << patch
+                                  << ", stride " << stride << ", " << threads << " thr: "
+                                  << best.totalSeconds << " s (search " << best.searchSeconds
+                                  << " s, front " << best.frontSeconds << " s)\n";
+                    }
+                }
+            }
+        }
+    }
+
+    if (opt.format == "json") printJson(records);
+    else printCsv(records);
+    return 0;
+}
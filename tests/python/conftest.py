@@ -0,0 +1,20 @@
+# conftest.py
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+# The packages are imported as src.<Package>, from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def photo():
+    """Smooth, photo-like 300x400 BGR test image (noise blurred and upscaled)."""
+    rng = np.random.default_rng(0)
+    img = cv2.GaussianBlur(rng.integers(0, 256, (300, 400, 3), dtype=np.uint8), (0, 0), 3)
+    return cv2.resize(img[::4, ::4], (400, 300))
@@ -0,0 +1,61 @@
+# test_cache.py
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.Cache import ResultCache
+from src.Cache.cache import STALE_TMP_SECONDS
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path))
+
+
+def _stored(cache, key="entry"):
+    cache.put(key, alpha=np.arange(64 * 64, dtype=np.uint32).reshape(64, 64))
+    return cache._path(key)
+
+
+def test_round_trip(cache):
+    img = np.zeros((8, 8, 3), np.uint8)
+    key = ResultCache.key(img, "background", {"max_side": 1024})
+    assert cache.get(key) is None
+    cache.put(key, alpha=img[..., 0])
+    assert np.array_equal(cache.get(key)["alpha"], img[..., 0])
+    assert key != ResultCache.key(img, "background", {"max_side": 512})
+
+
+def test_truncated_entry_is_a_miss(cache):
+    path = _stored(cache)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert cache.get("entry") is None
+    assert not os.path.exists(path)
+
+
+def test_corrupted_entry_is_a_miss(cache):
+    path = _stored(cache)
+    with open(path, "rb") as f:
+        data = bytearray(f.read())
+    # Damage the compressed array data, keeping the zip directory readable
+    for i in range(60, len(data) // 2):
+        data[i] ^= 0xFF
+    with open(path, "wb") as f:
+        f.write(data)
+    assert cache.get("entry") is None
+    assert not os.path.exists(path)
+
+
+def test_eviction_removes_stale_temp_files(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    stale, fresh = tmp_path / "stale.tmp", tmp_path / "fresh.tmp"
+    for path in (stale, fresh):
+        path.write_bytes(b"\0" * 4096)
+    old = time.time() - STALE_TMP_SECONDS - 60
+    os.utime(stale, (old, old))
+    cache.evict()
+    assert not stale.exists()
+    assert fresh.exists()   # may still be written by another process
@@ -0,0 +1,174 @@
+# test_denoising.py
+import numpy as np
+import pytest
+
+from src.Denoising import apply_denoising_logic
+from src.Denoising.denoising import CHROMA_SUBSAMPLE, ImageDenoiser
+from src.Tiling import DenoiseOp, TiledPipeline
+
+
+class _ArrayReader:
+    """TiledTiffReader stand-in serving an in-memory RGB array."""
+
+    def __init__(self, rgb):
+        self.rgb = rgb
+        self.height, self.width = rgb.shape[:2]
+
+    def read(self, y0, y1, x0, x1):
+        return self.rgb[y0:y1, x0:x1]
+
+
+def _tiled(op, bgr, tile_size):
+    """`op` run through TiledPipeline on `bgr`, reassembled from its tiles."""
+    h, w = bgr.shape[:2]
+    tiles = TiledPipeline([op], tile_size=tile_size).iter_tiles(_ArrayReader(bgr[..., ::-1]))
+    out = np.empty_like(bgr)
+    for y in range(0, h, tile_size):
+        for x in range(0, w, tile_size):
+            tile = next(tiles)[..., ::-1]
+            out[y:y + tile_size, x:x + tile_size] = tile[:min(tile_size, h - y), :min(tile_size, w - x)]
+    return out
+
+
+@pytest.fixture
+def midtones(photo):
+    """The test photo without any pixel an impulse detector could flag."""
+    return np.clip(photo, 20, 235).astype(np.uint8)
+
+
+@pytest.mark.parametrize("density", [0.01, 0.05, 0.1])
+def test_only_impulses_are_repaired(midtones, density):
+    rng = np.random.default_rng(1)
+    noisy = midtones.copy()
+    hit = rng.random(noisy.shape[:2]) < density
+    noisy[hit] = np.where(rng.random(hit.sum()) < 0.5, 0, 255)[:, None]
+
+    repaired = ImageDenoiser.repair_impulses(noisy)
+    changed = (repaired != noisy).any(axis=2)
+    assert not (changed & ~hit).any()
+    assert changed[hit].all()
+    assert np.abs(repaired.astype(int) - midtones)[hit].max() <= 48
+
+
+def test_clean_pixels_and_edges_are_untouched(midtones):
+    img = midtones.copy()
+    img[20:80, 30:90] = 0        # solid black and white regions: extreme, but not impulses
+    img[150:200, 250:380] = 255
+    img[:, :40] = 128            # a hard gray edge
+    img[0:30, 370:400] = 0       # a black region in the image corner
+    repaired = ImageDenoiser.repair_impulses(img)
+    assert np.array_equal(repaired, img)
+
+
+def test_image_without_candidates_is_returned_as_is(midtones):
+    assert ImageDenoiser.repair_impulses(midtones) is midtones
+
+
+# -----------------------------------------------------------
+# Guided filter modes
+# -----------------------------------------------------------
+def _reference_guided(image, radius, eps):
+    """Textbook self-guided filter in float64, with the same reflected borders as cv2.boxFilter."""
+    def box(x):
+        padded = np.pad(x, ((radius, radius), (radius, radius), (0, 0)), mode="reflect")
+        c = padded.cumsum(0).cumsum(1)
+        c = np.pad(c, ((1, 0), (1, 0), (0, 0)))
+        k = 2 * radius + 1
+        return (c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]) / (k * k)
+
+    i = image.astype(np.float64)
+    mean = box(i)
+    var = box(i * i) - mean * mean
+    a = var / (var + eps)
+    b = mean - a * mean
+    return np.clip(np.round(box(a) * i + box(b)), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def noisy(photo):
+    rng = np.random.default_rng(2)
+    return np.clip(photo + rng.normal(0, 12, photo.shape), 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("strength", [4, 10])
+def test_guided_matches_reference(noisy, strength):
+    radius, eps = ImageDenoiser.guided_params(strength)
+    result = ImageDenoiser.denoise_guided(noisy, strength)
+    assert np.abs(result.astype(int) - _reference_guided(noisy, radius, eps)).max() <= 1
+
+
+def test_guided_modes_denoise_and_keep_edges(photo, noisy):
+    step = np.full((120, 160, 3), 60, np.uint8)
+    step[:, 80:] = 200
+    for method in ("guided", "guided_fast"):
+        result = apply_denoising_logic(noisy, 10, True, False, method)
+        assert np.abs(result.astype(int) - photo).mean() < np.abs(noisy.astype(int) - photo).mean()
+        edge = apply_denoising_logic(step, 10, True, False, method)
+        assert np.abs(edge.astype(int) - step)[:, :60].max() <= 1   # flat sides stay flat
+        assert np.abs(edge.astype(int) - step)[:, 100:].max() <= 1
+        assert int(edge[:, 84:].min()) - int(edge[:, :76].max()) > 100   # the step stays sharp
+    fast = apply_denoising_logic(noisy, 10, True, False, "guided_fast")
+    exact = apply_denoising_logic(noisy, 10, True, False, "guided")
+    # The subsampled coefficients approximate the exact ones well below the noise removed
+    assert np.abs(fast.astype(int) - exact).mean() < 0.5 * np.abs(noisy.astype(int) - exact).mean()
+
+
+def test_auto_edge_method_by_resolution():
+    def pick(h, w):
+        return ImageDenoiser.get_auto_edge_method(np.empty((h, w), np.uint8))
+    assert pick(1000, 1000) == "bilateral"
+    assert pick(1500, 2000) == "guided"
+    assert pick(3000, 4000) == "guided_fast"
+
+
+def test_unknown_edge_method_is_rejected(photo):
+    with pytest.raises(ValueError):
+        apply_denoising_logic(photo, 10, True, False, "box")
+
+
+@pytest.mark.parametrize("method", ["guided", "guided_fast"])
+@pytest.mark.parametrize("size", [(300, 400), (299, 397)])   # odd: edges off the coefficient grid
+def test_tiled_guided_matches_full_image(noisy, method, size):
+    img = np.ascontiguousarray(noisy[:size[0], :size[1]])
+    op = DenoiseOp(6, True, False, method)
+    expected = apply_denoising_logic(img, 6, True, False, method)
+    for tile_size in (48, 80):
+        assert np.array_equal(_tiled(op, img, tile_size), expected), f"tile size {tile_size}"
+
+
+# -----------------------------------------------------------
+# Subsampled chroma
+# -----------------------------------------------------------
+@pytest.mark.parametrize("mode", ["half", "quarter"])
+@pytest.mark.parametrize("method", [(True, "bilateral"), (True, "guided"), (True, "guided_fast"), (False, "bilateral")])
+def test_chroma_modes_denoise(photo, noisy, mode, method):
+    edge_preserving, edge_method = method
+    full = apply_denoising_logic(noisy, 8, edge_preserving, False, edge_method)
+    reduced = apply_denoising_logic(noisy, 8, edge_preserving, False, edge_method, chroma_mode=mode)
+    error = np.abs(reduced.astype(int) - photo).mean()
+    assert error < np.abs(noisy.astype(int) - photo).mean()
+    assert error < np.abs(full.astype(int) - photo).mean() + 2
+
+
+def test_chroma_modes_keep_odd_sizes(noisy):
+    odd = np.ascontiguousarray(noisy[:299, :397])
+    for mode in ("half", "quarter"):
+        assert apply_denoising_logic(odd, 8, True, False, chroma_mode=mode).shape == odd.shape
+    with pytest.raises(ValueError):
+        apply_denoising_logic(odd, 8, True, False, chroma_mode="eighth")
+
+
+@pytest.mark.parametrize("mode", ["half", "quarter"])
+@pytest.mark.parametrize("method", [(True, False, "guided"), (True, True, "guided_fast"), (False, True, "bilateral")])
+def test_tiled_chroma_denoise_matches_full_image(noisy, mode, method):
+    edge_preserving, salt_pepper, edge_method = method
+    img = np.ascontiguousarray(noisy[:299, :397])   # odd size: edges off the chroma grid
+    if salt_pepper:
+        rng = np.random.default_rng(3)
+        hit = rng.random(img.shape[:2]) < 0.02
+        img[hit] = np.where(rng.random(hit.sum()) < 0.5, 0, 255)[:, None]
+    op = DenoiseOp(6, edge_preserving, salt_pepper, edge_method, mode)
+    assert op.align % CHROMA_SUBSAMPLE[mode] == 0 and op.halo % op.align == 0
+    expected = apply_denoising_logic(img, 6, edge_preserving, salt_pepper, edge_method, chroma_mode=mode)
+    for tile_size in (48, 80):
+        assert np.array_equal(_tiled(op, img, tile_size), expected), f"tile size {tile_size}"
@@ -0,0 +1,44 @@
+# test_exemplar.py
+import numpy as np
+import pytest
+
+from src.Other.exemplar import HAS_NUMBA, exemplar_inpaint
+
+pytestmark = pytest.mark.skipif(not HAS_NUMBA, reason="exemplar_inpaint requires numba")
+
+MARKER = (255, 0, 255)   # magenta: does not occur in the test photo
+PATCH_SIZE = 9
+
+
+def _with_hole(photo, x, y, w, h):
+    img = photo.copy()
+    img[max(0, y):y + h, max(0, x):x + w] = MARKER
+    return img
+
+
+def _assert_filled(result, img, x, y, w, h):
+    hole = np.zeros(img.shape[:2], bool)
+    hole[max(0, y):y + h, max(0, x):x + w] = True
+    assert np.array_equal(result[~hole], img[~hole])             # pixels outside the hole are untouched
+    # Every hole pixel is filled, except within half a patch of the image border
+    # (kept as is, like the C++ core)
+    r = PATCH_SIZE // 2
+    inner = np.zeros_like(hole)
+    inner[r:-r, r:-r] = True
+    assert not (result[hole & inner] == MARKER).all(axis=1).any()
+
+
+@pytest.mark.parametrize("rect", [(150, 100, 40, 30), (-10, -8, 30, 25), (380, 280, 40, 40)])
+def test_fills_only_the_hole(photo, rect):
+    img = _with_hole(photo, *rect)
+    _assert_filled(exemplar_inpaint(img, *rect, patch_size=PATCH_SIZE, search_stride=4), img, *rect)
+
+
+@pytest.mark.parametrize("rect", [(-10, -10, 5, 5), (400, 0, 10, 10), (0, 300, 10, 10), (50, 50, 0, 10)])
+def test_rect_outside_the_image_changes_nothing(photo, rect):
+    assert np.array_equal(exemplar_inpaint(photo, *rect), photo)
+
+
+def test_alpha_is_dropped(photo):
+    bgra = np.dstack((photo, np.full(photo.shape[:2], 255, np.uint8)))
+    assert exemplar_inpaint(bgra, 400, 0, 10, 10).shape == photo.shape
@@ -0,0 +1,36 @@
+# test_export.py
+import os
+
+import numpy as np
+from PIL import Image
+
+from src.Export import Exporter, ExportTarget, export_one
+
+EXTENSIONS = (".png", ".jpg", ".webp", ".tif")
+
+
+def test_concurrent_targets_match_sequential_saves(tmp_path, photo):
+    img = Image.fromarray(np.ascontiguousarray(photo[..., ::-1]))
+    targets = [ExportTarget(str(tmp_path / f"out{i}{ext}"), quality=80 + i)
+               for i in range(4) for ext in EXTENSIONS]
+
+    exporter = Exporter(max_workers=4)
+    try:
+        errors = [err for _, err in exporter.submit(img, targets).results() if err is not None]
+    finally:
+        exporter.shutdown()
+    assert errors == []
+
+    for target in targets:
+        reference = tmp_path / ("ref_" + os.path.basename(target.path))
+        export_one(img, ExportTarget(str(reference), quality=target.quality))
+        with open(target.path, "rb") as f, open(reference, "rb") as r:
+            assert f.read() == r.read(), target.path
+
+
+def test_export_keeps_the_source_image_untouched(tmp_path, photo):
+    img = Image.fromarray(np.ascontiguousarray(photo[..., ::-1]))
+    export_one(img, ExportTarget(str(tmp_path / "out.jpg"), quality=50))
+    assert not getattr(img, "encoderinfo", None)
+    with Image.open(tmp_path / "out.jpg") as saved:
+        assert saved.size == img.size
@@ -0,0 +1,69 @@
+# test_history.py
+import numpy as np
+import pytest
+
+from src.History import EditHistory
+from src.Other.flip import Orientation
+
+
+def _edits(photo):
+    """States of an editing session: a local patch, a global change, RGB -> RGBA."""
+    patched = photo.copy()
+    patched[40:90, 200:260] = 255
+    brighter = np.clip(patched.astype(np.int16) + 30, 0, 255).astype(np.uint8)
+    rgba = np.dstack((brighter, np.full(brighter.shape[:2], 200, np.uint8)))
+    return [photo, patched, brighter, rgba]
+
+
+@pytest.mark.parametrize("memory_limit_mb", [512, 0.01])   # 0.01: entries are spilled to disk
+def test_undo_redo_round_trip(tmp_path, photo, memory_limit_mb):
+    states = _edits(photo)
+    history = EditHistory(tile_size=64, memory_limit_mb=memory_limit_mb, spill_dir=str(tmp_path))
+    for before, after in zip(states, states[1:]):
+        history.push(before, after)
+    assert history.next_undo_kind() == "snapshot"
+
+    current = states[-1]
+    for expected in reversed(states[:-1]):
+        current = history.undo(current)
+        assert np.array_equal(current, expected)
+    assert not history.can_undo()
+    for expected in states[1:]:
+        current = history.redo(current)
+        assert np.array_equal(current, expected)
+    assert not history.can_redo()
+    history.clear()
+
+
+def test_local_edit_stores_only_changed_tiles(photo):
+    patched = _edits(photo)[1]
+    history = EditHistory(tile_size=64)
+    history.push(photo, patched)
+    assert history.next_undo_kind() == "tiles"
+    assert history.memory_usage() < photo.nbytes / 2   # 4 of 35 tiles, before and after
+
+
+def test_transforms_update_the_orientation(photo):
+    history = EditHistory()
+    orientation = Orientation()
+    for op in ("rotate_cw", "flip_horizontal"):
+        orientation.apply_op(op)
+        history.push_transform(op)
+
+    current = history.undo(photo, orientation)
+    current = history.undo(current, orientation)
+    assert current is photo and orientation.is_identity()
+    current = history.redo(current, orientation)
+    current = history.redo(current, orientation)
+    assert orientation == Orientation().apply_op("rotate_cw").apply_op("flip_horizontal")
+    # Without an orientation, transforms are applied to the pixels
+    assert np.array_equal(history.undo(photo), Orientation().apply_op("flip_horizontal").materialize(photo))
+
+
+def test_new_edit_discards_redo(photo):
+    states = _edits(photo)
+    history = EditHistory()
+    history.push(states[0], states[1])
+    history.undo(states[1])
+    history.push(states[0], states[2])
+    assert not history.can_redo()
@@ -0,0 +1,37 @@
+# test_loader.py
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.Other import ImageLoader
+
+
+@pytest.fixture
+def large_jpeg(tmp_path, photo):
+    path = tmp_path / "large.jpg"
+    Image.fromarray(np.tile(photo[..., ::-1], (4, 4, 1))).save(path, quality=90)   # 1600x1200
+    return str(path)
+
+
+def test_jpeg_preview_is_swapped_for_the_full_decode(large_jpeg):
+    loader = ImageLoader(large_jpeg, preview_size=(400, 300))
+    assert loader.is_preview()
+    assert loader.preview.size == (400, 300)   # 1/4 scale DCT decode
+
+    full = loader.result(timeout=30)
+    assert full.size == (1600, 1200)
+    assert loader.done()
+    # Still a preview once the decode has finished: the caller must swap it in
+    assert loader.is_preview()
+    with Image.open(large_jpeg) as reference:
+        assert np.array_equal(np.asarray(full), np.asarray(reference.convert("RGB")))
+
+
+def test_small_jpeg_and_png_decode_synchronously(tmp_path, photo, large_jpeg):
+    png = tmp_path / "small.png"
+    Image.fromarray(photo[..., ::-1]).save(png)
+    for path, size in ((str(png), (400, 300)), (large_jpeg, (1600, 1200))):
+        loader = ImageLoader(path, preview_size=(1600, 1200))
+        assert not loader.is_preview() and loader.done()
+        assert loader.preview is loader.result() and loader.preview.size == size
+
@@ -0,0 +1,54 @@
+# test_parallel.py
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.Filtering import apply_color_filter
+from src.Parallel import SharedMemoryExecutor
+from src.Parallel.shm_pool import SEGMENT_PREFIX
+
+SHM_DIR = "/dev/shm"
+pytestmark = pytest.mark.skipif(not os.path.isdir(SHM_DIR), reason="needs POSIX shared memory in /dev/shm")
+
+
+def _segment_names(executor):
+    names = [shm.name for shm in executor._segments._all]
+    assert names and all(name.startswith(SEGMENT_PREFIX) for name in names)
+    return names
+
+
+def _left_over(names):
+    return [name for name in names if os.path.exists(os.path.join(SHM_DIR, name))]
+
+
+def test_results_and_segment_reuse(photo):
+    with SharedMemoryExecutor(processes=1) as executor:
+        images = [photo, photo[::-1], photo[:, :200]]
+        results = executor.map("filter", images, preset="Warm", intensity=60)
+        for img, result in zip(images, results):
+            assert np.array_equal(result, apply_color_filter(np.ascontiguousarray(img), "Warm", 60))
+
+        # A module-level function; sequential jobs reuse the same two segments
+        for _ in range(3):
+            assert np.array_equal(executor.submit(np.flipud, photo).result(), photo[::-1])
+        assert len(executor._segments._free) == len(executor._segments._all)
+        names = _segment_names(executor)
+    assert _left_over(names) == []
+
+
+def test_segments_are_unlinked_after_the_pool_drains(photo):
+    executor = SharedMemoryExecutor(processes=1)
+    futures = [executor.submit("denoise", photo, strength=8) for _ in range(3)]
+    names = _segment_names(executor)
+    executor.shutdown(wait=False)
+
+    # Queued work still completes with its segments intact...
+    for future in futures:
+        assert future.result(timeout=120).shape == photo.shape
+    # ...and the segments are unlinked right after
+    deadline = time.monotonic() + 10
+    while _left_over(names) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _left_over(names) == []
@@ -0,0 +1,59 @@
+# test_recipe.py
+import cv2
+import numpy as np
+import pytest
+
+from src.Filtering import apply_color_filter
+from src.Recipe import Recipe, compile_recipe
+from src.Recipe.compiler import PointStage
+
+INVERT = [[255 - v] * 3 for v in range(256)]
+GAMMA = [[int(round(255 * (v / 255) ** 0.7))] * 3 for v in range(256)]
+
+RECIPES = {
+    "filters": [{"op": "filter", "preset": "Warm", "intensity": 70},
+                {"op": "filter", "preset": "Cinematic", "intensity": 40}],
+    "filter + lut": [{"op": "filter", "preset": "Sepia", "intensity": 55},
+                     {"op": "lut", "table": GAMMA}],
+    "partial black & white": [{"op": "filter", "preset": "Cool", "intensity": 30},
+                              {"op": "filter", "preset": "Black & White", "intensity": 60},
+                              {"op": "lut", "table": INVERT}],
+    "black & white, then color": [{"op": "filter", "preset": "Black & White", "intensity": 100},
+                                  {"op": "filter", "preset": "Warm", "intensity": 80}],
+    "with geometry": [{"op": "filter", "preset": "Warm", "intensity": 50}, {"op": "rotate_cw"},
+                      {"op": "lut", "table": INVERT}, {"op": "flip_horizontal"}],
+}
+
+
+def _sequential(img, steps):
+    """Reference: every step applied on its own, in order, as the editor does."""
+    for step in steps:
+        if step["op"] == "filter":
+            img = apply_color_filter(img, step["preset"], step["intensity"])
+        elif step["op"] == "lut":
+            img = cv2.LUT(img, np.asarray(step["table"], dtype=np.uint8).reshape(256, 1, 3))
+        elif step["op"] == "rotate_cw":
+            img = cv2.rotate(img, cv2.ROTATE_90_CLOCKWISE)
+        elif step["op"] == "flip_horizontal":
+            img = cv2.flip(img, 1)
+    return img
+
+
+@pytest.mark.parametrize("name", RECIPES)
+def test_fused_plan_is_exact(photo, name):
+    steps = RECIPES[name]
+    plan = compile_recipe(Recipe(steps))
+    assert sum(isinstance(s, PointStage) for s in plan.stages) <= 1
+    assert np.array_equal(plan(photo), _sequential(photo, steps))
+
+
+def test_recipe_json_round_trip(tmp_path):
+    recipe = Recipe(RECIPES["with geometry"])
+    path = tmp_path / "recipe.json"
+    recipe.save(str(path))
+    assert Recipe.load(str(path)).to_dict() == recipe.to_dict()
+
+
+def test_cancelling_geometry_is_dropped():
+    plan = compile_recipe(Recipe([{"op": "flip_vertical"}, {"op": "flip_vertical"}]))
+    assert plan.stages == [] and plan.geometry_ops == []
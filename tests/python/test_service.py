@@ -0,0 +1,111 @@
+# test_service.py
+import asyncio
+import json
+from multiprocessing import resource_tracker
+
+import cv2
+import numpy as np
+import pytest
+
+from src.Filtering import apply_color_filter
+from src.Service import ProcessingPool, ProcessingServer, new_shared_memory
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ProcessingPool(workers=1, warm=False)
+    yield pool
+    pool.shutdown()
+
+
+def _call(pool, requests, **server_options):
+    """Starts a server, sends each (path, body, content type) on its own connection, returns (status, body)."""
+    async def send(port, path, body, content_type):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nContent-Type: {content_type}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        data = await reader.read()
+        writer.close()
+        head, _, payload = data.partition(b"\r\n\r\n")
+        return int(head.split(b" ", 2)[1]), payload
+
+    async def main():
+        server = ProcessingServer(pool, **server_options)
+        srv = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = srv.sockets[0].getsockname()[1]
+        try:
+            return [await send(port, *request) for request in requests]
+        finally:
+            srv.close()
+            await srv.wait_closed()
+    return asyncio.run(main())
+
+
+def _unlink(*segments):
+    for shm in segments:
+        shm.close()
+        # The in-process server unregistered the segment when it attached to it
+        resource_tracker.register(shm._name, "shared_memory")
+        shm.unlink()
+
+
+def _png(img):
+    return cv2.imencode(".png", img)[1].tobytes()
+
+
+def _image(payload):
+    return cv2.imdecode(np.frombuffer(payload, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def test_process_encoded_image(pool, photo):
+    path = "/process/filter?preset=Warm&intensity=60"
+    [(status, payload)] = _call(pool, [(path, _png(photo), "image/png")])
+    assert status == 200
+    assert np.array_equal(_image(payload), apply_color_filter(photo, "Warm", 60))
+
+
+def test_16_bit_input_is_converted(pool, photo):
+    deep = photo.astype(np.uint16) * 257
+    [(status, payload)] = _call(pool, [("/process/filter?preset=Cool", _png(deep), "image/png")])
+    assert status == 200
+    assert np.array_equal(_image(payload), apply_color_filter(photo, "Cool", 50))
+
+
+def test_process_shared_memory(pool, photo):
+    src, dst = new_shared_memory(photo.nbytes), new_shared_memory(photo.nbytes)
+    try:
+        np.ndarray(photo.shape, np.uint8, buffer=src.buf)[...] = photo
+        body = json.dumps({"shm": src.name, "shape": list(photo.shape), "out_shm": dst.name,
+                           "params": {"preset": "Sepia", "intensity": 40}}).encode()
+        [(status, payload)] = _call(pool, [("/process/filter", body, "application/json")])
+        assert status == 200 and json.loads(payload)["out_shm"] == dst.name
+        result = np.ndarray(photo.shape, np.uint8, buffer=dst.buf)
+        assert np.array_equal(result, apply_color_filter(photo, "Sepia", 40))
+    finally:
+        _unlink(src, dst)
+
+
+def test_bad_requests_are_client_errors(pool, photo):
+    png = _png(photo)
+    float_shm = new_shared_memory(photo.size * 4)
+    try:
+        responses = _call(pool, [
+            ("/process/denoise?strength=abc", png, "image/png"),
+            ("/process/background?max_side=big", png, "image/png"),
+            ("/process/filter?format=bmp", png, "image/png"),
+            ("/process/filter", b"not an image", "image/png"),
+            ("/process/filter", json.dumps({"shm": "psm_other", "shape": [4, 4, 3]}).encode(), "application/json"),
+            ("/process/filter", json.dumps({"shm": float_shm.name, "shape": list(photo.shape),
+                                            "dtype": "float32"}).encode(), "application/json"),
+        ])
+    finally:
+        _unlink(float_shm)
+    assert [status for status, _ in responses] == [400] * 6
+    assert [status for status, _ in _call(pool, [("/process/nope", png, "image/png")])] == [404]
+
+
+def test_body_cap(pool, photo):
+    png = _png(photo)
+    [(status, _)] = _call(pool, [("/process/filter", png, "image/png")], max_body_mb=len(png) / 2 / 1024 / 1024)
+    assert status == 413
@@ -0,0 +1,54 @@
+# test_tiling.py
+import numpy as np
+import pytest
+import tifffile
+
+from src.Recipe import Recipe, compile_recipe
+from src.Tiling import ChainOp, ColorFilterOp, DenoiseOp, LlieOp, ops_from_recipe, process_tiff
+
+# Factories, so each run gets fresh ops (prepare() stores global statistics)
+OPS = {
+    "filter": lambda: [ColorFilterOp("Warm", 60)],
+    "denoise guided half": lambda: [DenoiseOp(6, True, False, "guided", "half")],
+    "denoise nlm quarter": lambda: [DenoiseOp(5, False, True, "bilateral", "quarter")],
+    "llie": lambda: [LlieOp(0.4, 0.3, cell_size=32)],
+    "llie strong": lambda: [LlieOp(0.7, 0.9, 3.0, cell_size=32)],
+    "denoise + llie": lambda: [DenoiseOp(6, True, False, "guided", "half"), LlieOp(0.4, 0.3, cell_size=32)],
+    "chain": lambda: [ChainOp([DenoiseOp(4, True, False, "bilateral", "full"), ColorFilterOp("Cool", 40)])],
+}
+
+
+def _process(tmp_path, img, ops, tile_size):
+    src, dst = tmp_path / "in.tif", tmp_path / f"out_{tile_size}.tif"
+    if not src.exists():
+        tifffile.imwrite(src, img, tile=(64, 64), photometric="rgb")
+    process_tiff(str(src), str(dst), ops, tile_size=tile_size)
+    return tifffile.imread(dst)
+
+
+@pytest.mark.parametrize("name", OPS)
+def test_tiled_matches_untiled(tmp_path, photo, name):
+    # One tile covering the whole image is the untiled result
+    reference = _process(tmp_path, photo, OPS[name](), 512)
+    for tile_size in (80, 128):
+        tiled = _process(tmp_path, photo, OPS[name](), tile_size)
+        assert np.array_equal(tiled, reference), f"{name}: tile size {tile_size} differs"
+
+
+def test_point_recipe_with_flips_matches_the_plan(tmp_path, photo):
+    recipe = Recipe([{"op": "filter", "preset": "Warm", "intensity": 60}, {"op": "flip_horizontal"},
+                     {"op": "lut", "table": [[255 - v] * 3 for v in range(256)]}, {"op": "flip_vertical"}])
+    tiled = _process(tmp_path, photo, ops_from_recipe(recipe), 128)
+    # The TIFF holds the pixels as RGB; plans work on BGR
+    expected = compile_recipe(recipe)(np.ascontiguousarray(photo[..., ::-1]))[..., ::-1]
+    assert np.array_equal(tiled, expected)
+
+
+def test_flips_after_neighborhood_ops_are_rejected():
+    denoise = {"op": "denoise", "strength": 5}
+    ops_from_recipe(Recipe([{"op": "flip_horizontal"}, denoise]))
+    ops_from_recipe(Recipe([denoise, {"op": "flip_vertical"}, {"op": "flip_vertical"}]))   # cancels out
+    with pytest.raises(ValueError):
+        ops_from_recipe(Recipe([denoise, {"op": "flip_horizontal"}]))
+    with pytest.raises(ValueError):
+        ops_from_recipe(Recipe([{"op": "llie"}, {"op": "filter", "preset": "Cool"}, {"op": "flip_vertical"}]))
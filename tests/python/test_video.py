@@ -0,0 +1,67 @@
+# test_video.py
+import random
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from src.Recipe import Recipe, compile_recipe
+from src.Video import VideoPipeline
+
+FRAMES = 24
+INVERT = [[255 - v] * 3 for v in range(256)]
+
+
+@pytest.fixture
+def clip(tmp_path):
+    """Short MJPG clip whose frame i is a flat gray of level 10 * i."""
+    path = str(tmp_path / "in.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 25.0, (64, 48))
+    assert writer.isOpened()
+    for i in range(FRAMES):
+        writer.write(np.full((48, 64, 3), 10 * i, np.uint8))
+    writer.release()
+    return path
+
+
+def _levels(path):
+    cap = cv2.VideoCapture(path)
+    levels = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        levels.append(int(round(frame.mean())))
+    cap.release()
+    return levels
+
+
+def _shuffled(fn, seed=0):
+    """`fn` with random delays, so workers finish frames out of order."""
+    rng = random.Random(seed)   # thread-safe, unlike numpy Generators
+
+    def run(frame):
+        time.sleep(rng.uniform(0, 0.01))
+        return fn(frame)
+    return run
+
+
+def test_frames_keep_count_and_order(tmp_path, clip):
+    plan = compile_recipe(Recipe([{"op": "lut", "table": INVERT}]))
+    dst = str(tmp_path / "out.avi")
+    written = VideoPipeline(_shuffled(plan), workers=3, max_in_flight=4).run(clip, dst)
+
+    assert written == FRAMES
+    expected = [255 - level for level in _levels(clip)]
+    assert np.abs(np.array(_levels(dst)) - expected).max() <= 2   # MJPG re-encoding
+
+
+def test_bgra_frames_are_written_as_bgr(tmp_path, clip):
+    # A background step makes a recipe return BGRA
+    def cut_out(frame):
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+
+    dst = str(tmp_path / "out.avi")
+    assert VideoPipeline(_shuffled(cut_out), workers=2).run(clip, dst) == FRAMES
+    assert np.abs(np.array(_levels(dst)) - _levels(clip)).max() <= 2